@@ -0,0 +1,110 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Benchmark the serialization of chart data responses.
+
+Compares, on a synthetic table chart result, the previous path (records built
+with `DataFrame.to_dict` and encoded with simplejson) with the current one
+(`df_to_records` and `json.dumps_bytes`, which uses orjson when installed):
+
+    python scripts/benchmark_chart_data_serialization.py --rows 50000
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from typing import Any, Callable
+
+import click
+import numpy as np
+import pandas as pd
+
+from superset.dataframe import df_to_records
+from superset.utils import json
+
+
+def make_dataframe(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a DataFrame like the result of a table chart: a time column, dimension
+    columns, metrics with missing values and a nullable integer column.
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(0, 1_000_000, rows).astype(object)
+    counts[::7] = None
+    return pd.DataFrame(
+        {
+            "__timestamp": pd.date_range("2000-01-01", periods=rows, freq="h"),
+            "country": rng.choice(["ES", "FR", "DE", "IT", "PT"], rows),
+            "indicator": rng.choice([f"Indicator {i}" for i in range(50)], rows),
+            "value": np.where(rng.random(rows) < 0.05, np.nan, rng.random(rows)),
+            "total": rng.integers(0, 2**40, rows),
+            "count": counts,
+        }
+    )
+
+
+def serialize_baseline(df: pd.DataFrame) -> bytes:
+    records = df.to_dict(orient="records")
+    return json.dumps(
+        {"result": [{"data": records}]},
+        default=json.json_int_dttm_ser,
+        ignore_nan=True,
+    ).encode("utf-8")
+
+
+def serialize_current(df: pd.DataFrame) -> bytes:
+    records = df_to_records(df, convert_big_integers=False)
+    return json.dumps_bytes(
+        {"result": [{"data": records}]},
+        default=json.json_int_dttm_ser,
+    )
+
+
+def measure(
+    func: Callable[[pd.DataFrame], bytes], df: pd.DataFrame, repeat: int
+) -> Any:
+    """Return the median wall time of `func` and its last result."""
+    timings = []
+    result = b""
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = func(df)
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings), result
+
+
+@click.command()
+@click.option("--rows", default=50_000, show_default=True, help="Rows of the result")
+@click.option("--repeat", default=5, help="Runs of each path, the median is kept")
+def main(rows: int, repeat: int) -> None:
+    df = make_dataframe(rows)
+    baseline, expected = measure(serialize_baseline, df, repeat)
+    current, result = measure(serialize_current, df, repeat)
+    if json.loads(result) != json.loads(expected):
+        raise click.ClickException("Both paths do not return the same payload")
+
+    encoder = "orjson" if json.orjson is not None else "simplejson"
+    print(f"{rows} rows, {len(df.columns)} columns, current encoder: {encoder}\n")
+    print(f"{'path':<12}{'wall (ms)':>12}{'size (KiB)':>14}")
+    print(f"{'baseline':<12}{baseline * 1000:>12.1f}{len(expected) / 1024:>14.1f}")
+    print(f"{'current':<12}{current * 1000:>12.1f}{len(result) / 1024:>14.1f}")
+    print(f"\nSpeedup: {baseline / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,358 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Benchmark the SDMX ingestion against the local fake SDMX server.
+
+Loads synthetic dataflows of increasing size with `load_database`, optionally
+creates charts on them with `create_charts`, and reports the wall time, peak RSS
+and bytes written of each stage. Results can be saved as JSON and compared with
+a previous run to catch regressions:
+
+    python scripts/benchmark_sdmx_ingestion.py --series 100 --series 10000 \\
+        --output results.json
+    python scripts/benchmark_sdmx_ingestion.py --series 100 --series 10000 \\
+        --baseline results.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from unittest import mock
+
+import click
+import psutil
+from flask import current_app
+
+from superset import db, security_manager
+from superset.sdmx import (
+    create_charts,
+    create_dashboard,
+    invalidate_structure_cache,
+    load_database,
+)
+from superset.utils.core import override_user
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sdmx_fake_server import (  # noqa: E402
+    AGENCY_ID,
+    serve_as_agency,
+    start_server,
+    SyntheticDataflow,
+    XML_MEDIA_TYPE,
+)
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_INTERVAL = 0.01
+MIB = 1024 * 1024
+
+
+class StageRecorder:
+    """
+    Record the wall time, peak RSS and bytes written of each stage, as reported
+    by the `progress(stage, sdmx_url)` callback of the loading functions. Peak
+    RSS is sampled by a background thread.
+    """
+
+    def __init__(self) -> None:
+        self.process = psutil.Process()
+        self.stages: dict[str, dict[str, float]] = {}
+        self._stage: Optional[str] = None
+        self._started_at = 0.0
+        self._written_at_start = 0
+        self._running = False
+        self._sampler: Optional[threading.Thread] = None
+
+    def _written(self) -> int:
+        try:
+            return self.process.io_counters().write_bytes
+        except (AttributeError, psutil.AccessDenied):
+            # Not available on this platform
+            return 0
+
+    def _sample(self) -> None:
+        while self._running:
+            if stage := self._stage:
+                rss = self.process.memory_info().rss
+                stats = self.stages[stage]
+                stats["peak_rss"] = max(stats["peak_rss"], rss)
+            time.sleep(SAMPLING_INTERVAL)
+
+    def start(self) -> None:
+        self._running = True
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self.enter(None)
+        self._running = False
+        if self._sampler:
+            self._sampler.join()
+
+    def enter(self, stage: Optional[str], sdmx_url: Optional[str] = None) -> None:
+        """Close the current stage and open the given one."""
+        now = time.perf_counter()
+        written = self._written()
+        if self._stage:
+            stats = self.stages[self._stage]
+            stats["wall_time"] += now - self._started_at
+            stats["bytes_written"] += written - self._written_at_start
+        if stage:
+            self.stages.setdefault(
+                stage, {"wall_time": 0.0, "peak_rss": 0, "bytes_written": 0}
+            )
+            self.stages[stage]["peak_rss"] = max(
+                self.stages[stage]["peak_rss"], self.process.memory_info().rss
+            )
+        self._stage = stage
+        self._started_at = now
+        self._written_at_start = written
+
+
+def run_scenario(
+    server: Any, dataflow: SyntheticDataflow, charts: int, cleanup: bool
+) -> dict[str, dict[str, float]]:
+    """Load a dataflow from the fake server and create charts on it."""
+    invalidate_structure_cache(AGENCY_ID, dataflow.id, dataflow.version)
+    sdmx_url = server.data_url(dataflow)
+    recorder = StageRecorder()
+    recorder.start()
+    dataset = dashboard = None
+    try:
+        dataset = load_database(sdmx_url, progress=recorder.enter)
+        if charts:
+            recorder.enter("create_charts")
+            spec = {
+                "DashID": f"Benchmark {dataflow.id}",
+                "Rows": [
+                    {
+                        "DATA": sdmx_url,
+                        "chartType": "VALUE",
+                        "Title": "{$DIM_0}",
+                        "Subtitle": "{$TIME_PERIOD}",
+                    }
+                    for _ in range(charts)
+                ],
+            }
+            dashboard = create_dashboard(spec)
+            create_charts(spec, [dataset] * charts, dashboard)
+    finally:
+        recorder.stop()
+        if cleanup:
+            if dashboard:
+                for chart in dashboard.slices:
+                    db.session.delete(chart)
+                db.session.delete(dashboard)
+            if dataset:
+                # Also removes the store and its database, so that the next run
+                # downloads the query again instead of reusing the store
+                db.session.delete(dataset)
+            db.session.commit()
+    return recorder.stages
+
+
+def summarize(runs: list[dict[str, dict[str, float]]]) -> dict[str, dict[str, float]]:
+    """Return the median of each metric of each stage over several runs."""
+    return {
+        stage: {
+            metric: statistics.median(run[stage][metric] for run in runs)
+            for metric in runs[0][stage]
+        }
+        for stage in runs[0]
+    }
+
+
+def print_results(name: str, stages: dict[str, dict[str, float]]) -> None:
+    print(f"\n{name}\n")
+    print(f"{'stage':<20}{'wall (s)':>12}{'peak RSS (MiB)':>18}{'written (MiB)':>16}")
+    for stage, stats in stages.items():
+        print(
+            f"{stage:<20}{stats['wall_time']:>12.3f}"
+            f"{stats['peak_rss'] / MIB:>18.1f}{stats['bytes_written'] / MIB:>16.2f}"
+        )
+    total = sum(stats["wall_time"] for stats in stages.values())
+    print(f"{'total':<20}{total:>12.3f}")
+
+
+def find_regressions(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """List the stages whose wall time grew by more than `tolerance`."""
+    regressions = []
+    for name, stages in results.items():
+        for stage, stats in stages.items():
+            previous = baseline.get(name, {}).get(stage)
+            if not previous or not previous["wall_time"]:
+                continue
+            ratio = stats["wall_time"] / previous["wall_time"]
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{name} / {stage}: {previous['wall_time']:.3f}s -> "
+                    f"{stats['wall_time']:.3f}s (+{ratio - 1:.0%})"
+                )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--series", multiple=True, type=int, help="Series of each scenario [100, 10000]"
+)
+@click.option("--observations", default=120, help="Observations per series")
+@click.option("--dimensions", default=4, show_default=True)
+@click.option("--codes", default=50, help="Codes in the codelist of each dimension")
+@click.option(
+    "--languages", default="en,fr", show_default=True, help="Comma separated locales"
+)
+@click.option(
+    "--format",
+    "data_format",
+    type=click.Choice(["csv", "xml"]),
+    default="csv",
+    show_default=True,
+    help="Format of the data messages",
+)
+@click.option(
+    "--streaming/--no-streaming",
+    default=None,
+    help="Override SDMX_STREAMING_INGESTION",
+)
+@click.option("--charts", default=0, help="Charts to create on each dataset")
+@click.option("--repeat", default=3, help="Runs per scenario, the median is kept")
+@click.option(
+    "--recordings",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory of recorded messages served by the fake server",
+)
+@click.option(
+    "--output", type=click.Path(path_type=Path), help="Save the results as JSON"
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Results of a previous run to compare with",
+)
+@click.option(
+    "--tolerance",
+    default=0.2,
+    show_default=True,
+    help="Wall time increase over the baseline reported as a regression",
+)
+@click.option(
+    "--username",
+    default="admin",
+    show_default=True,
+    help="User owning the benchmark datasets and charts",
+)
+@click.option(
+    "--cleanup/--no-cleanup",
+    default=True,
+    help="Delete the benchmark datasets and charts",
+)
+def main(  # pylint: disable=too-many-arguments, too-many-locals
+    series: tuple[int, ...],
+    observations: int,
+    dimensions: int,
+    codes: int,
+    languages: str,
+    data_format: str,
+    streaming: Optional[bool],
+    charts: int,
+    repeat: int,
+    recordings: Optional[Path],
+    output: Optional[Path],
+    baseline: Optional[Path],
+    tolerance: float,
+    username: str,
+    cleanup: bool,
+) -> None:
+    user = security_manager.find_user(username=username)
+    if not user:
+        raise click.BadParameter(f"User {username} not found", param_hint="username")
+
+    dataflows = [
+        SyntheticDataflow(
+            id=f"BENCH_{count}",
+            series=count,
+            observations=observations,
+            dimensions=dimensions,
+            codes_per_dimension=codes,
+            languages=languages.split(","),
+        )
+        for count in series or (100, 10000)
+    ]
+    server = start_server(dataflows, recordings=recordings)
+    print(f"Fake SDMX server listening on {server.base_url}")
+
+    config = current_app.config
+    overrides: dict[str, Any] = {}
+    if data_format == "xml":
+        overrides["SDMX_DATA_ACCEPT"] = XML_MEDIA_TYPE
+    if streaming is not None:
+        overrides["SDMX_STREAMING_INGESTION"] = streaming
+    os.makedirs("dbs", exist_ok=True)
+
+    results: dict[str, Any] = {}
+    with (
+        mock.patch.dict(config, overrides),
+        serve_as_agency(server),
+        override_user(user),
+    ):
+        for dataflow in dataflows:
+            name = (
+                f"{dataflow.series_count} series x {dataflow.observations} obs "
+                f"({data_format})"
+            )
+            runs = []
+            for _ in range(repeat):
+                sent_before = server.bytes_sent
+                runs.append(run_scenario(server, dataflow, charts, cleanup))
+                runs[-1]["fetching"]["bytes_received"] = server.bytes_sent - sent_before
+            results[name] = summarize(runs)
+            print_results(name, results[name])
+    server.shutdown()
+
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults saved to {output}")
+
+    if baseline:
+        regressions = find_regressions(
+            results, json.loads(baseline.read_text()), tolerance
+        )
+        if regressions:
+            print("\nRegressions:\n")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print("\nNo regression")
+
+
+if __name__ == "__main__":
+    from superset.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        # pylint: disable=no-value-for-parameter
+        main()
@@ -0,0 +1,505 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Local stand-in for an SDMX 2.1 REST web service.
+
+Serves synthetic dataflows of configurable size (series, observations per
+series, dimensions, codelist sizes, languages) as SDMX-CSV or structure specific
+SDMX-ML data messages, plus their structure messages (dataflow, DSD, concepts and
+codelists), and replays recorded messages from a directory. Data queries are
+filtered by their series key, `startPeriod`, `endPeriod` and `lastNObservations`.
+Used to measure the SDMX ingestion offline, see `benchmark_sdmx_ingestion.py`.
+
+The service is mounted under the path of the ECB web service, e.g.
+`http://127.0.0.1:8765/service`. SDMX URLs pointing to it are resolved to the ECB
+once the entry point of its sdmxthon web service is the base URL of the server,
+see `serve_as_agency`.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+import click
+
+logger = logging.getLogger(__name__)
+
+AGENCY_ID = "ECB"
+AGENCY_PATH = "/service"
+CSV_MEDIA_TYPE = "application/vnd.sdmx.data+csv;version=1.0.0"
+XML_MEDIA_TYPE = "application/vnd.sdmx.structurespecificdata+xml;version=2.1"
+STRUCTURE_MEDIA_TYPE = "application/vnd.sdmx.structure+xml;version=2.1"
+CHUNK_SIZE = 1000
+
+NAMESPACES = (
+    'xmlns:mes="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message" '
+    'xmlns:str="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/structure" '
+    'xmlns:com="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/common" '
+    'xmlns:ss="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/structurespecific"'
+)
+
+
+@dataclass
+class DataQuery:
+    """
+    Filters of an SDMX data query: the series key (`+` separated codes of each
+    dimension, empty for all of them), the period range and the number of last
+    observations of each series.
+    """
+
+    key: str = "all"
+    start_period: Optional[str] = None
+    end_period: Optional[str] = None
+    last_n: Optional[int] = None
+
+    def matches_key(self, codes: list[str]) -> bool:
+        if not self.key or self.key == "all":
+            return True
+        parts = self.key.split(".")
+        return all(
+            not part or code in part.split("+")
+            for part, code in zip(parts, codes, strict=False)
+        )
+
+    def matches_period(self, period: str) -> bool:
+        if self.start_period and period[: len(self.start_period)] < self.start_period:
+            return False
+        if self.end_period and period[: len(self.end_period)] > self.end_period:
+            return False
+        return True
+
+
+@dataclass
+class SyntheticDataflow:
+    """
+    A generated dataflow. Series keys enumerate the codes of the dimensions, so
+    at most `codes_per_dimension ** dimensions` distinct series are generated.
+    Observations are monthly, starting in January 2000.
+    """
+
+    id: str = "BENCH"
+    series: int = 100
+    observations: int = 120
+    dimensions: int = 4
+    codes_per_dimension: int = 50
+    languages: list[str] = field(default_factory=lambda: ["en"])
+    seed: int = 42
+    version: str = "1.0"
+
+    @property
+    def dimension_ids(self) -> list[str]:
+        return [f"DIM_{position}" for position in range(self.dimensions)]
+
+    @property
+    def structure_name(self) -> str:
+        return f"{AGENCY_ID}:{self.id}({self.version})"
+
+    @property
+    def series_count(self) -> int:
+        return min(self.series, self.codes_per_dimension**self.dimensions)
+
+    def series_key(self, index: int) -> list[str]:
+        """Return the codes of the series at `index` (mixed radix enumeration)."""
+        codes = []
+        for _ in range(self.dimensions):
+            index, code = divmod(index, self.codes_per_dimension)
+            codes.append(f"C{code}")
+        return codes
+
+    def time_periods(self, last_n: Optional[int] = None) -> list[str]:
+        periods = [
+            f"{2000 + month // 12}-{month % 12 + 1:02d}"
+            for month in range(self.observations)
+        ]
+        return periods[-last_n:] if last_n else periods
+
+    def iter_observations(
+        self, query: Optional[DataQuery] = None
+    ) -> Iterator[tuple[list[str], str, str]]:
+        """
+        Yield (series key, time period, value) tuples, series by series. Values
+        do not depend on the key and period filters of the query.
+        """
+        query = query or DataQuery()
+        rng = random.Random(self.seed)  # noqa: S311
+        periods = self.time_periods(query.last_n)
+        for index in range(self.series_count):
+            key = self.series_key(index)
+            matches_key = query.matches_key(key)
+            for period in periods:
+                value = f"{rng.uniform(0, 1000):.4f}"
+                if matches_key and query.matches_period(period):
+                    yield key, period, value
+
+
+def render_csv(
+    dataflow: SyntheticDataflow, query: Optional[DataQuery] = None
+) -> Iterator[bytes]:
+    """Render the observations of a dataflow as an SDMX-CSV message."""
+    header = ["DATAFLOW", *dataflow.dimension_ids, "TIME_PERIOD", "OBS_VALUE"]
+    lines = [",".join(header)]
+    for key, period, value in dataflow.iter_observations(query):
+        lines.append(",".join([dataflow.structure_name, *key, period, value]))
+        if len(lines) >= CHUNK_SIZE:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def render_structure_specific(
+    dataflow: SyntheticDataflow, query: Optional[DataQuery] = None
+) -> Iterator[bytes]:
+    """Render the observations of a dataflow as a structure specific SDMX-ML message."""
+    dsd_id = f"DSD_{dataflow.id}"
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<mes:StructureSpecificData {NAMESPACES}>"
+        "<mes:Header><mes:ID>IREF000001</mes:ID><mes:Test>true</mes:Test>"
+        "<mes:Prepared>2024-01-01T00:00:00</mes:Prepared>"
+        '<mes:Sender id="FAKE"/>'
+        f'<mes:Structure structureID="{dsd_id}" dimensionAtObservation="TIME_PERIOD" '
+        'namespace="urn:sdmx:org.sdmx.infomodel.datastructure.DataStructure='
+        f'{AGENCY_ID}:{dsd_id}({dataflow.version})">'
+        f'<com:Structure><Ref agencyID="{AGENCY_ID}" id="{dsd_id}" '
+        f'version="{dataflow.version}"/></com:Structure></mes:Structure>'
+        "</mes:Header>"
+        f'<mes:DataSet ss:structureRef="{dsd_id}">'
+    ).encode()
+    chunk = []
+    current_key = None
+    for key, period, value in dataflow.iter_observations(query):
+        if key != current_key:
+            if current_key is not None:
+                chunk.append("</Series>")
+            attributes = " ".join(
+                f'{dimension}="{code}"'
+                for dimension, code in zip(dataflow.dimension_ids, key, strict=True)
+            )
+            chunk.append(f"<Series {attributes}>")
+            current_key = key
+        chunk.append(f'<Obs TIME_PERIOD="{period}" OBS_VALUE="{value}"/>')
+        if len(chunk) >= CHUNK_SIZE:
+            yield "".join(chunk).encode()
+            chunk = []
+    if current_key is not None:
+        chunk.append("</Series>")
+    chunk.append("</mes:DataSet></mes:StructureSpecificData>")
+    yield "".join(chunk).encode()
+
+
+def _names(label: str, languages: list[str]) -> str:
+    return "".join(
+        f'<com:Name xml:lang="{language}">{escape(f"{label} ({language})")}</com:Name>'
+        for language in languages
+    )
+
+
+def _concept_ref(concept_id: str, scheme_id: str, version: str) -> str:
+    return (
+        f'<str:ConceptIdentity><Ref id="{concept_id}" '
+        f'maintainableParentID="{scheme_id}" maintainableParentVersion="{version}" '
+        f'agencyID="{AGENCY_ID}" package="conceptscheme" class="Concept"/>'
+        "</str:ConceptIdentity>"
+    )
+
+
+def render_structure(dataflow: SyntheticDataflow) -> bytes:
+    """
+    Render the structure message of a dataflow with its descendants: the data
+    structure definition, its concept scheme and the codelists of its dimensions.
+    """
+    version = dataflow.version
+    dsd_id = f"DSD_{dataflow.id}"
+    scheme_id = f"CS_{dataflow.id}"
+    languages = dataflow.languages
+    maintainable = f'agencyID="{AGENCY_ID}" version="{version}"'
+
+    codelists = []
+    for dimension in dataflow.dimension_ids:
+        codes = "".join(
+            f'<str:Code id="C{code}">{_names(f"{dimension} {code}", languages)}'
+            "</str:Code>"
+            for code in range(dataflow.codes_per_dimension)
+        )
+        codelists.append(
+            f'<str:Codelist id="CL_{dimension}" {maintainable}>'
+            f"{_names(f'Codelist {dimension}', languages)}{codes}</str:Codelist>"
+        )
+
+    concept_ids = [*dataflow.dimension_ids, "TIME_PERIOD", "OBS_VALUE"]
+    concepts = "".join(
+        f'<str:Concept id="{concept_id}">{_names(concept_id, languages)}</str:Concept>'
+        for concept_id in concept_ids
+    )
+
+    dimensions = "".join(
+        f'<str:Dimension id="{dimension}" position="{position + 1}">'
+        f"{_concept_ref(dimension, scheme_id, version)}"
+        "<str:LocalRepresentation><str:Enumeration>"
+        f'<Ref id="CL_{dimension}" {maintainable} package="codelist" '
+        'class="Codelist"/></str:Enumeration></str:LocalRepresentation>'
+        "</str:Dimension>"
+        for position, dimension in enumerate(dataflow.dimension_ids)
+    )
+    time_dimension = (
+        f'<str:TimeDimension id="TIME_PERIOD" position="{dataflow.dimensions + 1}">'
+        f"{_concept_ref('TIME_PERIOD', scheme_id, version)}"
+        "<str:LocalRepresentation>"
+        '<str:TextFormat textType="ObservationalTimePeriod"/>'
+        "</str:LocalRepresentation></str:TimeDimension>"
+    )
+    measure = (
+        '<str:MeasureList id="MeasureDescriptor">'
+        '<str:PrimaryMeasure id="OBS_VALUE">'
+        f"{_concept_ref('OBS_VALUE', scheme_id, version)}"
+        "</str:PrimaryMeasure></str:MeasureList>"
+    )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<mes:Structure {NAMESPACES}>"
+        "<mes:Header><mes:ID>IREF000001</mes:ID><mes:Test>true</mes:Test>"
+        "<mes:Prepared>2024-01-01T00:00:00</mes:Prepared>"
+        '<mes:Sender id="FAKE"/></mes:Header>'
+        "<mes:Structures>"
+        f'<str:Dataflows><str:Dataflow id="{dataflow.id}" {maintainable}>'
+        f"{_names(f'Dataflow {dataflow.id}', languages)}"
+        f'<str:Structure><Ref id="{dsd_id}" {maintainable} '
+        'package="datastructure" class="DataStructure"/></str:Structure>'
+        "</str:Dataflow></str:Dataflows>"
+        f"<str:Codelists>{''.join(codelists)}</str:Codelists>"
+        f'<str:Concepts><str:ConceptScheme id="{scheme_id}" {maintainable}>'
+        f"{_names(f'Concepts {dataflow.id}', languages)}{concepts}"
+        "</str:ConceptScheme></str:Concepts>"
+        f'<str:DataStructures><str:DataStructure id="{dsd_id}" {maintainable}>'
+        f"{_names(f'Structure {dataflow.id}', languages)}"
+        "<str:DataStructureComponents>"
+        f'<str:DimensionList id="DimensionDescriptor">{dimensions}{time_dimension}'
+        f"</str:DimensionList>{measure}"
+        "</str:DataStructureComponents></str:DataStructure></str:DataStructures>"
+        "</mes:Structures></mes:Structure>"
+    ).encode()
+
+
+def render_error(code: int, text: str) -> bytes:
+    """Render an SDMX-ML error message."""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<mes:Error {NAMESPACES}>"
+        f'<mes:ErrorMessage code="{code}"><com:Text>{escape(text)}</com:Text>'
+        "</mes:ErrorMessage></mes:Error>"
+    ).encode()
+
+
+def _flow_id(resource: str) -> str:
+    """Return the dataflow id of an `AGENCY,ID,VERSION` or `ID` resource."""
+    parts = resource.split(",")
+    return parts[1] if len(parts) > 1 else parts[0]
+
+
+class FakeSdmxServer(ThreadingHTTPServer):
+    """
+    HTTP server answering SDMX REST data and dataflow queries for its synthetic
+    dataflows. Requests matching a file under `recordings` (by URL path) are
+    answered with that file instead.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        dataflows: list[SyntheticDataflow],
+        recordings: Optional[Path] = None,
+    ) -> None:
+        super().__init__(address, FakeSdmxRequestHandler)
+        self.dataflows = {dataflow.id: dataflow for dataflow in dataflows}
+        self.recordings = recordings
+        self.bytes_sent = 0
+        self.bytes_sent_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{AGENCY_PATH}"
+
+    def data_url(self, dataflow: SyntheticDataflow) -> str:
+        return f"{self.base_url}/data/{AGENCY_ID},{dataflow.id},{dataflow.version}/all"
+
+
+class FakeSdmxRequestHandler(BaseHTTPRequestHandler):
+    server: FakeSdmxServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug(format, *args)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        segments = [segment for segment in url.path.split("/") if segment]
+
+        if self.server.recordings:
+            recording = self.server.recordings.joinpath(*segments)
+            if recording.is_file():
+                content = recording.read_bytes()
+                media_type = (
+                    STRUCTURE_MEDIA_TYPE
+                    if content.lstrip().startswith(b"<")
+                    else CSV_MEDIA_TYPE
+                )
+                self._send(200, media_type, iter([content]))
+                return
+
+        if "dataflow" in segments:
+            # /dataflow/{agency}/{id}/{version}
+            resources = segments[segments.index("dataflow") + 1 :]
+            dataflow = self.server.dataflows.get(resources[1] if resources[1:] else "")
+            if dataflow is None:
+                self._send_error(404, 100, "No structures found")
+                return
+            self._send(200, STRUCTURE_MEDIA_TYPE, iter([render_structure(dataflow)]))
+        elif "data" in segments:
+            # /data/{flow}/{key}/{provider}
+            resources = segments[segments.index("data") + 1 :]
+            dataflow = self.server.dataflows.get(
+                _flow_id(resources[0]) if resources else ""
+            )
+            if dataflow is None or "updatedAfter" in query:
+                # Synthetic dataflows never change after they are generated
+                self._send_error(404, 100, "No results found")
+                return
+            data_query = DataQuery(
+                key=resources[1] if resources[1:] else "all",
+                start_period=query.get("startPeriod"),
+                end_period=query.get("endPeriod"),
+                last_n=int(query.get("lastNObservations", 0)) or None,
+            )
+            if not any(dataflow.iter_observations(data_query)):
+                self._send_error(404, 100, "No results found")
+            elif "csv" in self.headers.get("Accept", ""):
+                self._send(200, CSV_MEDIA_TYPE, render_csv(dataflow, data_query))
+            else:
+                self._send(
+                    200, XML_MEDIA_TYPE, render_structure_specific(dataflow, data_query)
+                )
+        else:
+            self._send_error(501, 501, "Not implemented")
+
+    def _send_error(self, status: int, code: int, text: str) -> None:
+        self._send(status, "application/xml", iter([render_error(code, text)]))
+
+    def _send(self, status: int, media_type: str, chunks: Iterator[bytes]) -> None:
+        """Stream a response body with the chunked transfer encoding."""
+        self.send_response(status)
+        self.send_header("Content-Type", media_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        for chunk in chunks:
+            if chunk:
+                self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                sent += len(chunk)
+        self.wfile.write(b"0\r\n\r\n")
+        with self.server.bytes_sent_lock:
+            self.server.bytes_sent += sent
+
+
+def start_server(
+    dataflows: list[SyntheticDataflow],
+    host: str = "127.0.0.1",
+    port: int = 0,
+    recordings: Optional[Path] = None,
+) -> FakeSdmxServer:
+    """Start a fake SDMX server in a background thread, on a free port by default."""
+    server = FakeSdmxServer((host, port), dataflows, recordings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@contextmanager
+def serve_as_agency(server: FakeSdmxServer) -> Iterator[FakeSdmxServer]:
+    """
+    Use a fake SDMX server as the web service of its agency, so that its SDMX URLs
+    are resolved to that agency and its structures are fetched from it.
+    """
+    from sdmxthon.webservices.webservices import EcbWs
+
+    entry_point = EcbWs.ENTRY_POINT
+    EcbWs.ENTRY_POINT = server.base_url
+    try:
+        yield server
+    finally:
+        EcbWs.ENTRY_POINT = entry_point
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8765, show_default=True)
+@click.option("--dataflow", "dataflow_id", default="BENCH", show_default=True)
+@click.option("--series", default=100, show_default=True)
+@click.option("--observations", default=120, help="Observations per series")
+@click.option("--dimensions", default=4, show_default=True)
+@click.option("--codes", default=50, help="Codes in the codelist of each dimension")
+@click.option(
+    "--languages", default="en", show_default=True, help="Comma separated locales"
+)
+@click.option(
+    "--recordings",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory of recorded messages, served by URL path",
+)
+def main(  # pylint: disable=too-many-arguments
+    host: str,
+    port: int,
+    dataflow_id: str,
+    series: int,
+    observations: int,
+    dimensions: int,
+    codes: int,
+    languages: str,
+    recordings: Optional[Path],
+) -> None:
+    dataflow = SyntheticDataflow(
+        id=dataflow_id,
+        series=series,
+        observations=observations,
+        dimensions=dimensions,
+        codes_per_dimension=codes,
+        languages=languages.split(","),
+    )
+    server = FakeSdmxServer((host, port), [dataflow], recordings)
+    print(f"Serving SDMX data on {server.data_url(dataflow)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
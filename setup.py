@@ -66,7 +66,8 @@ setup(
             "superset = superset.extensions.metadb:SupersetAPSWDialect",
         ],
         "shillelagh.adapter": [
-            "superset=superset.extensions.metadb:SupersetShillelaghAdapter"
+            "superset=superset.extensions.metadb:SupersetShillelaghAdapter",
+            "sdmx=superset.extensions.metadb:SdmxShillelaghAdapter",
         ],
     },
     download_url="https://www.apache.org/dist/superset/" + version_string,
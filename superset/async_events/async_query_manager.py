@@ -115,6 +115,8 @@ class AsyncQueryManager:
         self._load_chart_data_into_cache_job: Any = None
         # pylint: disable=invalid-name
         self._load_explore_json_into_cache_job: Any = None
+        self._load_sdmx_dataset_job: Any = None
+        self._load_sdmx_dashboard_job: Any = None
 
     def init_app(self, app: Flask) -> None:
         config = app.config
@@ -159,6 +161,11 @@ class AsyncQueryManager:
         self._load_chart_data_into_cache_job = load_chart_data_into_cache
         self._load_explore_json_into_cache_job = load_explore_json_into_cache
 
+        from superset.tasks.sdmx import load_sdmx_dashboard, load_sdmx_dataset
+
+        self._load_sdmx_dataset_job = load_sdmx_dataset
+        self._load_sdmx_dashboard_job = load_sdmx_dashboard
+
     def register_request_handlers(self, app: Flask) -> None:
         @app.after_request
         def validate_session(response: Response) -> Response:
@@ -256,6 +263,28 @@ class AsyncQueryManager:
         )
         return job_metadata
 
+    def submit_sdmx_dataset_job(
+        self,
+        channel_id: str,
+        sdmx_url: str,
+        is_raw_url: bool = False,
+        user_id: Optional[int] = None,
+    ) -> dict[str, Any]:
+        job_metadata = self.init_job(channel_id, user_id)
+        self._load_sdmx_dataset_job.delay(job_metadata, sdmx_url, is_raw_url)
+        return job_metadata
+
+    def submit_sdmx_dashboard_job(
+        self,
+        channel_id: str,
+        spec: dict[str, Any],
+        locale: str = "en",
+        user_id: Optional[int] = None,
+    ) -> dict[str, Any]:
+        job_metadata = self.init_job(channel_id, user_id)
+        self._load_sdmx_dashboard_job.delay(job_metadata, spec, locale)
+        return job_metadata
+
     def read_events(
         self, channel: str, last_id: Optional[str]
     ) -> list[Optional[dict[str, Any]]]:
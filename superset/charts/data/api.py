@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import contextlib
 import logging
+from collections.abc import Iterator
 from typing import Any, TYPE_CHECKING
 
 from flask import current_app, g, make_response, request, Response
@@ -39,13 +40,6 @@ from superset.commands.chart.exceptions import (
     ChartDataCacheLoadError,
     ChartDataQueryFailedError,
 )
-from superset.charts.data.commands.create_async_job_command import (
-    CreateAsyncChartDataJobCommand,
-)
-from superset.charts.data.commands.get_data_command import ChartDataCommand
-from superset.charts.data.query_context_cache_loader import QueryContextCacheLoader
-from superset.charts.post_processing import apply_post_process
-from superset.charts.schemas import ChartDataQueryContextSchema
 from superset.connectors.sqla.models import SqlaTable
 from superset.models.core import Database 
 from superset.models.slice import Slice
@@ -57,14 +51,14 @@ from superset.extensions import event_logger
 from superset.models.sql_lab import Query
 from superset.utils import json
 from superset.utils.core import (
-    create_zip,
     DatasourceType,
     get_user_id,
+    stream_zip,
 )
 from superset.utils.decorators import logs_context
 from superset.views.base import CsvResponse, generate_download_headers, XlsxResponse
 from superset.views.base_api import statsd_metrics
-from superset.sdmx import load_database
+from superset.sdmx import refresh_database_coalesced
 
 if TYPE_CHECKING:
     from superset.common.query_context import QueryContext
@@ -248,7 +242,7 @@ class ChartDataRestApi(ChartRestApi):
             datasource_id = slice.datasource_id
             datasource = db.session.query(SqlaTable).filter_by(id=datasource_id).first()
             if datasource and datasource.is_sdmx and json_body['form_data']['force']:
-                load_database(datasource.sdmx_url, datasource)
+                refresh_database_coalesced(datasource)
 
 
         try:
@@ -394,19 +388,22 @@ class ChartDataRestApi(ChartRestApi):
 
                 return XlsxResponse(data, headers=generate_download_headers("xlsx"))
 
-            # return multi-query results bundled as a zip file
-            def _process_data(query_data: Any) -> Any:
-                if result_format == ChartDataResultFormat.CSV:
-                    encoding = current_app.config["CSV_EXPORT"].get("encoding", "utf-8")
-                    return query_data.encode(encoding)
-                return query_data
+            # return multi-query results bundled as a zip file, streamed as the
+            # results are rendered
+            encoding = current_app.config["CSV_EXPORT"].get("encoding", "utf-8")
+
+            def _process_data(query_data: Any) -> Iterator[bytes]:
+                if isinstance(query_data, (str, bytes)):
+                    query_data = [query_data]
+                for chunk in query_data:
+                    yield chunk.encode(encoding) if isinstance(chunk, str) else chunk
 
-            files = {
-                f"query_{idx + 1}.{result_format}": _process_data(query["data"])
+            files = (
+                (f"query_{idx + 1}.{result_format}", _process_data(query["data"]))
                 for idx, query in enumerate(result["queries"])
-            }
+            )
             return Response(
-                create_zip(files),
+                stream_zip(files),
                 headers=generate_download_headers("zip"),
                 mimetype="application/zip",
             )
@@ -417,11 +414,22 @@ class ChartDataRestApi(ChartRestApi):
                 for query in queries:
                     with contextlib.suppress(KeyError):
                         del query["query"]
+            rowcount = sum(
+                len(query["data"])
+                for query in queries
+                if isinstance(query.get("data"), list)
+            )
+            if result["query_context"].should_stream(rowcount):
+                return Response(
+                    self._stream_json_result(
+                        queries, current_app.config["CHART_DATA_STREAMING_CHUNK_SIZE"]
+                    ),
+                    content_type="application/json; charset=utf-8",
+                )
             with event_logger.log_context(f"{self.__class__.__name__}.json_dumps"):
-                response_data = json.dumps(
+                response_data = json.dumps_bytes(
                     {"result": queries},
                     default=json.json_int_dttm_ser,
-                    ignore_nan=True,
                 )
             resp = make_response(response_data, 200)
             resp.headers["Content-Type"] = "application/json; charset=utf-8"
@@ -429,6 +437,36 @@ class ChartDataRestApi(ChartRestApi):
 
         return self.response_400(message=f"Unsupported result_format: {result_format}")
 
+    @staticmethod
+    def _stream_json_result(
+        queries: list[dict[str, Any]], chunk_size: int
+    ) -> Iterator[bytes]:
+        """
+        Encode the ``{"result": queries}`` response piece by piece, the records of
+        each query being encoded ``chunk_size`` at a time.
+        """
+        yield b'{"result":['
+        for idx, query in enumerate(queries):
+            if idx:
+                yield b","
+            data = query.get("data")
+            if not isinstance(data, list):
+                yield json.dumps_bytes(query, default=json.json_int_dttm_ser)
+                continue
+
+            head = json.dumps_bytes(
+                {key: value for key, value in query.items() if key != "data"},
+                default=json.json_int_dttm_ser,
+            )
+            yield head[:-1] + (b',"data":[' if len(head) > 2 else b'"data":[')
+            for start in range(0, len(data), chunk_size):
+                if start:
+                    yield b","
+                records = data[start : start + chunk_size]
+                yield json.dumps_bytes(records, default=json.json_int_dttm_ser)[1:-1]
+            yield b"]}"
+        yield b"]}"
+
     @event_logger.log_this
     def _get_data_response(
         self,
@@ -18,6 +18,7 @@
 import logging
 from datetime import datetime, timedelta
 from functools import partial
+from typing import Any, Union
 
 from flask import current_app
 from sqlalchemy.exc import SQLAlchemyError
@@ -39,6 +40,16 @@ stats_logger = current_app.config["STATS_LOGGER"]
 class CreateDistributedLock(BaseDistributedLockCommand):
     lock_expiration = timedelta(seconds=30)
 
+    def __init__(
+        self,
+        namespace: str,
+        params: Union[dict[str, Any], None] = None,
+        lock_expiration: Union[timedelta, None] = None,
+    ):
+        super().__init__(namespace, params)
+        if lock_expiration is not None:
+            self.lock_expiration = lock_expiration
+
     def validate(self) -> None:
         pass
 
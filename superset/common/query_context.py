@@ -17,6 +17,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator
 from typing import Any, ClassVar, TYPE_CHECKING
 
 import pandas as pd
@@ -90,9 +91,12 @@ class QueryContext:
         self,
         df: pd.DataFrame,
         coltypes: list[GenericDataType],
-    ) -> str | list[dict[str, Any]]:
+    ) -> str | bytes | Iterator[str] | Iterator[bytes] | list[dict[str, Any]]:
         return self._processor.get_data(df, coltypes)
 
+    def should_stream(self, rowcount: int) -> bool:
+        return self._processor.should_stream(rowcount)
+
     def get_payload(
         self,
         cache_query_context: bool | None = False,
@@ -19,6 +19,7 @@ from __future__ import annotations
 import copy
 import logging
 import re
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Any, cast, ClassVar, TYPE_CHECKING, TypedDict
 
@@ -28,7 +29,7 @@ from flask_babel import gettext as _
 from pandas import DateOffset
 
 from superset import app
-from superset.common.chart_data import ChartDataResultFormat
+from superset.common.chart_data import ChartDataResultFormat, ChartDataResultType
 from superset.common.db_query_status import QueryStatus
 from superset.common.query_actions import get_query_results
 from superset.common.utils import dataframe_utils
@@ -41,6 +42,7 @@ from superset.connectors.sqla.models import BaseDatasource
 from superset.constants import CacheRegion, TimeGrain
 from superset.daos.annotation_layer import AnnotationLayerDAO
 from superset.daos.chart import ChartDAO
+from superset.dataframe import df_to_records
 from superset.exceptions import (
     InvalidPostProcessingError,
     QueryObjectValidationError,
@@ -692,9 +694,22 @@ class QueryContextProcessor:
 
         return str(value)
 
+    def should_stream(self, rowcount: int) -> bool:
+        """
+        Whether results of ``rowcount`` rows are streamed to the client instead of
+        being built in memory. Post-processed results are reprocessed as a whole
+        before being sent, and are never streamed.
+        """
+        threshold = config["CHART_DATA_STREAMING_THRESHOLD"]
+        return (
+            threshold is not None
+            and rowcount >= threshold
+            and self._query_context.result_type != ChartDataResultType.POST_PROCESSED
+        )
+
     def get_data(
         self, df: pd.DataFrame, coltypes: list[GenericDataType]
-    ) -> str | list[dict[str, Any]]:
+    ) -> str | bytes | Iterator[str] | Iterator[bytes] | list[dict[str, Any]]:
         if self._query_context.result_format in ChartDataResultFormat.table_like():
             include_index = not isinstance(df.index, pd.RangeIndex)
             columns = list(df.columns)
@@ -702,17 +717,27 @@ class QueryContextProcessor:
             if verbose_map:
                 df.columns = [verbose_map.get(column, column) for column in columns]
 
+            stream = self.should_stream(len(df))
+            chunk_size = config["CHART_DATA_STREAMING_CHUNK_SIZE"]
             result = None
             if self._query_context.result_format == ChartDataResultFormat.CSV:
+                if stream:
+                    return csv.df_to_escaped_csv_chunks(
+                        df, chunk_size, index=include_index, **config["CSV_EXPORT"]
+                    )
                 result = csv.df_to_escaped_csv(
                     df, index=include_index, **config["CSV_EXPORT"]
                 )
             elif self._query_context.result_format == ChartDataResultFormat.XLSX:
                 excel.apply_column_types(df, coltypes)
+                if stream:
+                    return excel.df_to_excel_chunks(
+                        df, chunk_size, **config["EXCEL_EXPORT"]
+                    )
                 result = excel.df_to_excel(df, **config["EXCEL_EXPORT"])
             return result or ""
 
-        return df.to_dict(orient="records")
+        return df_to_records(df, convert_big_integers=False)
 
     def get_payload(
         self,
@@ -19,7 +19,9 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+import pyarrow as pa
 from flask_caching import Cache
+from flask_caching.backends import NullCache
 from pandas import DataFrame
 
 from superset import app
@@ -32,6 +34,7 @@ from superset.stats_logger import BaseStatsLogger
 from superset.superset_typing import Column
 from superset.utils.cache import set_and_log_cache
 from superset.utils.core import error_msg_from_exception, get_stacktrace
+from superset.utils.decorators import stats_timing
 
 config = app.config
 stats_logger: BaseStatsLogger = config["STATS_LOGGER"]
@@ -43,6 +46,103 @@ _cache: dict[CacheRegion, Cache] = {
 }
 
 
+def _chunk_key(key: str, idx: int) -> str:
+    return f"{key}:chunk:{idx}"
+
+
+def _serialize_df(df: DataFrame) -> bytes | None:
+    """
+    Serialize a DataFrame to a compressed Arrow IPC stream, or return None when
+    Arrow cannot represent it faithfully.
+    """
+    with stats_timing("data_cache.arrow_serialize", stats_logger):
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError):
+            # e.g. duplicate column names or columns of mixed types
+            return None
+        # nested values would be read back as NumPy arrays instead of lists
+        if any(pa.types.is_nested(field.type) for field in table.schema):
+            return None
+
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(
+            compression=config["DATA_CACHE_ARROW_COMPRESSION"]
+        )
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        payload = sink.getvalue().to_pybytes()
+
+    stats_logger.gauge(
+        "data_cache.arrow_compression_ratio", table.nbytes / max(len(payload), 1)
+    )
+    return payload
+
+
+def _deserialize_df(payload: bytes) -> DataFrame:
+    """
+    Deserialize a DataFrame from an Arrow IPC stream. The stream is read from the
+    cached bytes without copying them, only the conversion to pandas copies the
+    columns, as DataFrames sharing Arrow memory would be read-only. Integer columns
+    with nulls are read back as objects, as they were cached from object columns
+    and would lose precision as floats.
+    """
+    with stats_timing("data_cache.arrow_deserialize", stats_logger):
+        table = pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+        return table.to_pandas(integer_object_nulls=True)
+
+
+def _encode_value(value: dict[str, Any]) -> tuple[dict[str, Any], list[bytes]]:
+    """
+    Encode the DataFrame of a data cache value with the configured codec.
+
+    :param value: the value to cache
+    :returns: the encoded value and the chunks of the DataFrame to store under
+        their own keys
+    """
+    if config["DATA_CACHE_CODEC"] != "arrow" or "df" not in value:
+        return value, []
+
+    payload = _serialize_df(value["df"])
+    if payload is None:
+        stats_logger.incr("data_cache.arrow_fallback")
+        return value, []
+
+    value = {key: val for key, val in value.items() if key != "df"}
+    chunk_size = config["DATA_CACHE_CHUNK_SIZE"]
+    if chunk_size is None or len(payload) <= chunk_size:
+        value["df_arrow"] = payload
+        return value, []
+
+    chunks = [
+        payload[start : start + chunk_size]
+        for start in range(0, len(payload), chunk_size)
+    ]
+    value["df_arrow_chunks"] = len(chunks)
+    return value, chunks
+
+
+def _decode_value(
+    cache: Cache, key: str, value: dict[str, Any]
+) -> dict[str, Any] | None:
+    """
+    Decode a data cache value encoded by `_encode_value`, or return None when the
+    chunks of its DataFrame have been evicted.
+    """
+    if "df_arrow" in value:
+        payload = value["df_arrow"]
+    elif chunk_count := value.get("df_arrow_chunks"):
+        chunks = cache.get_many(*[_chunk_key(key, idx) for idx in range(chunk_count)])
+        if any(chunk is None for chunk in chunks):
+            logger.warning("Missing chunks for cache key %s", key)
+            return None
+        payload = b"".join(chunks)
+    else:
+        return value
+
+    return {**value, "df": _deserialize_df(payload)}
+
+
 class QueryCacheManager:
     """
     Class for manage query-cache getting and setting
@@ -152,7 +252,19 @@ class QueryCacheManager:
         if not key or not _cache[region] or force_query:
             return query_cache
 
-        if cache_value := _cache[region].get(key):
+        cache_value = _cache[region].get(key)
+        if cache_value and region == CacheRegion.DATA:
+            try:
+                cache_value = _decode_value(_cache[region], key, cache_value)
+            except (pa.ArrowException, ValueError) as ex:
+                logger.error(
+                    "Error decoding cache: %s",
+                    error_msg_from_exception(ex),
+                    exc_info=True,
+                )
+                cache_value = None
+
+        if cache_value:
             logger.debug("Cache key: %s", key)
             stats_logger.incr("loading_from_cache")
             try:
@@ -202,10 +314,31 @@ class QueryCacheManager:
         region: CacheRegion = CacheRegion.DEFAULT,
     ) -> None:
         """
-        set value to specify cache region, proxy for `set_and_log_cache`
+        set value to specify cache region, proxy for `set_and_log_cache`. The
+        DataFrames of the data cache region are encoded with `DATA_CACHE_CODEC`.
         """
-        if key:
-            set_and_log_cache(_cache[region], key, value, timeout, datasource_uid)
+        if not key or isinstance(_cache[region].cache, NullCache):
+            return
+
+        if region == CacheRegion.DATA:
+            value, chunks = _encode_value(value)
+            if chunks:
+                chunk_timeout = (
+                    timeout if timeout is not None else config["CACHE_DEFAULT_TIMEOUT"]
+                )
+                mapping = {
+                    _chunk_key(key, idx): chunk for idx, chunk in enumerate(chunks)
+                }
+                try:
+                    set_keys = _cache[region].set_many(mapping, timeout=chunk_timeout)
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.exception(ex)
+                    set_keys = []
+                if len(set_keys) != len(mapping):
+                    logger.warning("Could not cache the chunks of key %s", key)
+                    return
+
+        set_and_log_cache(_cache[region], key, value, timeout, datasource_uid)
 
     @staticmethod
     def delete(
@@ -213,6 +346,13 @@ class QueryCacheManager:
         region: CacheRegion = CacheRegion.DEFAULT,
     ) -> None:
         if key:
+            cache_value = _cache[region].get(key)
+            if isinstance(cache_value, dict) and (
+                chunk_count := cache_value.get("df_arrow_chunks")
+            ):
+                # not `delete_many`, which stops at the first evicted chunk
+                for idx in range(chunk_count):
+                    _cache[region].delete(_chunk_key(key, idx))
             _cache[region].delete(key)
 
     @staticmethod
@@ -767,6 +767,18 @@ CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "NullCache"}
 # Cache for datasource metadata and query results
 DATA_CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "NullCache"}
 
+# How the DataFrames of chart data results are stored in the data cache: "arrow"
+# stores them as Arrow IPC streams compressed with DATA_CACHE_ARROW_COMPRESSION
+# ("zstd", "lz4" or None), "pickle" leaves them to the pickling of Flask-Caching.
+# DataFrames Arrow cannot represent faithfully, e.g. with mixed type or nested
+# columns, are always pickled.
+DATA_CACHE_CODEC = "arrow"
+DATA_CACHE_ARROW_COMPRESSION: str | None = "zstd"
+# Serialized DataFrames larger than this many bytes are split into chunks stored
+# under their own keys, to stay below the value size limit of the cache backend.
+# Set to None to never split them.
+DATA_CACHE_CHUNK_SIZE: int | None = 32 * 1024 * 1024
+
 # Cache for dashboard filter state. `CACHE_TYPE` defaults to `SupersetMetastoreCache`
 # that stores the values in the key-value table in the Superset metastore, as it's
 # required for Superset to operate correctly, but can be replaced by any
@@ -849,6 +861,13 @@ CSV_EXPORT = {"encoding": "utf-8"}
 # note: index option should not be overridden
 EXCEL_EXPORT: dict[str, Any] = {}
 
+# Chart data API results with at least this many rows are streamed to the client:
+# CSV and XLSX exports, and zip bundles of them, are written
+# CHART_DATA_STREAMING_CHUNK_SIZE rows at a time instead of being built in memory,
+# and JSON results are encoded chunk by chunk. Set to None to disable streaming.
+CHART_DATA_STREAMING_THRESHOLD: int | None = 50_000
+CHART_DATA_STREAMING_CHUNK_SIZE = 10_000
+
 # ---------------------------------------------------
 # Time grain configurations
 # ---------------------------------------------------
@@ -998,6 +1017,7 @@ class CeleryConfig:  # pylint: disable=too-few-public-methods
         "superset.tasks.scheduler",
         "superset.tasks.thumbnails",
         "superset.tasks.cache",
+        "superset.tasks.sdmx",
     )
     result_backend = "db+sqlite:///celery_results.sqlite"
     worker_prefetch_multiplier = 1
@@ -1017,6 +1037,15 @@ class CeleryConfig:  # pylint: disable=too-few-public-methods
             "task": "reports.prune_log",
             "schedule": crontab(minute=0, hour=0),
         },
+        "sdmx.refresh_dataflow_catalogs": {
+            "task": "sdmx.refresh_dataflow_catalogs",
+            "schedule": crontab(minute=0, hour="*/6"),
+        },
+        "sdmx.refresh_scheduled_datasets": {
+            "task": "sdmx.refresh_scheduled_datasets",
+            "schedule": crontab(minute="*", hour="*"),
+            "options": {"expires": int(CELERY_BEAT_SCHEDULER_EXPIRES.total_seconds())},
+        },
         # Uncomment to enable pruning of the query table
         # "prune_query": {
         #     "task": "prune_query",
@@ -1851,6 +1880,102 @@ class ExtraDynamicQueryFilters(TypedDict, total=False):
 
 EXTRA_DYNAMIC_QUERY_FILTERS: ExtraDynamicQueryFilters = {}
 
+# ---------------------------------------------------
+# SDMX ingestion
+# ---------------------------------------------------
+# Parse SDMX data messages incrementally and write observations to the dataset's
+# SQLite store in batches, instead of building the whole DataFrame in memory.
+SDMX_STREAMING_INGESTION = False
+# Maximum number of observations held in memory per batch when streaming
+SDMX_INGESTION_BATCH_SIZE = 10000
+# Refresh SDMX datasets by requesting only the observations updated since the last
+# successful load (SDMX `updatedAfter`) and upserting them into the existing table.
+SDMX_INCREMENTAL_REFRESH = False
+# Forced refreshes of an SDMX dataset from chart data requests are coalesced: one
+# request refreshes it under a distributed lock held at most
+# SDMX_REFRESH_LOCK_TIMEOUT seconds, the others wait for it (polling every
+# SDMX_REFRESH_POLL_INTERVAL seconds) and reuse its result. Datasets refreshed
+# less than SDMX_REFRESH_MIN_INTERVAL seconds ago are not refreshed again.
+SDMX_REFRESH_MIN_INTERVAL = 60
+SDMX_REFRESH_LOCK_TIMEOUT = int(timedelta(minutes=10).total_seconds())
+SDMX_REFRESH_POLL_INTERVAL = 1
+# Timeout in seconds for requests to the SDMX web services
+SDMX_REQUEST_TIMEOUT = int(timedelta(minutes=5).total_seconds())
+# SDMX web service requests go through one pooled HTTP session per agency host.
+# At most SDMX_HTTP_MAX_CONNECTIONS_PER_HOST requests run concurrently against a
+# host; connection errors and 429/5xx answers are retried SDMX_HTTP_RETRIES times
+# with a jittered exponential backoff of SDMX_HTTP_BACKOFF_FACTOR * 2^n seconds.
+SDMX_HTTP_MAX_CONNECTIONS_PER_HOST = 4
+SDMX_HTTP_RETRIES = 3
+SDMX_HTTP_BACKOFF_FACTOR = 0.5
+SDMX_HTTP_CONNECT_TIMEOUT = 10
+# Accept header of SDMX data requests, most compact format first. SDMX-CSV is
+# several times smaller than SDMX-ML and parsed by the pandas C parser; services
+# without it answer in SDMX-ML, which is detected from the response body.
+SDMX_DATA_ACCEPT = ", ".join(
+    [
+        "application/vnd.sdmx.data+csv;version=1.0.0",
+        "application/vnd.sdmx.structurespecificdata+xml;version=2.1;q=0.9",
+        "application/vnd.sdmx.genericdata+xml;version=2.1;q=0.8",
+        "application/xml;q=0.5",
+    ]
+)
+# Maximum number of SDMX queries downloaded concurrently when uploading a
+# dashboard. Identical queries in the same dashboard are only loaded once.
+SDMX_MAX_PARALLEL_LOADS = 4
+# Store the codelists of SDMX datasets once, in lookup tables joined by a view,
+# instead of adding one label column per language and dimension to every
+# observation. This makes the SQLite stores several times smaller.
+SDMX_NORMALIZED_CODELISTS = False
+# Index the dimension code columns, TIME_PERIOD and the series key of ingested
+# SDMX datasets and ANALYZE their store. The created indexes are listed in the
+# `sdmx_indexes` key of the dataset `extra`.
+SDMX_AUTO_INDEXES = True
+# Parse the SDMX TIME_PERIOD of ingested observations (2020-Q1, 2020-M01,
+# 2020-W05, ISO 8601 dates...) into a TIME_PERIOD_START timestamp, used as the
+# main temporal column of the dataset, and a TIME_PERIOD_FREQ frequency column.
+SDMX_PARSE_TIME_PERIOD = True
+# SDMX ingestion runs as a Celery task when the GLOBAL_ASYNC_QUERIES feature is
+# enabled and the upload endpoints are called with `?async=true`. Stages are
+# published as async events; this is the soft time limit of those tasks.
+SDMX_ASYNC_INGESTION_TIME_LIMIT_SEC = int(timedelta(hours=1).total_seconds())
+# Cache for SDMX structures (dataflow, DSD and codelists). Entries are kept
+# for `CACHE_DEFAULT_TIMEOUT` and revalidated against the web service with a
+# conditional request (ETag / Last-Modified) once older than
+# `SDMX_STRUCTURE_CACHE_TTL` seconds. Entries hold the raw structure messages,
+# as JSON, and are parsed again by each process using them.
+SDMX_STRUCTURE_CACHE_CONFIG: CacheConfig = {
+    "CACHE_TYPE": "SupersetMetastoreCache",
+    "CACHE_DEFAULT_TIMEOUT": int(timedelta(days=30).total_seconds()),
+    "CODEC": JsonKeyValueCodec(),
+}
+SDMX_STRUCTURE_CACHE_TTL = int(timedelta(days=1).total_seconds())
+# Codelists are shared by the dataflows of an agency and cached by URN, in the
+# structure cache and in a local cache of each process holding up to
+# SDMX_CODELIST_CACHE_SIZE codes, least recently used codelists evicted first.
+SDMX_CODELIST_CACHE_SIZE = 500_000
+# Agency dataflow catalogs are kept in the structure cache and refreshed by the
+# `sdmx.refresh_dataflow_catalogs` beat task. Catalogs older than this are
+# fetched again inline, e.g. when the beat is not running.
+SDMX_CATALOG_MAX_AGE = int(timedelta(days=1).total_seconds())
+# SDMX datasets with a `sdmx_refresh_schedule` crontab (UTC) are refreshed in the
+# background by the `sdmx.refresh_scheduled_datasets` beat task, at most
+# SDMX_SCHEDULED_REFRESH_MAX_CONCURRENCY at a time. Datasets unchanged upstream
+# since their last load are skipped; the charts of refreshed datasets have their
+# cache warmed up when SDMX_SCHEDULED_REFRESH_WARM_UP_CACHE is set.
+SDMX_SCHEDULED_REFRESH_MAX_CONCURRENCY = 2
+SDMX_SCHEDULED_REFRESH_WARM_UP_CACHE = True
+# SDMX data URLs can be queried live as virtual tables of the Superset meta
+# database (ENABLE_SUPERSET_META_DB), eg `SELECT * FROM "https://.../data/EXR"`.
+# Filters on dimensions and TIME_PERIOD are pushed down into the query key and
+# period range. Observations are streamed to the query while they are downloaded;
+# the last SDMX_VIRTUAL_TABLE_CACHE_SIZE slices of at most
+# SDMX_VIRTUAL_TABLE_CACHE_MAX_ROWS observations are kept in memory by each
+# process for SDMX_VIRTUAL_TABLE_CACHE_TTL seconds.
+SDMX_VIRTUAL_TABLE_CACHE_SIZE = 32
+SDMX_VIRTUAL_TABLE_CACHE_MAX_ROWS = 10000
+SDMX_VIRTUAL_TABLE_CACHE_TTL = int(timedelta(minutes=10).total_seconds())
+
 
 # -------------------------------------------------------------------
 # *                WARNING:  STOP EDITING  HERE                    *
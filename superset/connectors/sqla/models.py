@@ -38,6 +38,7 @@ from jinja2.exceptions import TemplateError
 from markupsafe import escape, Markup
 from sqlalchemy import (
     and_,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -62,6 +63,7 @@ from sqlalchemy.orm import (
     reconstructor,
     relationship,
     RelationshipProperty,
+    Session,
 )
 from sqlalchemy.orm.mapper import Mapper
 from sqlalchemy.schema import UniqueConstraint
@@ -79,7 +81,11 @@ from superset.connectors.sqla.utils import (
     get_virtual_table_metadata,
 )
 from superset.constants import EMPTY_STRING, NULL_STRING
-from superset.db_engine_specs.base import BaseEngineSpec, TimestampExpression
+from superset.db_engine_specs.base import (
+    BaseEngineSpec,
+    MetricType,
+    TimestampExpression,
+)
 from superset.exceptions import (
     ColumnNotFoundException,
     DatasetInvalidPermissionEvaluationException,
@@ -1182,6 +1188,10 @@ class SqlaTable(
     is_sdmx = Column(Boolean, default=False)
     sdmx_url = Column(String(1024), nullable=True)
     sdmx_uuid = Column(String(256), nullable=True)
+    # high-water mark of the last successful SDMX load, used for delta refreshes
+    sdmx_updated_at = Column(DateTime, nullable=True)
+    # crontab (UTC) of the scheduled background refreshes of the SDMX data
+    sdmx_refresh_schedule = Column(String(1000), nullable=True)
     concepts = Column(Text, nullable=True)
     database: Database = relationship(
         "Database",
@@ -1790,23 +1800,30 @@ class SqlaTable(
             )
         )
 
-    def fetch_metadata(self) -> MetadataResult:
+    def fetch_metadata(
+        self,
+        external_columns: list[ResultSetColumnType] | None = None,
+        external_metrics: list[MetricType] | None = None,
+    ) -> MetadataResult:
         """
         Fetches the metadata for the table and merges it in
 
+        :param external_columns: Columns already fetched from the external system
+        :param external_metrics: Metrics already fetched from the external system
         :return: Tuple with lists of added, removed and modified column names.
         """
-        new_columns = self.external_metadata()
-        metrics = [
-            SqlMetric(**metric)
-            for metric in self.database.get_metrics(
+        new_columns = (
+            self.external_metadata() if external_columns is None else external_columns
+        )
+        if external_metrics is None:
+            external_metrics = self.database.get_metrics(
                 Table(
                     self.table_name,
                     self.schema or None,
                     self.catalog,
                 )
             )
-        ]
+        metrics = [SqlMetric(**metric) for metric in external_metrics]
         any_date_col = None
         db_engine_spec = self.db_engine_spec
 
@@ -2061,12 +2078,32 @@ class SqlaTable(
         connection: Connection,
         sqla_table: SqlaTable,
     ) -> None:
-        try:
-            session = Session.object_session(sqla_table)
-            os.remove(f"dbs/{sqla_table.sdmx_uuid}")
-            session.delete(sqla_table.database)
-        except Exception as ex:  # pylint: disable=broad-except
-            pass
+        """
+        Schedule the removal of the SQLite store of an SDMX dataset, and of its
+        database, when no other dataset references the store anymore. They are
+        removed by the session hooks below, once the deletion is flushed and
+        committed.
+        """
+        if not sqla_table.sdmx_uuid:
+            return
+
+        tables = SqlaTable.__table__
+        references = connection.execute(
+            sa.select(sa.func.count())
+            .select_from(tables)
+            .where(
+                tables.c.sdmx_uuid == sqla_table.sdmx_uuid,
+                tables.c.id != sqla_table.id,
+            )
+        ).scalar()
+        if references:
+            return
+
+        info = inspect(sqla_table).session.info
+        info.setdefault(SDMX_STORES_TO_REMOVE, set()).add(sqla_table.sdmx_uuid)
+        if sqla_table.database_id is not None:
+            info.setdefault(SDMX_DATABASES_TO_DELETE, set()).add(sqla_table.database_id)
+
     @staticmethod
     def after_delete(
         mapper: Mapper,
@@ -2094,6 +2131,81 @@ sa.event.listen(SqlaTable, "after_delete", SqlaTable.after_delete)
 sa.event.listen(SqlMetric, "after_update", SqlaTable.update_column)
 sa.event.listen(TableColumn, "after_update", SqlaTable.update_column)
 
+
+# keys of ``Session.info`` holding what the deletion of SDMX datasets leaves unused
+SDMX_DATABASES_TO_DELETE = "sdmx_databases_to_delete"
+SDMX_STORES_TO_REMOVE = "sdmx_stores_to_remove"
+
+
+def delete_sdmx_databases(session: Session, flush_context: Any) -> None:
+    """
+    Delete the databases of the SDMX stores left without datasets by a flush. The
+    session can't be changed while flushing, they are deleted right after, in the
+    same transaction.
+    """
+    if database_ids := session.info.pop(SDMX_DATABASES_TO_DELETE, None):
+        for database in session.query(Database).filter(Database.id.in_(database_ids)):
+            session.delete(database)
+
+
+def remove_sdmx_stores(session: Session) -> None:
+    """
+    Remove the SQLite files of the SDMX stores left without datasets, once their
+    deletion is committed.
+    """
+    for sdmx_uuid in session.info.pop(SDMX_STORES_TO_REMOVE, set()):
+        try:
+            os.remove(f"dbs/{sdmx_uuid}")
+        except OSError as ex:
+            logger.warning("Could not remove the SDMX store: %s", ex)
+
+
+def discard_sdmx_store_removals(session: Session) -> None:
+    """
+    Keep the SDMX stores and their databases when their deletion is rolled back.
+    """
+    session.info.pop(SDMX_DATABASES_TO_DELETE, None)
+    session.info.pop(SDMX_STORES_TO_REMOVE, None)
+
+
+sa.event.listen(Session, "after_flush_postexec", delete_sdmx_databases)
+sa.event.listen(Session, "after_commit", remove_sdmx_stores)
+sa.event.listen(Session, "after_rollback", discard_sdmx_store_removals)
+
+
+class SdmxIngestionLog(Model):  # pylint: disable=too-few-public-methods
+    """
+    SDMX ingestion history, holds the duration of each stage and the volumes of
+    every load or refresh of an SDMX dataset
+    """
+
+    __tablename__ = "sdmx_ingestion_log"
+    id = Column(Integer, primary_key=True)
+    sdmx_url = Column(String(1024), nullable=False)
+    agency_id = Column(String(250), index=True)
+    dataflow_id = Column(String(250), index=True)
+    # full load, incremental refresh or reuse of an already stored query
+    kind = Column(String(50), nullable=False)
+    state = Column(String(50), nullable=False)
+    start_dttm = Column(DateTime, nullable=False)
+    end_dttm = Column(DateTime)
+    duration_ms = Column(Integer)
+    rows = Column(Integer)
+    bytes_downloaded = Column(BigInteger)
+    dataframe_memory = Column(BigInteger)
+    # milliseconds spent in each ingestion stage, as JSON
+    stages = Column(Text)
+    error_message = Column(Text)
+
+    # Failed first loads have no dataset
+    table_id = Column(Integer, ForeignKey("tables.id", ondelete="CASCADE"))
+    table = relationship(
+        SqlaTable,
+        backref=backref("sdmx_ingestion_logs", cascade="all, delete-orphan"),
+        foreign_keys=[table_id],
+    )
+
+
 RLSFilterRoles = DBTable(
     "rls_filter_roles",
     metadata,
@@ -19,7 +19,11 @@
 import logging
 from typing import Any
 
+import numpy as np
 import pandas as pd
+from pandas._libs.missing import NAType
+from pandas.api.types import is_object_dtype
+from pandas.core.dtypes.cast import maybe_box_native
 
 from superset.utils.core import JS_MAX_INTEGER
 
@@ -37,21 +41,62 @@ def _convert_big_integers(val: Any) -> Any:
     return str(val) if isinstance(val, int) and abs(val) > JS_MAX_INTEGER else val
 
 
-def df_to_records(dframe: pd.DataFrame) -> list[dict[str, Any]]:
+def _box_and_convert_big_integers(val: Any) -> Any:
+    return _convert_big_integers(maybe_box_native(val))
+
+
+def _column_to_list(column: pd.Series, convert_big_integers: bool) -> list[Any]:
+    """
+    Convert the values of a column to the Python values of
+    ``DataFrame.to_dict(orient="records")``. Integer columns are checked for big
+    integers with NumPy, only object and extension columns are converted value by
+    value.
+    """
+    if is_object_dtype(column.dtype) or not isinstance(column.dtype, np.dtype):
+        values = column.to_numpy(dtype=object)
+        types = set(map(type, values))
+        convert = None
+        if any(issubclass(type_, np.generic) or type_ is NAType for type_ in types):
+            convert = (
+                _box_and_convert_big_integers
+                if convert_big_integers
+                else maybe_box_native
+            )
+        elif convert_big_integers and int in types:
+            convert = _convert_big_integers
+        if convert:
+            values = np.frompyfunc(convert, 1, 1)(values)
+        return values.tolist()
+
+    if convert_big_integers and column.dtype.kind in "iu":
+        values = column.to_numpy()
+        big = (values > JS_MAX_INTEGER) | (values < -JS_MAX_INTEGER)
+        if big.any():
+            converted = values.astype(object)
+            converted[big] = [str(val) for val in converted[big]]
+            return converted.tolist()
+
+    return column.tolist()
+
+
+def df_to_records(
+    dframe: pd.DataFrame, convert_big_integers: bool = True
+) -> list[dict[str, Any]]:
     """
     Convert a DataFrame to a set of records.
 
     :param dframe: the DataFrame to convert
+    :param convert_big_integers: whether to cast integers larger than
+        ``JS_MAX_INTEGER`` to strings
     :returns: a list of dictionaries reflecting each single row of the DataFrame
     """
     if not dframe.columns.is_unique:
         logger.warning(
             "DataFrame columns are not unique, some columns will be omitted."
         )
-    records = dframe.to_dict(orient="records")
-
-    for record in records:
-        for key in record:
-            record[key] = _convert_big_integers(record[key])
-
-    return records
+    columns = [
+        _column_to_list(dframe.iloc[:, i], convert_big_integers)
+        for i in range(len(dframe.columns))
+    ]
+    names = dframe.columns.tolist()
+    return [dict(zip(names, row)) for row in zip(*columns)]
@@ -207,6 +207,7 @@ class DatasetRestApi(BaseSupersetModelRestApi):
         "changed_on_humanized",
         "changed_by.first_name",
         "changed_by.last_name",
+        "sdmx_refresh_schedule",
     ]
     show_columns = show_select_columns + [
         "columns.type_generic",
@@ -248,6 +249,7 @@ class DatasetRestApi(BaseSupersetModelRestApi):
         "columns",
         "metrics",
         "extra",
+        "sdmx_refresh_schedule",
     ]
     openapi_spec_tag = "Datasets"
 
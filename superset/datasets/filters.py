@@ -18,7 +18,9 @@ from flask_babel import lazy_gettext as _
 from sqlalchemy import not_, or_
 from sqlalchemy.orm.query import Query
 
-from superset.connectors.sqla.models import SqlaTable
+from superset import security_manager
+from superset.connectors.sqla.models import Database, SqlaTable
+from superset.utils.filters import get_dataset_access_filters
 from superset.views.base import BaseFilter
 
 
@@ -51,3 +53,16 @@ class DatasetCertifiedFilter(BaseFilter):  # pylint: disable=too-few-public-meth
                 )
             )
         return query
+
+
+class SdmxIngestionLogFilter(BaseFilter):  # pylint: disable=too-few-public-methods
+    """Only list the ingestions of the datasets the user can access."""
+
+    def apply(self, query: Query, value: bool) -> Query:
+        if security_manager.can_access_all_datasources():
+            return query
+        return (
+            query.join(SqlaTable, SqlaTable.id == self.model.table_id)
+            .join(Database, Database.id == SqlaTable.database_id)
+            .filter(get_dataset_access_filters(SqlaTable))
+        )
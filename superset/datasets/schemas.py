@@ -17,6 +17,7 @@
 from datetime import datetime
 from typing import Any
 
+from croniter import croniter
 from dateutil.parser import isoparse
 from flask_babel import lazy_gettext as _
 from marshmallow import fields, pre_load, Schema, ValidationError
@@ -103,6 +104,12 @@ class DatasetPostSchema(Schema):
     is_sdmx = fields.Boolean(allow_none=True)
     sdmx_url = fields.String(allow_none=True)
 
+
+def validate_crontab(value: str) -> None:
+    if not croniter.is_valid(value):
+        raise ValidationError(_("Cron expression is not valid"))
+
+
 class DatasetPutSchema(Schema):
     table_name = fields.String(allow_none=True, validate=Length(1, 250))
     database_id = fields.Integer()
@@ -126,6 +133,9 @@ class DatasetPutSchema(Schema):
     extra = fields.String(allow_none=True)
     is_managed_externally = fields.Boolean(allow_none=True, dump_default=False)
     external_url = fields.String(allow_none=True)
+    sdmx_refresh_schedule = fields.String(
+        allow_none=True, validate=[validate_crontab, Length(1, 1000)]
+    )
 
     def handle_error(
         self,
@@ -0,0 +1,73 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+
+from flask_appbuilder.models.sqla.interface import SQLAInterface
+
+from superset.connectors.sqla.models import SdmxIngestionLog
+from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
+from superset.datasets.filters import SdmxIngestionLogFilter
+from superset.datasets.sdmx_ingestions.schemas import openapi_spec_methods_override
+from superset.views.base_api import BaseSupersetModelRestApi
+
+logger = logging.getLogger(__name__)
+
+
+class SdmxIngestionLogRestApi(BaseSupersetModelRestApi):
+    datamodel = SQLAInterface(SdmxIngestionLog)
+
+    include_route_methods = {RouteMethod.GET, RouteMethod.GET_LIST}
+    method_permission_name = MODEL_API_RW_METHOD_PERMISSION_MAP
+
+    class_permission_name = "Dataset"
+    resource_name = "sdmx_ingestion"
+    allow_browser_login = True
+
+    base_filters = [["id", SdmxIngestionLogFilter, lambda: []]]
+    base_order = ("start_dttm", "desc")
+
+    show_columns = [
+        "id",
+        "table_id",
+        "sdmx_url",
+        "agency_id",
+        "dataflow_id",
+        "kind",
+        "state",
+        "start_dttm",
+        "end_dttm",
+        "duration_ms",
+        "rows",
+        "bytes_downloaded",
+        "dataframe_memory",
+        "stages",
+        "error_message",
+    ]
+    list_columns = show_columns
+    order_columns = [
+        "start_dttm",
+        "duration_ms",
+        "rows",
+        "bytes_downloaded",
+        "dataframe_memory",
+        "agency_id",
+        "dataflow_id",
+        "state",
+    ]
+    search_columns = ["table", "agency_id", "dataflow_id", "kind", "state"]
+    openapi_spec_tag = "Datasets"
+    openapi_spec_methods = openapi_spec_methods_override
@@ -22,6 +22,7 @@ import logging
 import re
 import warnings
 from datetime import datetime
+from operator import itemgetter
 from re import Match, Pattern
 from typing import (
     Any,
@@ -37,6 +38,7 @@ from urllib.parse import urlencode, urljoin
 from uuid import uuid4
 
 import pandas as pd
+import pyarrow as pa
 import requests
 import sqlparse
 from apispec import APISpec
@@ -438,6 +440,13 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
     # Driver-specific exception that should be mapped to OAuth2RedirectError
     oauth2_exception = OAuth2RedirectError
 
+    # Can the results of a query be fetched as a `pyarrow.Table` (see `fetch_arrow`)
+    # instead of a list of row tuples? Engine specs whose driver has a native
+    # columnar fetch should also override `fetch_arrow` to use it.
+    supports_arrow_fetch = False
+    # Number of rows converted to Arrow at a time by the default `fetch_arrow`
+    arrow_fetch_batch_size = 10_000
+
     # Does the query id related to the connection?
     # The default value is True, which means that the query id is determined when
     # the connection is created.
@@ -999,6 +1008,65 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         except Exception as ex:
             raise cls.get_dbapi_mapped_exception(ex) from ex
 
+    @classmethod
+    def fetch_arrow(cls, cursor: Any, limit: int | None = None) -> pa.Table:
+        """
+        Fetch the results of a query as a `pyarrow.Table`, for engine specs with
+        `supports_arrow_fetch`. By default the rows are converted to Arrow
+        `arrow_fetch_batch_size` at a time, so the whole result is never held as
+        Python tuples, after applying the `column_type_mutators`.
+
+        :param cursor: Cursor instance
+        :param limit: Maximum number of rows to be returned by the cursor
+        :return: Result of query
+        """
+        # pylint: disable=import-outside-toplevel
+        from superset.result_set import (
+            combine_chunks,
+            convert_to_string,
+            SupersetResultSet,
+        )
+
+        if cls.arraysize:
+            cursor.arraysize = cls.arraysize
+        if cls.limit_method != LimitMethod.FETCH_MANY:
+            limit = None
+        try:
+            description = cursor.description or []
+            chunks: list[list[pa.Array]] = [[] for _ in description]
+            # Values are normalized as in `fetch_data` before being converted
+            column_mutators = {
+                idx: func
+                for idx, row in enumerate(description)
+                if (
+                    func := cls.column_type_mutators.get(
+                        type(cls.get_sqla_column_type(cls.get_datatype(row[1])))
+                    )
+                )
+            }
+            fetched = 0
+            while limit is None or fetched < limit:
+                rows = cursor.fetchmany(
+                    min(cls.arrow_fetch_batch_size, limit - fetched)
+                    if limit
+                    else cls.arrow_fetch_batch_size
+                )
+                if not rows:
+                    break
+                fetched += len(rows)
+                for i, column in enumerate(chunks):
+                    values = list(map(itemgetter(i), rows))
+                    if func := column_mutators.get(i):
+                        values = [func(value) for value in values]
+                    column.append(SupersetResultSet.convert_column(values))
+        except Exception as ex:
+            raise cls.get_dbapi_mapped_exception(ex) from ex
+
+        return pa.Table.from_arrays(
+            [combine_chunks(column) for column in chunks],
+            names=[convert_to_string(row[0]) for row in description],
+        )
+
     @classmethod
     def expand_data(
         cls, columns: list[ResultSetColumnType], data: list[dict[Any, Any]]
@@ -43,6 +43,7 @@ class SqliteEngineSpec(BaseEngineSpec):
     engine_name = "SQLite"
 
     disable_ssh_tunneling = True
+    supports_arrow_fetch = True
 
     _time_grain_expressions = {
         None: "{col}",
@@ -33,6 +33,14 @@ and applying any filters (as well as sorting, limiting, and offsetting).
 
 Note that no aggregation is done on the database. Aggregations and other operations like
 joins and unions are done in memory, using the SQLite engine.
+
+SDMX dataflows can also be queried live, without ingesting them, by using an SDMX data
+URL as the table name:
+
+    > SELECT * FROM "https://data-api.ecb.europa.eu/service/data/EXR/M..EUR.SP00.A";
+
+Filters on the dimensions and on the time dimension are pushed down into the key and
+period range of the SDMX query, so that only the requested slice is downloaded.
 """  # noqa: E501
 
 from __future__ import annotations
@@ -40,6 +48,7 @@ from __future__ import annotations
 import datetime
 import decimal
 import operator
+import re
 import urllib.parse
 from collections.abc import Iterator
 from functools import partial, wraps
@@ -106,7 +115,7 @@ class SupersetAPSWDialect(APSWDialect):
             (),
             {
                 "path": ":memory:",
-                "adapters": ["superset"],
+                "adapters": ["superset", "sdmx"],
                 "adapter_kwargs": {
                     "superset": {
                         "prefix": None,
@@ -229,6 +238,10 @@ class SupersetShillelaghAdapter(Adapter):
         When using the Superset SQLAlchemy and DB engine spec the prefix is dropped, so
         that tables should have the format database[[.catalog].schema].table.
         """
+        # URLs are handled by other adapters, eg `SdmxShillelaghAdapter`
+        if "://" in uri:
+            return False
+
         parts = [urllib.parse.unquote(part) for part in uri.split(".")]
 
         if prefix is not None:
@@ -482,3 +495,180 @@ class SupersetShillelaghAdapter(Adapter):
         with self.engine_context() as engine:
             connection = engine.connect()
             connection.execute(query)
+
+
+class SdmxShillelaghAdapter(Adapter):
+    """
+    A Shillelagh adapter for SDMX dataflows.
+
+    The table name is an SDMX data URL, and the columns are the components of the
+    dataflow structure. Equality filters on dimensions are pushed down into the key
+    of the SDMX query, and filters on the time dimension into its `startPeriod` and
+    `endPeriod`, so that each query only downloads the slice it needs. Slices are
+    cached locally, see `read_sdmx_slice`.
+    """
+
+    safe = True
+
+    supports_limit = False
+    supports_offset = False
+
+    # Rows of an unfiltered dataflow; each filter pushed down makes it cheaper
+    average_number_of_rows = 100000
+
+    @staticmethod
+    def supports(uri: str, fast: bool = True, **kwargs: Any) -> bool:
+        """
+        Return if a table is an SDMX data URL of a known agency.
+        """
+        # pylint: disable=import-outside-toplevel
+        from superset.sdmx import get_agency_id
+
+        parsed = urllib.parse.urlparse(uri)
+        return (
+            parsed.scheme in {"http", "https"}
+            and "data" in parsed.path.split("/")
+            and get_agency_id(uri) is not None
+        )
+
+    @staticmethod
+    def parse_uri(uri: str) -> tuple[str]:
+        """
+        Pass URI through unmodified.
+        """
+        return (uri,)
+
+    def __init__(self, uri: str, **kwargs: Any):
+        if not feature_flag_manager.is_feature_enabled("ENABLE_SUPERSET_META_DB"):
+            raise ProgrammingError("Superset meta database is disabled")
+
+        super().__init__(**kwargs)
+
+        self.uri = uri
+        self._set_columns()
+
+    def _set_columns(self) -> None:
+        """
+        Read the components of the dataflow structure.
+        """
+        # pylint: disable=import-outside-toplevel
+        from superset.sdmx import get_sdmx_components
+
+        try:
+            (
+                self.dimensions,
+                self.time_dimension,
+                self.measures,
+                attributes,
+            ) = get_sdmx_components(self.uri)
+        except Exception as ex:  # pylint: disable=broad-except
+            raise ProgrammingError(f"Invalid SDMX dataflow: {self.uri}") from ex
+
+        self.columns: dict[str, Field] = {
+            dimension: String(filters=[Equal], order=Order.NONE, exact=True)
+            for dimension in self.dimensions
+        }
+        if self.time_dimension:
+            # Periods of other frequencies overlapping the range are returned too
+            self.columns[self.time_dimension] = String(
+                filters=[Equal, Range], order=Order.NONE, exact=False
+            )
+        for measure in self.measures:
+            self.columns[measure] = Float(order=Order.NONE)
+        for attribute in attributes:
+            self.columns.setdefault(attribute, String(order=Order.NONE))
+
+    def get_columns(self) -> dict[str, Field]:
+        """
+        Return table columns.
+        """
+        return self.columns
+
+    def get_cost(
+        self,
+        filtered_columns: list[tuple[str, Any]],
+        order: list[tuple[str, RequestedOrder]],
+    ) -> float:
+        """
+        Estimate the query cost, so that SQLite prefers pushing filters down.
+        """
+        return self.average_number_of_rows / 10 ** len(filtered_columns)
+
+    def _get_slice(
+        self, bounds: dict[str, Filter]
+    ) -> tuple[dict[str, set[str]], str | None, str | None]:
+        """
+        Convert the filters into the codes of each dimension and a period range.
+        """
+        codes: dict[str, set[str]] = {}
+        start_period = end_period = None
+        for column_name, filter_ in bounds.items():
+            if column_name == self.time_dimension:
+                if isinstance(filter_, Equal):
+                    start_period = end_period = filter_.value
+                elif isinstance(filter_, Range):
+                    start_period, end_period = filter_.start, filter_.end
+            elif isinstance(filter_, Equal):
+                codes[column_name] = {filter_.value}
+        return codes, get_sdmx_period(start_period), get_sdmx_period(end_period)
+
+    def get_data(
+        self,
+        bounds: dict[str, Filter],
+        order: list[tuple[str, RequestedOrder]],
+        **kwargs: Any,
+    ) -> Iterator[Row]:
+        """
+        Return the observations of the slice selected by the filters.
+        """
+        # pylint: disable=import-outside-toplevel
+        from superset.sdmx import build_sdmx_slice_url, read_sdmx_slice
+
+        codes, start_period, end_period = self._get_slice(bounds)
+        url = build_sdmx_slice_url(
+            self.uri, self.dimensions, codes, start_period, end_period
+        )
+        if url is None:
+            return
+
+        limit: int | None = current_app.config["SUPERSET_META_DB_LIMIT"]
+        rowid = 0
+        for observation in read_sdmx_slice(url):
+            # Keys that could not be narrowed are filtered here
+            if any(observation.get(name) not in codes[name] for name in codes):
+                continue
+            row = {column: observation.get(column) for column in self.columns}
+            for measure in self.measures:
+                row[measure] = get_sdmx_value(row[measure])
+            row["rowid"] = rowid
+            yield row
+
+            rowid += 1
+            if limit is not None and rowid >= limit:
+                break
+
+
+def get_sdmx_period(value: Any) -> str | None:
+    """
+    Convert a filter value to an SDMX period, eg, `2020-01-01 00:00:00` to `2020-01-01`.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    value = str(value)
+    if re.match(r"\d{4}-\d{2}-\d{2}[T ]", value):
+        return value[:10]
+    return value
+
+
+def get_sdmx_value(value: Any) -> float | None:
+    """
+    Convert an SDMX observation value to a float, missing values to `None`.
+    """
+    try:
+        return None if value is None else float(value)
+    except ValueError:
+        return None
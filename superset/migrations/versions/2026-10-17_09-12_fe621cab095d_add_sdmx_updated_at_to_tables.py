@@ -0,0 +1,38 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""add sdmx_updated_at to tables
+
+Revision ID: fe621cab095d
+Revises: 13aa403b69e9, 48cbb571fa3a
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "fe621cab095d"
+down_revision = ("13aa403b69e9", "48cbb571fa3a")
+
+
+def upgrade():
+    op.add_column("tables", sa.Column("sdmx_updated_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("tables", "sdmx_updated_at")
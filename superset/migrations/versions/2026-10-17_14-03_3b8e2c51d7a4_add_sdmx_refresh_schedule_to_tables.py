@@ -0,0 +1,41 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""add sdmx_refresh_schedule to tables
+
+Revision ID: 3b8e2c51d7a4
+Revises: fe621cab095d
+Create Date: 2026-10-17 14:03:27.512846
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3b8e2c51d7a4"
+down_revision = "fe621cab095d"
+
+
+def upgrade():
+    op.add_column(
+        "tables",
+        sa.Column("sdmx_refresh_schedule", sa.String(length=1000), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("tables", "sdmx_refresh_schedule")
@@ -0,0 +1,75 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""add sdmx_ingestion_log table
+
+Revision ID: 8d4f0a7c9e12
+Revises: 3b8e2c51d7a4
+Create Date: 2026-10-17 16:21:09.318204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d4f0a7c9e12"
+down_revision = "3b8e2c51d7a4"
+
+
+def upgrade():
+    op.create_table(
+        "sdmx_ingestion_log",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sdmx_url", sa.String(length=1024), nullable=False),
+        sa.Column("agency_id", sa.String(length=250), nullable=True),
+        sa.Column("dataflow_id", sa.String(length=250), nullable=True),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("state", sa.String(length=50), nullable=False),
+        sa.Column("start_dttm", sa.DateTime(), nullable=False),
+        sa.Column("end_dttm", sa.DateTime(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("rows", sa.Integer(), nullable=True),
+        sa.Column("bytes_downloaded", sa.BigInteger(), nullable=True),
+        sa.Column("dataframe_memory", sa.BigInteger(), nullable=True),
+        sa.Column("stages", sa.Text(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("table_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["table_id"], ["tables.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_sdmx_ingestion_log_agency_id"),
+        "sdmx_ingestion_log",
+        ["agency_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_sdmx_ingestion_log_dataflow_id"),
+        "sdmx_ingestion_log",
+        ["dataflow_id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_sdmx_ingestion_log_dataflow_id"), table_name="sdmx_ingestion_log"
+    )
+    op.drop_index(
+        op.f("ix_sdmx_ingestion_log_agency_id"), table_name="sdmx_ingestion_log"
+    )
+    op.drop_table("sdmx_ingestion_log")
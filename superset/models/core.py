@@ -34,6 +34,7 @@ from typing import Any, Callable, cast, TYPE_CHECKING
 
 import numpy
 import pandas as pd
+import pyarrow as pa
 import sqlalchemy as sqla
 import sshtunnel
 from flask import g, request
@@ -715,18 +716,22 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):  # pylint: disable
             return self.post_process_df(df)
 
     @event_logger.log_this
-    def fetch_rows(self, cursor: Any, last: bool) -> list[tuple[Any, ...]] | None:
+    def fetch_rows(
+        self, cursor: Any, last: bool
+    ) -> list[tuple[Any, ...]] | pa.Table | None:
         if not last:
             cursor.fetchall()
             return None
 
+        if self.db_engine_spec.supports_arrow_fetch:
+            return self.db_engine_spec.fetch_arrow(cursor)
         return self.db_engine_spec.fetch_data(cursor)
 
     @event_logger.log_this
     def load_into_dataframe(
         self,
         description: DbapiDescription,
-        data: list[tuple[Any, ...]],
+        data: list[tuple[Any, ...]] | pa.Table,
     ) -> pd.DataFrame:
         result_set = SupersetResultSet(
             data,
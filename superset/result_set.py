@@ -18,7 +18,9 @@
 
 import datetime
 import logging
-from typing import Any, Optional
+from collections.abc import Sequence
+from operator import itemgetter
+from typing import Any, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -99,20 +101,46 @@ def convert_to_string(value: Any) -> str:
     return str(value)
 
 
+# Number of leading values of a column looked at before converting it to Arrow
+TYPE_SAMPLE_SIZE = 100
+NESTED_PYTHON_TYPES = (list, tuple, dict, set)
+
+
+def stringify_column(values: Sequence[Any]) -> pa.Array:
+    """Convert the values of a column to an Arrow array of strings."""
+    array = np.fromiter(values, dtype=object, count=len(values))
+    return pa.array(stringify_values(array).tolist())
+
+
+def combine_chunks(chunks: list[pa.Array]) -> pa.ChunkedArray:
+    """
+    Combine the Arrow arrays of a column converted in batches. Numeric batches are
+    promoted to a common type, batches of incompatible types are stringified.
+    """
+    if not chunks:
+        return pa.chunked_array([], type=pa.null())
+    try:
+        return pa.concat_tables(
+            [pa.table({"column": chunk}) for chunk in chunks],
+            promote_options="permissive",
+        ).column(0)
+    except (pa.lib.ArrowInvalid, pa.lib.ArrowTypeError):
+        return pa.chunked_array(
+            [chunk.cast(pa.string()) for chunk in chunks], type=pa.string()
+        )
+
+
 class SupersetResultSet:
-    def __init__(  # pylint: disable=too-many-locals  # noqa: C901
+    def __init__(
         self,
-        data: DbapiResult,
+        data: Union[DbapiResult, pa.Table],
         cursor_description: DbapiDescription,
         db_engine_spec: type[BaseEngineSpec],
     ):
         self.db_engine_spec = db_engine_spec
-        data = data or []
         column_names: list[str] = []
         pa_data: list[pa.Array] = []
         deduped_cursor_desc: list[tuple[Any, ...]] = []
-        numpy_dtype: list[tuple[str, ...]] = []
-        stringified_arr: NDArray[Any]
 
         if cursor_description:
             # get deduped list of column names
@@ -126,55 +154,27 @@ class SupersetResultSet:
                 for column_name, description in zip(column_names, cursor_description)
             ]
 
-            # generate numpy structured array dtype
-            numpy_dtype = [(column_name, "object") for column_name in column_names]
-
-        # only do expensive recasting if datatype is not standard list of tuples
-        if data and (not isinstance(data, list) or not isinstance(data[0], tuple)):
-            data = [tuple(row) for row in data]
-        array = np.array(data, dtype=numpy_dtype)
-        if array.size > 0:
-            for column in column_names:
-                try:
-                    pa_data.append(pa.array(array[column].tolist()))
-                except (
-                    pa.lib.ArrowInvalid,
-                    pa.lib.ArrowTypeError,
-                    pa.lib.ArrowNotImplementedError,
-                    ValueError,
-                    TypeError,  # this is super hackey,
-                    # https://issues.apache.org/jira/browse/ARROW-7855
-                ):
-                    # attempt serialization of values as strings
-                    stringified_arr = stringify_values(array[column])
-                    pa_data.append(pa.array(stringified_arr.tolist()))
-
-        if pa_data:  # pylint: disable=too-many-nested-blocks
-            for i, column in enumerate(column_names):
-                if pa.types.is_nested(pa_data[i].type):
-                    # TODO: revisit nested column serialization once nested types
-                    #  are added as a natively supported column type in Superset
-                    #  (superset.utils.core.GenericDataType).
-                    stringified_arr = stringify_values(array[column])
-                    pa_data[i] = pa.array(stringified_arr.tolist())
-
-                elif pa.types.is_temporal(pa_data[i].type):
-                    # workaround for bug converting
-                    # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
-                    # related: https://issues.apache.org/jira/browse/ARROW-5248
-                    sample = self.first_nonempty(array[column])
-                    if sample and isinstance(sample, datetime.datetime):
-                        try:
-                            if sample.tzinfo:
-                                tz = sample.tzinfo
-                                series = pd.Series(array[column])
-                                series = pd.to_datetime(series)
-                                pa_data[i] = pa.Array.from_pandas(
-                                    series,
-                                    type=pa.timestamp("ns", tz=tz),
-                                )
-                        except Exception as ex:  # pylint: disable=broad-except
-                            logger.exception(ex)
+        if isinstance(data, pa.Table):
+            # columnar fetches from the driver are used as is, nested columns
+            # are stringified as for DB-API rows
+            if not cursor_description:
+                column_names = dedup(data.column_names)
+            if data.num_rows:
+                pa_data = [
+                    stringify_column(column.to_pylist())
+                    if pa.types.is_nested(column.type)
+                    else column.combine_chunks()
+                    for column in data.columns
+                ]
+        elif data:
+            # rows are transposed one column at a time, so only the values of
+            # the column being converted are held in a Python list
+            if not isinstance(data, (list, tuple)):
+                data = list(data)
+            pa_data = [
+                self.convert_column(list(map(itemgetter(i), data)))
+                for i in range(len(column_names))
+            ]
 
         if not pa_data:
             column_names = []
@@ -191,6 +191,57 @@ class SupersetResultSet:
         except Exception as ex:  # pylint: disable=broad-except
             logger.exception(ex)
 
+    @classmethod
+    def convert_column(cls, values: Sequence[Any]) -> pa.Array:
+        """
+        Convert the values of a column to an Arrow array. The leading values are
+        sampled first so nested columns go straight to their string form, and
+        only columns Arrow cannot convert are stringified.
+        """
+        # TODO: revisit nested column serialization once nested types
+        #  are added as a natively supported column type in Superset
+        #  (superset.utils.core.GenericDataType).
+        if any(
+            isinstance(value, NESTED_PYTHON_TYPES)
+            for value in values[:TYPE_SAMPLE_SIZE]
+        ):
+            return stringify_column(values)
+
+        try:
+            array = pa.array(values)
+        except (
+            pa.lib.ArrowInvalid,
+            pa.lib.ArrowTypeError,
+            pa.lib.ArrowNotImplementedError,
+            ValueError,
+            TypeError,  # this is super hackey,
+            # https://issues.apache.org/jira/browse/ARROW-7855
+        ):
+            # attempt serialization of values as strings
+            return stringify_column(values)
+
+        if pa.types.is_nested(array.type):
+            return stringify_column(values)
+
+        if pa.types.is_temporal(array.type):
+            # workaround for bug converting
+            # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
+            # related: https://issues.apache.org/jira/browse/ARROW-5248
+            sample = cls.first_nonempty(values)
+            if sample and isinstance(sample, datetime.datetime):
+                try:
+                    if sample.tzinfo:
+                        tz = sample.tzinfo
+                        series = pd.Series(values)
+                        series = pd.to_datetime(series)
+                        array = pa.Array.from_pandas(
+                            series,
+                            type=pa.timestamp("ns", tz=tz),
+                        )
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.exception(ex)
+        return array
+
     @staticmethod
     def convert_pa_dtype(pa_dtype: pa.DataType) -> Optional[str]:
         if pa.types.is_boolean(pa_dtype):
@@ -213,7 +264,7 @@ class SupersetResultSet:
             return table.to_pandas(integer_object_nulls=True, timestamp_as_object=True)
 
     @staticmethod
-    def first_nonempty(items: NDArray[Any]) -> Any:
+    def first_nonempty(items: Sequence[Any]) -> Any:
         return next((i for i in items if i), None)
 
     def is_temporal(self, db_type_str: Optional[str]) -> bool:
@@ -5,45 +5,1985 @@ import pandas as pd
 from sdmxthon.webservices import webservices
 from sdmxthon.api.api import get_supported_agencies
 from sdmxthon import read_sdmx
-from superset.connectors.sqla.models import SqlaTable
-from superset.extensions import security_manager
+from sdmxthon.parsers.read import read_xml
+from sdmxthon.model.component import TimeDimension
+from superset.commands.distributed_lock.get import GetDistributedLock
+from superset.connectors.sqla.models import SdmxIngestionLog, SqlaTable
+from superset.distributed_lock import KeyValueDistributedLock
+from superset.exceptions import CreateKeyValueDistributedLockFailedException
+from superset.extensions import (
+    cache_manager,
+    event_logger,
+    security_manager,
+    stats_logger_manager,
+)
+from superset.extensions.metastore_cache import SupersetMetastoreCache
+from superset.models.core import Database
 from superset.models.slice import Slice
-from superset.dashboards.commands.create import CreateDashboardCommand
-from superset.databases.commands.create import CreateDatabaseCommand
+from superset.commands.dashboard.create import CreateDashboardCommand
+from superset.commands.database.create import CreateDatabaseCommand
+from superset.connectors.sqla.utils import format_physical_columns
+from superset.daos.dashboard import DashboardDAO
+from superset.daos.database import DatabaseDAO
+from superset.sql_parse import Table
 from superset import db
+from superset.utils.hashing import md5_sha_from_str
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from croniter import croniter
+from flask import current_app
+from io import BytesIO
+import base64
+import io
 import json
+import logging
+import os
+import random
 import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+logger = logging.getLogger(__name__)
+
+# Stages reported, in this order, to the `progress(stage, sdmx_url)` callback
+# of the loading functions
+INGESTION_STAGES = (
+    "fetching",
+    "parsing",
+    "joining_codelists",
+    "writing",
+    "indexing",
+    "registering",
+)
+
+
+def load_database(
+    sdmx_url, dataset_instance=None, is_raw_url=False, streaming=None, progress=None
+):
+    """
+    Load an SDMX query into a new dataset, or reload the store of an existing one.
+    New datasets of a query already stored are attached to its store without
+    downloading it again.
+    """
+    if dataset_instance is not None:
+        ingestion = ingest_sdmx(
+            sdmx_url, dataset_instance.sdmx_uuid, is_raw_url, streaming, progress
+        )
+        return register_sdmx_dataset(ingestion, dataset_instance, progress)
+
+    store_key = get_sdmx_store_key(sdmx_url, is_raw_url)
+    dataset = attach_sdmx_dataset(store_key, sdmx_url, progress)
+    if dataset is not None:
+        return dataset
+    ingestion = ingest_sdmx(
+        sdmx_url,
+        store_key,
+        is_raw_url,
+        streaming,
+        progress,
+        database_path=_staging_path(store_key),
+    )
+    return register_sdmx_dataset(ingestion, progress=progress)
 
 
-def load_database(sdmx_url, dataset_instance=None, is_raw_url=False):
-    # Extract main data and identifiers
-    message = read_sdmx(sdmx_url)
-    agency_id, dataflow_id = get_identifiers(sdmx_url)
-    data = extract_data_from_message(message)
+def load_dashboard(spec, locale="en", progress=None):
+    """
+    Create a dashboard, its datasets and its charts from a YAML specification.
+    The SDMX queries not stored yet are downloaded first, then the databases,
+    datasets, permissions and charts are created in a single transaction, with
+    the metadata of each SQLite store introspected once.
+    :param spec: Parsed dashboard specification
+    :param locale: Locale of the chart labels
+    :param progress: Optional callback receiving the ingestion stages
+    :return: The created dashboard
+    """
+    sdmx_urls = [row["DATA"].split(" ")[0] for row in spec["Rows"] if row["DATA"]]
+    distinct_urls = {}
+    for sdmx_url in sdmx_urls:
+        distinct_urls.setdefault(get_sdmx_store_key(sdmx_url), sdmx_url)
+
+    stores = get_registered_sdmx_stores(distinct_urls)
+    ingestions = _ingest_sdmx_queries(
+        {key: url for key, url in distinct_urls.items() if key not in stores}, progress
+    )
+
+    placed_paths = []
+    try:
+        datasets_by_key = _add_sdmx_datasets(
+            distinct_urls, stores, ingestions, placed_paths, progress
+        )
+        loaded_datasets = iter(
+            datasets_by_key[get_sdmx_store_key(sdmx_url)] for sdmx_url in sdmx_urls
+        )
+        datasets = [
+            next(loaded_datasets) if row["DATA"] else None for row in spec["Rows"]
+        ]
+        dashboard = create_dashboard(spec, commit=False)
+        # Charts reference the ids of the dashboard and datasets
+        db.session.flush()
+        create_charts(spec, datasets, dashboard, locale, commit=False)
+        db.session.commit()
+    except Exception as ex:
+        db.session.rollback()
+        for ingestion in ingestions.values():
+            if os.path.exists(ingestion["database_path"]):
+                os.remove(ingestion["database_path"])
+        for database_path in placed_paths:
+            os.remove(database_path)
+        for ingestion in ingestions.values():
+            record_sdmx_ingestion(ingestion["metrics"], error=ex)
+        raise
+
+    for key, ingestion in ingestions.items():
+        record_sdmx_ingestion(ingestion["metrics"], datasets_by_key[key])
+    return dashboard
+
+
+def _add_sdmx_datasets(distinct_urls, stores, ingestions, placed_paths, progress):
+    """
+    Add the datasets of SDMX queries to the session without committing: queries
+    already stored get a view on their store, and new stores are moved in place.
+    :param distinct_urls: SDMX URLs by store key
+    :param stores: Oldest dataset of the registered stores, by store key
+    :param ingestions: Ingestions of the other queries, by store key
+    :param placed_paths: List receiving the paths of the stores moved in place
+    :param progress: Optional callback receiving the ingestion stages
+    :return: Datasets by store key
+    """
+    # Another load of the same queries may have registered them meanwhile
+    for key, source in get_registered_sdmx_stores(ingestions).items():
+        os.remove(ingestions[key]["database_path"])
+        stores[key] = source
+    for key, ingestion in ingestions.items():
+        if key not in stores:
+            os.replace(ingestion["database_path"], f"dbs/{key}")
+            placed_paths.append(f"dbs/{key}")
+
+    datasets = {}
+    for key, sdmx_url in distinct_urls.items():
+        _report_progress(progress, "registering", sdmx_url)
+        if key in stores:
+            database = stores[key].database
+            new_datasets = [_new_store_dataset(stores[key], sdmx_url)]
+            stats_logger_manager.instance.incr("sdmx.store.reused")
+        else:
+            database = _get_or_add_store_database(key)
+            new_datasets = _new_sdmx_datasets(database, ingestions[key])
+        fetch_sdmx_store_metadata(database, new_datasets)
+        datasets[key] = new_datasets[-1]
+    return datasets
+
+
+def load_datasets(sdmx_urls, progress=None):
+    """
+    Load the datasets of several SDMX URLs. Identical queries (after
+    normalization) are loaded once and share the same dataset, queries already
+    stored are attached to their store, and the others are downloaded and
+    stored concurrently by at most SDMX_MAX_PARALLEL_LOADS workers.
+    :param sdmx_urls: List of SDMX URLs
+    :param progress: Optional callback receiving the ingestion stages
+    :return: List of datasets, in the same order as the URLs
+    """
+    distinct_urls = {}
+    for sdmx_url in sdmx_urls:
+        distinct_urls.setdefault(get_sdmx_store_key(sdmx_url), sdmx_url)
+
+    datasets = {}
+    for key, sdmx_url in distinct_urls.items():
+        dataset = attach_sdmx_dataset(key, sdmx_url, progress)
+        if dataset is not None:
+            datasets[key] = dataset
+
+    ingestions = _ingest_sdmx_queries(
+        {key: url for key, url in distinct_urls.items() if key not in datasets},
+        progress,
+    )
+    for key, ingestion in ingestions.items():
+        datasets[key] = register_sdmx_dataset(ingestion, progress=progress)
+    return [datasets[get_sdmx_store_key(sdmx_url)] for sdmx_url in sdmx_urls]
+
+
+def _ingest_sdmx_queries(urls_by_key, progress=None):
+    """
+    Download SDMX queries into staging stores, concurrently with at most
+    SDMX_MAX_PARALLEL_LOADS workers.
+    :param urls_by_key: SDMX URLs by store key
+    :return: Ingestions by store key
+    """
+    app = current_app._get_current_object()
+    staging_paths = {key: _staging_path(key) for key in urls_by_key}
+
+    def ingest(key):
+        with app.app_context():
+            return ingest_sdmx(
+                urls_by_key[key],
+                key,
+                progress=progress,
+                database_path=staging_paths[key],
+            )
+
+    max_workers = min(current_app.config["SDMX_MAX_PARALLEL_LOADS"], len(staging_paths))
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        futures = {key: executor.submit(ingest, key) for key in staging_paths}
+    try:
+        return {key: future.result() for key, future in futures.items()}
+    except Exception:
+        # Do not leave orphan SQLite stores behind when a query fails
+        for database_path in staging_paths.values():
+            if os.path.exists(database_path):
+                os.remove(database_path)
+        raise
+
+
+def normalize_sdmx_url(sdmx_url):
+    """
+    Normalize an SDMX URL so that equivalent queries compare equal: scheme and
+    host are lowercased, query parameters sorted and fragments removed.
+    """
+    url = urlparse(sdmx_url.strip())
+    query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)), safe=":")
+    return urlunparse(
+        url._replace(
+            scheme=url.scheme.lower(),
+            netloc=url.netloc.lower(),
+            path=url.path.rstrip("/"),
+            query=query,
+            fragment="",
+        )
+    )
+
+
+def ingest_sdmx(
+    sdmx_url,
+    dataset_uuid,
+    is_raw_url=False,
+    streaming=None,
+    progress=None,
+    database_path=None,
+):
+    """
+    Download an SDMX dataset and write it to the SQLite store `dbs/<dataset_uuid>`.
+    This does not create any Superset object, so it can run outside of the request
+    thread; `register_sdmx_dataset` creates the database and dataset afterwards.
+    :param database_path: Path to write the store to instead, new stores are
+                          written aside and moved in place when registered
+    :return: Dictionary describing the ingestion
+    """
+    if streaming is None:
+        streaming = current_app.config["SDMX_STREAMING_INGESTION"]
+
+    normalized = current_app.config["SDMX_NORMALIZED_CODELISTS"]
+    metrics = IngestionMetrics(sdmx_url)
+    database_path = database_path or f"dbs/{dataset_uuid}"
+    try:
+        if streaming:
+            concepts_name, table_names = _ingest_streaming(
+                sdmx_url, database_path, is_raw_url, progress, normalized, metrics
+            )
+        else:
+            concepts_name, table_names = _ingest_dataframe(
+                sdmx_url, database_path, is_raw_url, progress, normalized, metrics
+            )
+
+        index_plan = {}
+        if current_app.config["SDMX_AUTO_INDEXES"]:
+            _report_progress(progress, "indexing", sdmx_url)
+            with metrics.stage("index"):
+                index_plan = create_sdmx_indexes(
+                    database_path, table_names, concepts_name
+                )
+    except Exception as ex:
+        record_sdmx_ingestion(metrics, error=ex)
+        raise
+
+    return {
+        "sdmx_url": sdmx_url,
+        "dataset_uuid": dataset_uuid,
+        "database_path": database_path,
+        "concepts_name": concepts_name,
+        "table_names": table_names,
+        "index_plan": index_plan,
+        "started_at": metrics.started_at,
+        "metrics": metrics,
+    }
+
+
+def register_sdmx_dataset(ingestion, dataset_instance=None, progress=None):
+    """
+    Create or update the database and dataset of an ingested SDMX store, and
+    record the ingestion in the dataset history.
+    """
+    _report_progress(progress, "registering", ingestion["sdmx_url"])
+    metrics = ingestion["metrics"]
+    dataset_uuid = ingestion["dataset_uuid"]
+    database_path = f"dbs/{dataset_uuid}"
+    try:
+        if dataset_instance is None:
+            # Another load of the same query may have registered it meanwhile,
+            # the dataset is then recorded as a reuse and the download dropped
+            dataset = attach_sdmx_dataset(dataset_uuid, ingestion["sdmx_url"])
+            if dataset is not None:
+                os.remove(ingestion["database_path"])
+                return dataset
+            os.replace(ingestion["database_path"], database_path)
+
+        database = get_or_create_database(dataset_instance, dataset_uuid)
+        if dataset_instance is not None:
+            drop_stale_tables(database_path, ingestion["table_names"])
+
+        # Update table permissions and metadata
+        dataset = update_permissions_and_metadata(
+            database,
+            dataset_instance,
+            dataset_uuid,
+            ingestion["sdmx_url"],
+            ingestion["concepts_name"],
+            ingestion["started_at"],
+            ingestion["table_names"],
+            ingestion["index_plan"],
+            metrics,
+        )
+        if dataset_instance is not None:
+            with metrics.stage("update_permissions"):
+                update_sdmx_store_datasets(dataset_instance)
+    except Exception as ex:
+        record_sdmx_ingestion(metrics, dataset_instance, error=ex)
+        raise
+
+    record_sdmx_ingestion(metrics, dataset)
+    return dataset
+
+
+def get_sdmx_store_key(sdmx_url, is_raw_url=False):
+    """
+    Key of the SQLite store of an SDMX query, derived from the normalized query
+    (agency, flow, key, period range...) so that equivalent queries share a store.
+    """
+    key = normalize_sdmx_url(sdmx_url)
+    if is_raw_url:
+        # Raw stores do not have the codelist labels
+        key = f"raw:{key}"
+    return md5_sha_from_str(key)
+
+
+def _staging_path(store_key):
+    return f"dbs/{store_key}.{uuid.uuid4().hex}.tmp"
+
+
+# Separates the table of an SDMX store from the suffix of the view giving each
+# additional dataset of the store its own table name
+_STORE_VIEW_SEPARATOR = " #"
+
+
+def get_store_table(table_name):
+    """Return the store table a dataset table or view reads from."""
+    return table_name.split(_STORE_VIEW_SEPARATOR, 1)[0]
+
+
+def create_store_view(database_path, store_table, suffix=None):
+    """
+    Create a view on a table of an SDMX store, so that several datasets of the
+    same store do not share a table name.
+    :return: Name of the view
+    """
+    name = f"{store_table}{_STORE_VIEW_SEPARATOR}{suffix or uuid.uuid4().hex[:8]}"
+    with sqlite3.connect(database_path) as conn:
+        conn.execute(
+            f"CREATE VIEW IF NOT EXISTS {_quote_identifier(name)} AS "  # noqa: S608
+            f"SELECT * FROM {_quote_identifier(store_table)}"
+        )
+    return name
+
+
+def get_sdmx_store_datasets(store_key):
+    """Return the datasets referencing an SDMX store, oldest first."""
+    if not store_key:
+        return []
+    return (
+        db.session.query(SqlaTable)
+        .filter(SqlaTable.sdmx_uuid == store_key)
+        .order_by(SqlaTable.id)
+        .all()
+    )
+
+
+def attach_sdmx_dataset(store_key, sdmx_url, progress=None):
+    """
+    Create and commit a dataset on an SDMX store already registered by another
+    dataset, instead of downloading the same query again, and record it in the
+    ingestion history as a reuse.
+    :return: The new dataset, None if the store is not registered
+    """
+    datasets = get_sdmx_store_datasets(store_key)
+    database_path = f"dbs/{store_key}"
+    if not datasets or not os.path.exists(database_path):
+        return None
+
+    _report_progress(progress, "registering", sdmx_url)
+    metrics = IngestionMetrics(sdmx_url, kind="reuse")
+    dataset = _new_store_dataset(datasets[0], sdmx_url)
+    db.session.add(dataset)
+    dataset.fetch_metadata()
+    _use_time_period_start(dataset)
+    db.session.commit()
+    stats_logger_manager.instance.incr("sdmx.store.reused")
+    record_sdmx_ingestion(metrics, dataset)
+    return dataset
+
+
+def get_registered_sdmx_stores(store_keys):
+    """
+    Return the oldest dataset of each registered SDMX store, with one query.
+    :param store_keys: Keys of the stores to look up
+    :return: Datasets by store key, for the stores found
+    """
+    if not store_keys:
+        return {}
+    stores = {}
+    for dataset in (
+        db.session.query(SqlaTable)
+        .filter(SqlaTable.sdmx_uuid.in_(list(store_keys)))
+        .order_by(SqlaTable.id)
+    ):
+        if os.path.exists(f"dbs/{dataset.sdmx_uuid}"):
+            stores.setdefault(dataset.sdmx_uuid, dataset)
+    return stores
+
+
+def _new_store_dataset(source, sdmx_url):
+    """Create a dataset reading the store of another dataset through a new view."""
+    store_key = source.sdmx_uuid
+    return SqlaTable(
+        table_name=create_store_view(
+            f"dbs/{store_key}", get_store_table(source.table_name)
+        ),
+        database=source.database,
+        schema=source.schema,
+        is_sdmx=True,
+        sdmx_url=sdmx_url,
+        sdmx_uuid=store_key,
+        concepts=source.concepts,
+        sdmx_updated_at=source.sdmx_updated_at,
+        extra=source.extra,
+    )
+
+
+def _new_sdmx_datasets(database, ingestion):
+    """Create the datasets of the tables of a new SDMX store."""
+    datasets = []
+    for table_name in ingestion["table_names"]:
+        dataset = SqlaTable(
+            table_name=table_name,
+            database=database,
+            schema="main",
+            is_sdmx=True,
+            sdmx_url=ingestion["sdmx_url"],
+            sdmx_uuid=ingestion["dataset_uuid"],
+            concepts=json.dumps(ingestion["concepts_name"]),
+            sdmx_updated_at=ingestion["started_at"],
+        )
+        dataset.extra = json.dumps(
+            {"sdmx_indexes": ingestion["index_plan"].get(table_name, [])}
+        )
+        db.session.add(dataset)
+        datasets.append(dataset)
+    return datasets
+
+
+def fetch_sdmx_store_metadata(database, datasets):
+    """
+    Fetch the columns and metrics of several datasets of an SDMX store with a
+    single inspector, instead of several connections per dataset.
+    :param database: Database of the store
+    :param datasets: Datasets of the store
+    """
+    db_engine_spec = database.db_engine_spec
+    with database.get_inspector(schema="main") as inspector:
+        for dataset in datasets:
+            table = Table(dataset.table_name, dataset.schema)
+            columns = db_engine_spec.get_columns(
+                inspector, table, database.schema_options
+            )
+            dataset.fetch_metadata(
+                format_physical_columns(database, columns, dataset.normalize_columns),
+                db_engine_spec.get_metrics(database, inspector, table),
+            )
+            _use_time_period_start(dataset)
+
+
+def update_sdmx_store_datasets(dataset_instance):
+    """
+    Bring the other datasets of the store of a refreshed SDMX dataset up to
+    date, so a store is refreshed once for all its datasets. After a full
+    reload they read the new store tables through new views.
+    """
+    database_path = f"dbs/{dataset_instance.sdmx_uuid}"
+    store_table = get_store_table(dataset_instance.table_name)
+    for dataset in get_sdmx_store_datasets(dataset_instance.sdmx_uuid):
+        if dataset.id == dataset_instance.id:
+            continue
+        if get_store_table(dataset.table_name) != store_table:
+            _, _, suffix = dataset.table_name.partition(_STORE_VIEW_SEPARATOR)
+            dataset.table_name = create_store_view(database_path, store_table, suffix)
+        dataset.sdmx_updated_at = dataset_instance.sdmx_updated_at
+        db.session.add(dataset)
+        db.session.commit()
+        dataset.fetch_metadata()
+        _use_time_period_start(dataset)
+
+
+def _report_progress(progress, stage, sdmx_url):
+    if progress is not None:
+        progress(stage, sdmx_url)
+
+
+class IngestionMetrics:
+    """
+    Wall time spent in each stage of an SDMX ingestion, with the number of rows
+    written, the bytes downloaded and the memory of the parsed DataFrames.
+    Stages can be nested or interleaved (streaming ingestion), the time is
+    always attributed to the innermost running stage.
+    """
+
+    def __init__(self, sdmx_url, kind="full"):
+        self.sdmx_url = sdmx_url
+        self.kind = kind
+        self.agency_id = get_agency_id(sdmx_url)
+        try:
+            self.dataflow_id = get_dataflow_id(sdmx_url)
+        except IndexError:
+            # Local files and raw URLs
+            self.dataflow_id = None
+        self.started_at = datetime.datetime.utcnow()
+        self.stages = {}
+        self.rows = 0
+        self.bytes_downloaded = 0
+        self.dataframe_memory = None
+        self._stage = None
+        self._clock = time.perf_counter()
+
+    def _switch(self, stage):
+        """Charge the time elapsed to the running stage and start another one."""
+        now = time.perf_counter()
+        if self._stage is not None:
+            elapsed = (now - self._clock) * 1000
+            self.stages[self._stage] = self.stages.get(self._stage, 0) + elapsed
+        previous = self._stage
+        self._stage, self._clock = stage, now
+        return previous
+
+    @contextmanager
+    def stage(self, name):
+        previous = self._switch(name)
+        try:
+            yield
+        finally:
+            self._switch(previous)
+
+    def timed_batches(self, batches, name, count_rows=False):
+        """
+        Attribute the time spent producing each observation batch of a
+        generator to a stage.
+        :param batches: Iterable of (structure name, list of observation dicts)
+        :param name: Stage of the generator
+        :param count_rows: Count the observations of the batches as written rows
+        """
+        batches = iter(batches)
+        while True:
+            with self.stage(name):
+                batch = next(batches, None)
+            if batch is None:
+                return
+            if count_rows:
+                self.rows += len(batch[1])
+            yield batch
+
+    def add_dataframe(self, df):
+        """Count the rows and memory of a DataFrame about to be written."""
+        self.rows += len(df)
+        memory = int(df.memory_usage(deep=True).sum())
+        self.dataframe_memory = (self.dataframe_memory or 0) + memory
+
+
+class _MeteredReader(io.RawIOBase):
+    """Raw stream charging the time spent reading it to the http_fetch stage."""
+
+    def __init__(self, raw, metrics):
+        self.raw = raw
+        self.metrics = metrics
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        with self.metrics.stage("http_fetch"):
+            return self.raw.readinto(buffer)
+
+
+def record_sdmx_ingestion(metrics, dataset_instance=None, error=None):
+    """
+    Emit the metrics of a finished SDMX ingestion to the stats logger and the
+    event logger, and add it to the ingestion history. Failing to record does
+    not fail the ingestion.
+    :param metrics: IngestionMetrics of the ingestion
+    :param dataset_instance: Loaded or refreshed dataset, if any
+    :param error: Exception that made the ingestion fail
+    """
+    end_dttm = datetime.datetime.utcnow()
+    duration = end_dttm - metrics.started_at
+    duration_ms = int(duration.total_seconds() * 1000)
+    state = "error" if error is not None else "success"
+    stages = {stage: round(ms, 3) for stage, ms in metrics.stages.items()}
+
+    stats_logger = stats_logger_manager.instance
+    stats_logger.incr(f"sdmx.ingestion.{state}")
+    stats_logger.timing("sdmx.ingestion.duration", duration_ms)
+    for stage, ms in stages.items():
+        stats_logger.timing(f"sdmx.ingestion.stage.{stage}", ms)
+    if metrics.agency_id and metrics.dataflow_id:
+        key = f"sdmx.ingestion.{metrics.agency_id}.{metrics.dataflow_id}"
+        stats_logger.timing(f"{key}.duration", duration_ms)
+        stats_logger.gauge(f"{key}.rows", metrics.rows)
+        stats_logger.gauge(f"{key}.bytes_downloaded", metrics.bytes_downloaded)
+    stats_logger.gauge("sdmx.ingestion.rows", metrics.rows)
+    stats_logger.gauge("sdmx.ingestion.bytes_downloaded", metrics.bytes_downloaded)
+    if metrics.dataframe_memory is not None:
+        stats_logger.gauge("sdmx.ingestion.dataframe_memory", metrics.dataframe_memory)
+
+    try:
+        if error is not None:
+            db.session.rollback()
+        dataset_id = dataset_instance.id if dataset_instance is not None else None
+        event_logger.log_with_context(
+            action="sdmx_ingestion",
+            duration=duration,
+            log_to_statsd=False,
+            sdmx_url=metrics.sdmx_url,
+            agency_id=metrics.agency_id,
+            dataflow_id=metrics.dataflow_id,
+            dataset_id=dataset_id,
+            kind=metrics.kind,
+            state=state,
+            rows=metrics.rows,
+            bytes_downloaded=metrics.bytes_downloaded,
+            dataframe_memory=metrics.dataframe_memory,
+            stages=stages,
+        )
+        db.session.add(
+            SdmxIngestionLog(
+                sdmx_url=metrics.sdmx_url,
+                agency_id=metrics.agency_id,
+                dataflow_id=metrics.dataflow_id,
+                kind=metrics.kind,
+                state=state,
+                start_dttm=metrics.started_at,
+                end_dttm=end_dttm,
+                duration_ms=duration_ms,
+                rows=metrics.rows,
+                bytes_downloaded=metrics.bytes_downloaded,
+                dataframe_memory=metrics.dataframe_memory,
+                stages=json.dumps(stages),
+                error_message=str(error) if error is not None else None,
+                table_id=dataset_id,
+            )
+        )
+        db.session.commit()
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Could not record the ingestion of %s", metrics.sdmx_url)
+        db.session.rollback()
+
+
+def _ingest_dataframe(
+    sdmx_url,
+    database_path,
+    is_raw_url=False,
+    progress=None,
+    normalized=False,
+    metrics=None,
+):
+    """
+    Load the whole SDMX message in a DataFrame, merge the codelists and write it
+    to SQLite. In normalized mode the codelists are written as lookup tables
+    instead of being merged, see `normalize_codelists`.
+    :return: Tuple with the concepts names and the created table names
+    """
+    if metrics is None:
+        metrics = IngestionMetrics(sdmx_url)
+
+    # Extract main data
+    _report_progress(progress, "fetching", sdmx_url)
+    datasets = read_sdmx_data(sdmx_url, metrics)
+    _report_progress(progress, "parsing", sdmx_url)
 
     concepts_name = {}
-    if not is_raw_url:
+    lookups = {}
+    metadata = None
+    if normalized and not is_raw_url:
+        concepts_name, lookups = _fetch_codelist_lookups(sdmx_url, metrics)
+    elif not is_raw_url:
+        _report_progress(progress, "joining_codelists", sdmx_url)
         # Get the required web service
+        agency_id, dataflow_id = get_identifiers(sdmx_url)
         ws = get_webservice_for_agency(agency_id)
 
         # Fetch metadata
-        metadata = fetch_metadata(ws, dataflow_id)
+        with metrics.stage("fetch_metadata"):
+            metadata = fetch_metadata(ws, dataflow_id, get_dataflow_version(sdmx_url))
+
+    _report_progress(progress, "writing", sdmx_url)
+    engine = create_engine(f"sqlite:///{database_path}", echo=False)
+    table_names = []
+    for dataset, df in datasets.items():
+        if metadata is not None:
+            # Generate the final dataframe and concepts names
+            with metrics.stage("join_codelists"):
+                df, concepts_name = generate_final_df_and_concepts_name(
+                    df, metadata.payload
+                )
+        if current_app.config["SDMX_PARSE_TIME_PERIOD"]:
+            with metrics.stage("parse_time_periods"):
+                df = add_time_period_columns(df)
+        metrics.add_dataframe(df)
+        table_names.append(str(dataset) + " " + str(datetime.datetime.now()))
+        with metrics.stage("write"):
+            df.to_sql(table_names[-1], con=engine)
+
+    if lookups:
+        _report_progress(progress, "joining_codelists", sdmx_url)
+        with metrics.stage("join_codelists"):
+            normalize_codelists(database_path, table_names, lookups)
+    return concepts_name, table_names
+
+
+def _ingest_streaming(
+    sdmx_url,
+    database_path,
+    is_raw_url=False,
+    progress=None,
+    normalized=False,
+    metrics=None,
+):
+    """
+    Parse the SDMX data message incrementally and write bounded-size batches of
+    observations to SQLite inside a single transaction. Peak memory depends on
+    SDMX_INGESTION_BATCH_SIZE instead of the dataset size.
+    :return: Tuple with the concepts names and the created table names
+    """
+    if metrics is None:
+        metrics = IngestionMetrics(sdmx_url)
+
+    _report_progress(progress, "fetching", sdmx_url)
+    lookups = {}
+    concepts_name = {}
+    if not is_raw_url:
+        concepts_name, lookups = _fetch_codelist_lookups(sdmx_url, metrics)
+
+    batch_size = current_app.config["SDMX_INGESTION_BATCH_SIZE"]
+    with open_sdmx_stream(sdmx_url, metrics) as stream:
+        # The stages below run interleaved, one batch at a time
+        _report_progress(progress, "parsing", sdmx_url)
+        batches = metrics.timed_batches(iter_sdmx_data(stream, batch_size), "parse")
+        if current_app.config["SDMX_PARSE_TIME_PERIOD"]:
+            batches = metrics.timed_batches(
+                apply_time_period_columns(batches), "parse_time_periods"
+            )
+        if not normalized:
+            _report_progress(progress, "joining_codelists", sdmx_url)
+            batches = metrics.timed_batches(
+                apply_codelist_lookups(batches, lookups), "join_codelists"
+            )
+        _report_progress(progress, "writing", sdmx_url)
+        with metrics.stage("write"):
+            table_names = write_sdmx_batches(
+                database_path, metrics.timed_batches(batches, "write", True)
+            )
+
+    if normalized and lookups:
+        _report_progress(progress, "joining_codelists", sdmx_url)
+        with metrics.stage("join_codelists"):
+            normalize_codelists(database_path, table_names, lookups)
+    return concepts_name, table_names
+
+
+def _fetch_codelist_lookups(sdmx_url, metrics=None):
+    """
+    Fetch the structure of the dataflow of an SDMX URL.
+    :return: Tuple with the concepts names and the codelist lookups per dimension
+    """
+    agency_id, dataflow_id = get_identifiers(sdmx_url)
+    ws = get_webservice_for_agency(agency_id)
+    if metrics is None:
+        metrics = IngestionMetrics(sdmx_url)
+    with metrics.stage("fetch_metadata"):
+        metadata = fetch_metadata(ws, dataflow_id, get_dataflow_version(sdmx_url))
+    insight_dict = _generate_insight_dict(
+        metadata.payload, codelist_factory=_create_codelist_lookup
+    )
+    concepts_name = {}
+    lookups = {}
+    for code, component in insight_dict.items():
+        concepts_name[code] = component["name"]
+        if component["codelist"] is not None:
+            lookups[code] = component["codelist"]
+    return concepts_name, lookups
 
-        # Generate the final dataframe and concepts names
-        df, concepts_name = generate_final_df_and_concepts_name(data, metadata.payload)
+
+def refresh_database(dataset_instance, incremental=None):
+    """
+    Refresh an SDMX dataset. In incremental mode only the observations changed
+    upstream since the last successful load (SDMX `updatedAfter`) are requested,
+    and they are upserted into (or deleted from) the existing table keyed by the
+    dataflow dimensions. Falls back to a full reload when no high-water mark or DSD
+    information is available.
+    """
+    if incremental is None:
+        incremental = current_app.config["SDMX_INCREMENTAL_REFRESH"]
+    concepts_name = json.loads(dataset_instance.concepts or "{}")
+    if not incremental or not dataset_instance.sdmx_updated_at or not concepts_name:
+        return load_database(dataset_instance.sdmx_url, dataset_instance)
+
+    sdmx_url = dataset_instance.sdmx_url
+    metrics = IngestionMetrics(sdmx_url, kind="incremental")
+    try:
+        _refresh_incrementally(dataset_instance, metrics)
+    except Exception as ex:
+        record_sdmx_ingestion(metrics, dataset_instance, error=ex)
+        raise
+    record_sdmx_ingestion(metrics, dataset_instance)
+    return dataset_instance
+
+
+def _refresh_incrementally(dataset_instance, metrics):
+    """
+    Upsert the observations changed upstream since the last load, and delete the
+    ones deleted upstream.
+    """
+    sdmx_url = dataset_instance.sdmx_url
+    database_path = f"dbs/{dataset_instance.sdmx_uuid}"
+    concepts_name, lookups = _fetch_codelist_lookups(sdmx_url, metrics)
+    key_columns = list(dict.fromkeys([*concepts_name, "TIME_PERIOD"]))
+
+    # Normalized stores are updated through their observations table, their
+    # labels come from the lookup tables
+    table_name = get_store_table(dataset_instance.table_name)
+    fact_table = get_observations_table(database_path, table_name)
+
+    delta_url = add_query_params(
+        sdmx_url,
+        updatedAfter=dataset_instance.sdmx_updated_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    )
+    try:
+        with open_sdmx_stream(delta_url, metrics) as stream:
+            batches = metrics.timed_batches(
+                iter_sdmx_data(stream, current_app.config["SDMX_INGESTION_BATCH_SIZE"]),
+                "parse",
+            )
+            if current_app.config["SDMX_PARSE_TIME_PERIOD"]:
+                batches = metrics.timed_batches(
+                    apply_time_period_columns(batches), "parse_time_periods"
+                )
+            if fact_table is None:
+                batches = metrics.timed_batches(
+                    apply_codelist_lookups(batches, lookups), "join_codelists"
+                )
+            with metrics.stage("write"):
+                write_sdmx_batches(
+                    database_path,
+                    metrics.timed_batches(batches, "write", True),
+                    table_name=fact_table or table_name,
+                    key_columns=key_columns,
+                )
+    except SdmxNoResultsError:
+        pass
+
+    if fact_table is not None:
+        with metrics.stage("join_codelists"):
+            with sqlite3.connect(database_path) as conn:
+                _write_codelist_tables(conn, table_name, lookups)
+
+    with metrics.stage("update_permissions"):
+        dataset_instance.sdmx_updated_at = metrics.started_at
+        db.session.add(dataset_instance)
+        db.session.commit()
+    with metrics.stage("fetch_table_metadata"):
+        dataset_instance.fetch_metadata()
+    with metrics.stage("update_permissions"):
+        update_sdmx_store_datasets(dataset_instance)
+
+
+def refresh_database_coalesced(dataset_instance):
+    """
+    Refresh an SDMX dataset once for all the requests forcing it concurrently.
+    The first request takes a distributed lock on the store of the dataset and
+    refreshes it, the others (for any dataset of the store) wait for the lock to
+    be released and reuse the refreshed data.
+    Datasets refreshed less than SDMX_REFRESH_MIN_INTERVAL ago are not
+    refreshed again.
+    """
+    if _refreshed_recently(dataset_instance):
+        return dataset_instance
+
+    config = current_app.config
+    lock_timeout = config["SDMX_REFRESH_LOCK_TIMEOUT"]
+    try:
+        with KeyValueDistributedLock(
+            "sdmx_refresh",
+            lock_expiration=datetime.timedelta(seconds=lock_timeout),
+            sdmx_uuid=dataset_instance.sdmx_uuid,
+        ):
+            # Another request may have refreshed it while we took the lock
+            if not _refreshed_recently(dataset_instance):
+                refresh_database(dataset_instance)
+            return dataset_instance
+    except CreateKeyValueDistributedLockFailedException:
+        logger.debug("Waiting for the refresh of dataset %s", dataset_instance.id)
+
+    deadline = time.monotonic() + lock_timeout
+    while GetDistributedLock(
+        namespace="sdmx_refresh", params={"sdmx_uuid": dataset_instance.sdmx_uuid}
+    ).run():
+        if time.monotonic() > deadline:
+            logger.warning(
+                "Timed out waiting for the refresh of dataset %s", dataset_instance.id
+            )
+            break
+        time.sleep(config["SDMX_REFRESH_POLL_INTERVAL"])
+    db.session.refresh(dataset_instance)
+    return dataset_instance
+
+
+def _refreshed_recently(dataset_instance):
+    """Tell if a dataset was refreshed less than SDMX_REFRESH_MIN_INTERVAL ago."""
+    db.session.refresh(dataset_instance)
+    updated_at = dataset_instance.sdmx_updated_at
+    min_interval = current_app.config["SDMX_REFRESH_MIN_INTERVAL"]
+    return bool(
+        updated_at
+        and datetime.datetime.utcnow() - updated_at
+        < datetime.timedelta(seconds=min_interval)
+    )
+
+
+def is_refresh_due(dataset_instance, now=None):
+    """
+    Tell if the next run of the refresh schedule of an SDMX dataset, counted from
+    its last successful load, has passed. Schedules are crontabs in UTC.
+    :param dataset_instance: SDMX dataset with a `sdmx_refresh_schedule`
+    :param now: Current UTC time, defaults to utcnow
+    :return: True if the dataset should be refreshed
+    """
+    if not dataset_instance.sdmx_refresh_schedule:
+        return False
+    if not dataset_instance.sdmx_updated_at:
+        return True
+    now = now or datetime.datetime.utcnow()
+    next_run = croniter(
+        dataset_instance.sdmx_refresh_schedule, dataset_instance.sdmx_updated_at
+    ).get_next(datetime.datetime)
+    return next_run <= now
+
+
+def has_upstream_changes(dataset_instance):
+    """
+    Tell if the observations of an SDMX dataset changed upstream since its last
+    load, by asking the web service for the last observation of the series
+    updated since then (SDMX `updatedAfter`). Datasets never loaded and local
+    files are always considered changed.
+    """
+    updated_at = dataset_instance.sdmx_updated_at
+    sdmx_url = dataset_instance.sdmx_url
+    if not updated_at or not sdmx_url.startswith(("http://", "https://")):
+        return True
+
+    probe_url = add_query_params(
+        sdmx_url,
+        updatedAfter=updated_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        lastNObservations=1,
+    )
+    try:
+        with open_sdmx_stream(probe_url) as stream:
+            return any(rows for _, rows in iter_sdmx_data(stream, 1))
+    except SdmxNoResultsError:
+        return False
+
+
+def mark_sdmx_dataset_checked(dataset_instance, checked_at):
+    """
+    Move the high-water mark of an SDMX dataset whose upstream did not change,
+    and of the other datasets of its store, so their next scheduled refresh and
+    `updatedAfter` queries count from the check.
+    """
+    for dataset in get_sdmx_store_datasets(dataset_instance.sdmx_uuid) or [
+        dataset_instance
+    ]:
+        dataset.sdmx_updated_at = checked_at
+        db.session.add(dataset)
+    db.session.commit()
+
+
+class SdmxNoResultsError(Exception):
+    """The SDMX web service has no observations matching the query."""
+
+
+class SdmxDeletedObservations(list):
+    """
+    Batch of observations deleted upstream (SDMX-ML datasets with
+    action="Delete", SDMX-CSV rows with action D), as found in `updatedAfter`
+    responses. Observations may lack some key columns, e.g. the TIME_PERIOD of
+    a deleted series, and then stand for all the observations matching the
+    others.
+    """
+
+
+def add_query_params(sdmx_url, **params):
+    """Return the SDMX URL with the given query parameters added or replaced."""
+    url = urlparse(sdmx_url)
+    query = dict(parse_qsl(url.query, keep_blank_values=True))
+    query.update(params)
+    return urlunparse(url._replace(query=urlencode(query, safe=":")))
+
+
+class _JitteredRetry(Retry):
+    """Retry policy adding random jitter to the exponential backoff."""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, backoff)  # noqa: S311
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_sdmx_session(sdmx_url):
+    """
+    Return the shared HTTP session of the agency host of an SDMX URL. Sessions
+    keep connections alive across requests, open at most
+    SDMX_HTTP_MAX_CONNECTIONS_PER_HOST concurrent connections (further requests
+    wait for a free one) and retry transient failures with jittered exponential
+    backoff. Sessions are per process, so forked Celery workers do not share
+    sockets with their parent.
+    """
+    url = urlparse(sdmx_url)
+    key = (os.getpid(), url.scheme, url.netloc.lower())
+    with _sessions_lock:
+        if key not in _sessions:
+            config = current_app.config
+            retry = _JitteredRetry(
+                total=config["SDMX_HTTP_RETRIES"],
+                backoff_factor=config["SDMX_HTTP_BACKOFF_FACTOR"],
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET", "HEAD"),
+                raise_on_status=False,
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=config["SDMX_HTTP_MAX_CONNECTIONS_PER_HOST"],
+                pool_block=True,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount(f"{url.scheme}://", adapter)
+            session.hooks["response"].append(_record_http_metrics)
+            _sessions[key] = session
+        return _sessions[key]
+
+
+def get_sdmx_timeout():
+    """Return the (connect, read) timeout of SDMX requests."""
+    return (
+        current_app.config["SDMX_HTTP_CONNECT_TIMEOUT"],
+        current_app.config["SDMX_REQUEST_TIMEOUT"],
+    )
+
+
+def get_sdmx_http_stats():
+    """
+    Return the request and connection counts of the pooled SDMX sessions of
+    this process, per host. Requests not opening a connection reused one.
+    """
+    stats = {}
+    with _sessions_lock:
+        sessions = [
+            session for key, session in _sessions.items() if key[0] == os.getpid()
+        ]
+    for session in sessions:
+        for adapter in session.adapters.values():
+            pools = adapter.poolmanager.pools
+            for pool_key in pools.keys():
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                host = stats.setdefault(
+                    pool.host, {"requests": 0, "connections": 0, "reused": 0}
+                )
+                host["requests"] += pool.num_requests
+                host["connections"] += pool.num_connections
+                host["reused"] += max(pool.num_requests - pool.num_connections, 0)
+    return stats
+
+
+def _record_http_metrics(response, *args, **kwargs):
+    stats_logger = stats_logger_manager.instance
+    stats_logger.incr("sdmx.http.requests")
+    stats_logger.incr(f"sdmx.http.status.{response.status_code}")
+    totals = get_sdmx_http_stats().values()
+    requests_count = sum(host["requests"] for host in totals)
+    if requests_count:
+        reused = sum(host["reused"] for host in totals)
+        stats_logger.gauge("sdmx.http.connection_reuse_ratio", reused / requests_count)
+
+
+@contextmanager
+def open_sdmx_stream(sdmx_url, metrics=None):
+    """
+    Open an SDMX URL or local file as a buffered binary stream without reading it
+    whole. Web services are asked for the formats in SDMX_DATA_ACCEPT, with a
+    compressed transfer encoding; services rejecting them (406) are asked again
+    for their default format.
+    :param metrics: Optional IngestionMetrics charged with the download time
+                    and the bytes read (as transferred, before decompression)
+    """
+    if not sdmx_url.startswith(("http://", "https://")):
+        with open(sdmx_url, "rb") as stream:
+            yield stream
+            if metrics is not None:
+                metrics.bytes_downloaded += stream.tell()
+        return
+
+    if metrics is None:
+        metrics = IngestionMetrics(sdmx_url)
+    headers = {"Accept-Encoding": "gzip, deflate"}
+    session = get_sdmx_session(sdmx_url)
+    timeout = get_sdmx_timeout()
+    with metrics.stage("http_fetch"):
+        response = session.get(
+            sdmx_url,
+            headers={**headers, "Accept": current_app.config["SDMX_DATA_ACCEPT"]},
+            stream=True,
+            timeout=timeout,
+        )
+        if response.status_code == 406:
+            response.close()
+            response = session.get(
+                sdmx_url, headers=headers, stream=True, timeout=timeout
+            )
+    with response:
+        if response.status_code == 404:
+            raise SdmxNoResultsError(response.text)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        # Keep the raw stream readable at EOF for the buffered reader and parsers
+        response.raw.auto_close = False
+        yield io.BufferedReader(_MeteredReader(response.raw, metrics))
+        metrics.bytes_downloaded += response.raw.tell()
+
+
+def is_sdmx_csv(stream):
+    """Tell SDMX-CSV from SDMX-ML by peeking at the start of a buffered stream."""
+    head = stream.peek(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return bool(head) and not head.startswith(b"<")
+
+
+def iter_sdmx_data(stream, batch_size):
+    """Yield the observation batches of an SDMX-CSV or SDMX-ML data stream."""
+    if is_sdmx_csv(stream):
+        return iter_sdmx_csv_batches(stream, batch_size)
+    return iter_sdmx_batches(stream, batch_size)
+
+
+def read_sdmx_data(sdmx_url, metrics=None):
+    """
+    Fetch an SDMX data message in the most compact format the service supports.
+    :param sdmx_url: SDMX data URL or local file
+    :param metrics: Optional IngestionMetrics charged with the download and
+                    parse times
+    :return: Dictionary of dataset name to its observations DataFrame
+    """
+    if metrics is None:
+        metrics = IngestionMetrics(sdmx_url)
+    with open_sdmx_stream(sdmx_url, metrics) as stream:
+        with metrics.stage("parse"):
+            if not is_sdmx_csv(stream):
+                message = read_sdmx(BytesIO(stream.read()))
+                return {
+                    dataset: message.payload[dataset].data
+                    for dataset in message.payload
+                }
+
+            frames = {}
+            for structure_name, frame, deleted in _iter_sdmx_csv_frames(stream):
+                if deleted:
+                    continue
+                frames.setdefault(structure_name, []).append(frame)
+    with metrics.stage("parse"):
+        return {
+            structure_name: pd.concat(chunks, ignore_index=True)
+            for structure_name, chunks in frames.items()
+        }
+
+
+def get_sdmx_components(sdmx_url):
+    """
+    Return the components of the data structure of an SDMX dataflow.
+    :param sdmx_url: SDMX data URL of the dataflow
+    :return: Tuple of the key dimension ids (in key order), the time dimension id
+             (None if the structure has none), the measure ids and the attribute ids
+    """
+    agency_id, dataflow_id = get_identifiers(sdmx_url)
+    ws = get_webservice_for_agency(agency_id)
+    message = fetch_metadata(ws, dataflow_id, get_dataflow_version(sdmx_url))
+    structures = message.payload["DataStructures"]
+    if len(structures) != 1:
+        raise Exception("One structure expected")
+    structure = list(structures.values())[0]
+
+    dimensions = []
+    time_dimension = None
+    for component in structure.dimension_descriptor.components.values():
+        if isinstance(component, TimeDimension):
+            time_dimension = component.id
+        else:
+            dimensions.append(component.id)
+    measures = (
+        list(structure.measure_descriptor.components)
+        if structure.measure_descriptor
+        else ["OBS_VALUE"]
+    )
+    attributes = (
+        list(structure.attribute_descriptor.components)
+        if structure.attribute_descriptor
+        else []
+    )
+    return dimensions, time_dimension, measures, attributes
+
+
+def _narrow_sdmx_key(key, dimensions, codes):
+    """
+    Intersect the codes of an SDMX key with sets of allowed codes.
+    :return: The narrowed key, None if no code is left for a dimension
+    """
+    parts = key.split(".") if key and key != "all" else [""] * len(dimensions)
+    if len(parts) != len(dimensions):
+        # Keys not matching the structure are left as they are
+        return key
+    for index, dimension in enumerate(dimensions):
+        if dimension not in codes:
+            continue
+        allowed = set(codes[dimension])
+        if parts[index]:
+            allowed &= set(parts[index].split("+"))
+        if not allowed:
+            return None
+        parts[index] = "+".join(sorted(allowed))
+    return ".".join(parts) if any(parts) else "all"
+
+
+def build_sdmx_slice_url(
+    sdmx_url, dimensions, codes=None, start_period=None, end_period=None
+):
+    """
+    Narrow an SDMX data query to a slice of its dataflow. The codes of each
+    dimension are intersected with the key of the query, and the period range
+    with its startPeriod and endPeriod.
+    :param sdmx_url: SDMX data URL
+    :param dimensions: Ids of the key dimensions, in key order
+    :param codes: Sets of allowed codes, by dimension id
+    :param start_period: Earliest period of the slice
+    :param end_period: Latest period of the slice
+    :return: The URL of the slice, None if the slice is empty
+    """
+    url = urlparse(sdmx_url)
+    if codes:
+        segments = url.path.split("/")
+        position = segments.index("data") + 2
+        key = _narrow_sdmx_key(
+            segments[position] if len(segments) > position else "", dimensions, codes
+        )
+        if key is None:
+            return None
+        segments[position:] = [key, *segments[position + 1 :]]
+        url = url._replace(path="/".join(segments))
+
+    query = dict(parse_qsl(url.query, keep_blank_values=True))
+    params = {}
+    if start_period:
+        start_period = _narrow_sdmx_period(start_period, query.get("startPeriod"))
+        if start_period:
+            params["startPeriod"] = start_period
+    if end_period:
+        end_period = _narrow_sdmx_period(end_period, query.get("endPeriod"), end=True)
+        if end_period:
+            params["endPeriod"] = end_period
+    return add_query_params(urlunparse(url), **params)
+
+
+def _narrow_sdmx_period(period, query_period, end=False):
+    """
+    Return the narrowest of a period bound of a slice and the same bound of its
+    query, comparing the parsed periods rather than the strings, eg, the end
+    2024 is after 2024-06 and the start 2020-02 after 2020-Q1.
+    :param period: Start or end period of the slice
+    :param query_period: startPeriod or endPeriod of the query, if any
+    :param end: Whether the periods are end periods, compared by their ends
+    :return: The narrowest period, None if the periods can not be compared and
+             the period filter is left to be applied to the observations
+    """
+    if not query_period:
+        return period
+    starts, frequencies = parse_sdmx_periods(pd.Series([period, query_period]))
+    if starts.isna().any():
+        return None
+    if end:
+        ends = [_get_period_end(*bound) for bound in zip(starts, frequencies)]
+        return period if ends[0] < ends[1] else query_period
+    return period if starts[0] > starts[1] else query_period
+
+
+def _get_period_end(start, frequency):
+    """Return the (exclusive) end of a period parsed by `parse_sdmx_periods`."""
+    if pd.isna(frequency):
+        return start
+    if frequency in _REPORTING_PERIOD_MONTHS:
+        return start + pd.DateOffset(months=_REPORTING_PERIOD_MONTHS[frequency])
+    return start + pd.Timedelta(days={"W": 7, "D": 1}.get(frequency, 0))
+
+
+# Observations of recent SDMX slices, by URL, least recently used first
+_slices = OrderedDict()
+_slices_lock = threading.Lock()
+
+
+def read_sdmx_slice(sdmx_url):
+    """
+    Yield the observations of an SDMX data query, as dicts, while they are
+    downloaded. Slices of at most SDMX_VIRTUAL_TABLE_CACHE_MAX_ROWS observations
+    that are read to the end are kept in a local cache of
+    SDMX_VIRTUAL_TABLE_CACHE_SIZE entries for SDMX_VIRTUAL_TABLE_CACHE_TTL
+    seconds, shared by the queries of a process. Larger slices are only streamed.
+    :param sdmx_url: SDMX data URL
+    :return: Iterator of the observations, empty if the query has no results
+    """
+    config = current_app.config
+    stats_logger = stats_logger_manager.instance
+    now = time.monotonic()
+    with _slices_lock:
+        entry = _slices.get(sdmx_url)
+        if entry and now - entry[0] < config["SDMX_VIRTUAL_TABLE_CACHE_TTL"]:
+            _slices.move_to_end(sdmx_url)
+            stats_logger.incr("sdmx.virtual_table.cache_hit")
+            observations = entry[1]
+        else:
+            observations = None
+    if observations is not None:
+        yield from observations
+        return
+
+    stats_logger.incr("sdmx.virtual_table.cache_miss")
+    max_rows = config["SDMX_VIRTUAL_TABLE_CACHE_MAX_ROWS"]
+    observations = []
+    try:
+        with open_sdmx_stream(sdmx_url) as stream:
+            for _, rows in iter_sdmx_data(stream, config["SDMX_INGESTION_BATCH_SIZE"]):
+                if isinstance(rows, SdmxDeletedObservations):
+                    continue
+                if observations is not None:
+                    observations.extend(rows)
+                    if len(observations) > max_rows:
+                        # Too large to be cached, the rest is only streamed
+                        observations = None
+                        stats_logger.incr("sdmx.virtual_table.cache_skip")
+                yield from rows
+    except SdmxNoResultsError:
+        pass
+
+    if observations is None:
+        return
+    with _slices_lock:
+        _slices[sdmx_url] = (now, observations)
+        _slices.move_to_end(sdmx_url)
+        while len(_slices) > config["SDMX_VIRTUAL_TABLE_CACHE_SIZE"]:
+            _slices.popitem(last=False)
+
+
+# Columns of SDMX-CSV 1.0 and 2.0 that identify the structure of each row
+_CSV_STRUCTURE_COLUMNS = ("DATAFLOW", "STRUCTURE_ID")
+_CSV_METADATA_COLUMNS = ["DATAFLOW", "STRUCTURE", "STRUCTURE_ID", "ACTION"]
+
+
+def _iter_sdmx_csv_frames(stream, batch_size=None):
+    """
+    Parse SDMX-CSV with the pandas C parser, in chunks of `batch_size` rows.
+    Deleted observations (SDMX-CSV 2.0 action D) are yielded in frames of their
+    own.
+    :return: Iterator of (structure name, DataFrame of observations, whether the
+             observations are deleted)
+    """
+    reader = pd.read_csv(
+        stream,
+        dtype=str,
+        keep_default_na=False,
+        na_values=[""],
+        chunksize=batch_size or current_app.config["SDMX_INGESTION_BATCH_SIZE"],
+    )
+    with reader:
+        for chunk in reader:
+            deleted = (
+                chunk["ACTION"] == "D"
+                if "ACTION" in chunk.columns
+                else pd.Series(False, index=chunk.index)
+            )
+            structure_column = next(
+                (c for c in _CSV_STRUCTURE_COLUMNS if c in chunk.columns), None
+            )
+            for is_deleted in (False, True):
+                part = chunk[deleted == is_deleted]
+                if is_deleted and part.empty:
+                    continue
+                groups = (
+                    part.groupby(structure_column, sort=False)
+                    if structure_column
+                    else [(None, part)]
+                )
+                for structure_name, frame in groups:
+                    frame = frame.drop(columns=_CSV_METADATA_COLUMNS, errors="ignore")
+                    yield structure_name, frame.reset_index(drop=True), is_deleted
+
+
+def iter_sdmx_csv_batches(stream, batch_size):
+    """
+    Parse an SDMX-CSV data stream into batches of at most `batch_size`
+    observations, like `iter_sdmx_batches` does for SDMX-ML.
+    :return: Iterator of (structure name, list of observation dicts)
+    """
+    for structure_name, frame, deleted in _iter_sdmx_csv_frames(stream, batch_size):
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = frame.to_dict("records")
+        yield structure_name, SdmxDeletedObservations(rows) if deleted else rows
+
+
+def _local_name(tag):
+    """Strip the XML namespace from a tag or attribute name."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _plain_attributes(elem):
+    """Return the non-namespaced attributes of an element (skips xsi:type...)."""
+    return {key: value for key, value in elem.attrib.items() if "}" not in key}
+
+
+def _structure_name(ref):
+    """Build the `AGENCY:ID(VERSION)` name sdmxthon uses for dataset payload keys."""
+    if ref.get("urn"):
+        return ref["urn"].split("=", 1)[-1]
+    if ref.get("agencyID"):
+        return f"{ref['agencyID']}:{ref.get('id')}({ref.get('version')})"
+    return f"{ref.get('id')}({ref.get('version')})"
+
+
+def iter_sdmx_batches(stream, batch_size):  # noqa: C901
+    """
+    Incrementally parse an SDMX-ML data message (structure specific or generic).
+    The observations of datasets flagged with action="Delete" are yielded in
+    `SdmxDeletedObservations` batches, as are the keys of their series without
+    observations, which stand for all the observations of the series.
+    :param stream: Binary file-like object with the SDMX-ML message
+    :param batch_size: Maximum number of observations per batch
+    :return: Generator of (structure name, list of observation dicts) tuples
+    """
+    generic = False
+    structures = {}
+    ref = {}
+    structure_name = None
+    dimension_at_observation = None
+    dataset_elem = series_elem = None
+    deleted = False
+    series_key = {}
+    series_observations = 0
+    obs_row = None
+    batch = []
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):  # noqa: S314
+        tag = _local_name(elem.tag)
+
+        if event == "start":
+            if tag == "GenericData":
+                generic = True
+            elif tag == "DataSet":
+                dataset_elem = elem
+                deleted = elem.get("action") == "Delete"
+                batch = SdmxDeletedObservations() if deleted else []
+                structure_ref = elem.get("structureRef") or next(
+                    (v for k, v in elem.attrib.items() if k.endswith("structureRef")),
+                    None,
+                )
+                structure_name, dimension_at_observation = structures.get(
+                    structure_ref, (structure_ref, "TIME_PERIOD")
+                )
+            elif tag == "Series" and dataset_elem is not None:
+                series_elem = elem
+                series_key = {} if generic else _plain_attributes(elem)
+                series_observations = 0
+            elif tag == "Obs" and dataset_elem is not None:
+                obs_row = {}
+            continue
+
+        if dataset_elem is None:
+            # Header section: collect the structures referenced by the datasets
+            if tag == "Ref":
+                ref = dict(elem.attrib)
+            elif tag == "URN":
+                ref = {"urn": (elem.text or "").strip()}
+            elif tag == "Structure" and elem.get("structureID"):
+                structures[elem.get("structureID")] = (
+                    _structure_name(ref),
+                    elem.get("dimensionAtObservation", "TIME_PERIOD"),
+                )
+            elif tag in ("ErrorMessage", "Error"):
+                text = " ".join(elem.itertext()).strip() or "SDMX error"
+                if elem.get("code") == "100":
+                    raise SdmxNoResultsError(text)
+                raise Exception(text)
+            continue
+
+        if tag == "Value" and generic:
+            target = obs_row if obs_row is not None else series_key
+            target[elem.get("id")] = elem.get("value")
+        elif tag == "ObsDimension":
+            obs_row[dimension_at_observation] = elem.get("value")
+        elif tag == "ObsValue":
+            obs_row[elem.get("id", "OBS_VALUE")] = elem.get("value")
+        elif tag == "Obs":
+            if not generic:
+                obs_row = _plain_attributes(elem)
+            batch.append({**series_key, **obs_row})
+            series_observations += 1
+            obs_row = None
+            (series_elem if series_elem is not None else dataset_elem).remove(elem)
+            if len(batch) >= batch_size:
+                yield structure_name, batch
+                batch = type(batch)()
+        elif tag == "Series":
+            if deleted and not series_observations:
+                batch.append(series_key)
+            dataset_elem.remove(elem)
+            series_elem = None
+            series_key = {}
+        elif tag == "DataSet":
+            if batch:
+                yield structure_name, batch
+            batch = []
+            dataset_elem = None
+
+    if batch:
+        yield structure_name, batch
+
+
+def apply_codelist_lookups(batches, lookups):
+    """
+    Add the codelist label columns to each observation, dropping observations
+    whose codes are missing from a codelist (same as the inner join in
+    `generate_final_df_and_concepts_name`).
+    """
+    for structure_name, rows in batches:
+        if lookups and not isinstance(rows, SdmxDeletedObservations):
+            joined = []
+            for row in rows:
+                for code, lookup in lookups.items():
+                    labels = lookup.get(row.get(code))
+                    if labels is None:
+                        break
+                    row.update(labels)
+                else:
+                    joined.append(row)
+            rows = joined
+        yield structure_name, rows
+
+
+# SDMX reporting periods, e.g. 2020-Q1, 2020-M01, 2020-W05, 2020-S2 or 2020-D032
+_REPORTING_PERIOD_PATTERN = (
+    r"^(?P<year>\d{4})-?(?P<frequency>[ASTQMWD])(?P<number>\d{1,3})$"
+)
+# Length in months of the reporting periods counted in months
+_REPORTING_PERIOD_MONTHS = {"A": 12, "S": 6, "T": 4, "Q": 3, "M": 1}
+# Frequency of the ISO 8601 dates allowed as TIME_PERIOD, by length
+_ISO_PERIOD_FREQUENCIES = {4: "A", 7: "M", 10: "D"}
+# SQLite column types of the columns that are not stored as TEXT
+_COLUMN_TYPES = {"TIME_PERIOD_START": "DATETIME"}
+
+
+def parse_sdmx_periods(periods):
+    """
+    Vectorized conversion of SDMX TIME_PERIOD values, either reporting periods
+    or ISO 8601 dates, to the start of each period and its SDMX frequency code.
+    :param periods: Series of TIME_PERIOD values
+    :return: Tuple of Series with the period starts (NaT when the period can not
+             be parsed) and the frequencies
+    """
+    periods = periods.astype("string").str.strip()
+    parts = periods.str.extract(_REPORTING_PERIOD_PATTERN)
+    frequencies = parts["frequency"]
+    number = pd.to_numeric(parts["number"])
+
+    # Reporting periods are counted in months, days or weeks from the year start
+    first_day = pd.to_datetime(parts["year"] + "-01-01", format="%Y-%m-%d")
+    month = (number - 1) * frequencies.map(_REPORTING_PERIOD_MONTHS) + 1
+    starts = pd.to_datetime(
+        parts["year"]
+        + "-"
+        + month.astype("Int64").astype("string").str.zfill(2)
+        + "-01",
+        format="%Y-%m-%d",
+        errors="coerce",
+    )
+    daily = frequencies == "D"
+    starts[daily] = first_day[daily] + pd.to_timedelta(number[daily] - 1, unit="D")
+    weekly = frequencies == "W"
+    # ISO weeks start on the Monday of the week containing January 4th
+    january_4 = first_day[weekly] + pd.Timedelta(days=3)
+    starts[weekly] = (
+        january_4
+        - pd.to_timedelta(january_4.dt.dayofweek, unit="D")
+        + pd.to_timedelta((number[weekly] - 1) * 7, unit="D")
+    )
+
+    # Anything else is expected to be an ISO 8601 date or datetime
+    iso = frequencies.isna()
+    starts[iso] = pd.to_datetime(periods[iso], errors="coerce", format="ISO8601")
+    frequencies[iso] = periods[iso].str.len().map(_ISO_PERIOD_FREQUENCIES)
+    return starts, frequencies.where(starts.notna())
+
+
+def add_time_period_columns(df):
+    """
+    Add the TIME_PERIOD_START timestamp and TIME_PERIOD_FREQ columns to a
+    DataFrame of observations.
+    """
+    if "TIME_PERIOD" in df.columns:
+        df["TIME_PERIOD_START"], df["TIME_PERIOD_FREQ"] = parse_sdmx_periods(
+            df["TIME_PERIOD"]
+        )
+    return df
+
+
+def apply_time_period_columns(batches):
+    """
+    Add the TIME_PERIOD_START and TIME_PERIOD_FREQ columns to each observation
+    batch, parsing the periods of a whole batch at once.
+    """
+    for structure_name, rows in batches:
+        periods = pd.Series([row.get("TIME_PERIOD") for row in rows], dtype=object)
+        if periods.notna().any():
+            starts, frequencies = parse_sdmx_periods(periods)
+            starts = starts.dt.strftime("%Y-%m-%d %H:%M:%S")
+            for row, start, frequency in zip(rows, starts, frequencies):
+                row["TIME_PERIOD_START"] = None if pd.isna(start) else start
+                row["TIME_PERIOD_FREQ"] = None if pd.isna(frequency) else frequency
+        yield structure_name, rows
+
+
+def _quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def write_sdmx_batches(database_path, batches, table_name=None, key_columns=None):
+    """
+    Write observation batches to SQLite with executemany in a single transaction.
+    One table is created per SDMX dataset, named like the ones `_ingest_dataframe`
+    creates; columns first seen in later batches are added on the fly.
+    :param database_path: Path of the SQLite store
+    :param batches: Iterable of (structure name, list of observation dicts)
+    :param table_name: Existing table to write into instead of creating new ones
+    :param key_columns: Columns identifying an observation; matching rows
+                        are replaced (upsert) instead of duplicated, and
+                        `SdmxDeletedObservations` batches delete them. Deletions
+                        are ignored without key columns.
+    :return: List of the written table names
+    """
+    tables = {}
+    conn = sqlite3.connect(database_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        for structure_name, rows in batches:
+            if not rows:
+                continue
+            deleted = isinstance(rows, SdmxDeletedObservations)
+            if deleted and not (key_columns and table_name):
+                continue
+            if table_name is not None:
+                structure_name = None
+            if structure_name not in tables:
+                tables[structure_name] = _prepare_table(
+                    conn, table_name, structure_name, key_columns
+                )
+            name, columns = tables[structure_name]
+            if deleted:
+                _delete_observations(conn, name, columns, key_columns, rows)
+                continue
+
+            _add_columns(conn, name, columns, rows)
+            _upsert_observations(conn, name, columns, key_columns, rows)
+        if not tables and table_name is None:
+            raise Exception("No observations found in the SDMX message")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return [name for name, _ in tables.values()]
+
+
+def _add_columns(conn, table_name, columns, rows):
+    """
+    Create the table of an SDMX dataset with the columns of its first batch, or
+    add the columns first seen in a later batch.
+    :param columns: Current columns of the table, extended with the new ones
+    """
+    new_columns = list(
+        dict.fromkeys(c for row in rows for c in row if c not in columns)
+    )
+    if not columns:
+        definition = ", ".join(
+            f"{_quote_identifier(c)} {_COLUMN_TYPES.get(c, 'TEXT')}"
+            for c in new_columns
+        )
+        conn.execute(f"CREATE TABLE {_quote_identifier(table_name)} ({definition})")
     else:
-        df = data
+        for column in new_columns:
+            conn.execute(
+                f"ALTER TABLE {_quote_identifier(table_name)} "
+                f"ADD COLUMN {_quote_identifier(column)} "
+                f"{_COLUMN_TYPES.get(column, 'TEXT')}"
+            )
+    columns.extend(new_columns)
+
 
-    # Process the database
-    dataset_uuid, database = process_database(dataset_instance, df, message, sdmx_url)
+def _upsert_observations(conn, table_name, columns, key_columns, rows):
+    """
+    Insert observations, replacing the rows with the same key columns if any.
+    """
+    if key_columns:
+        keys = [c for c in key_columns if c in columns]
+        condition = " AND ".join(f"{_quote_identifier(c)} IS ?" for c in keys)
+        conn.executemany(
+            f"DELETE FROM {_quote_identifier(table_name)} WHERE {condition}",  # noqa: S608
+            ([row.get(c) for c in keys] for row in rows),
+        )
 
-    # Update table permissions and metadata
-    update_permissions_and_metadata(
-        database, dataset_instance, dataset_uuid, sdmx_url, concepts_name
+    placeholders = ", ".join("?" for _ in columns)
+    names = ", ".join(_quote_identifier(c) for c in columns)
+    conn.executemany(
+        f"INSERT INTO {_quote_identifier(table_name)} ({names}) "  # noqa: S608
+        f"VALUES ({placeholders})",
+        ([row.get(c) for c in columns] for row in rows),
     )
 
-    return table_instance
+
+def _delete_observations(conn, table_name, columns, key_columns, rows):
+    """
+    Delete the observations matching the key columns of deleted observations.
+    Missing or empty key columns match any value, observations without any key
+    column are ignored.
+    """
+    by_keys = {}
+    for row in rows:
+        keys = tuple(c for c in key_columns if c in columns and row.get(c) is not None)
+        if keys:
+            by_keys.setdefault(keys, []).append([row[c] for c in keys])
+    for keys, values in by_keys.items():
+        condition = " AND ".join(f"{_quote_identifier(c)} = ?" for c in keys)
+        conn.executemany(
+            f"DELETE FROM {_quote_identifier(table_name)} WHERE {condition}",  # noqa: S608
+            values,
+        )
+
+
+def _prepare_table(conn, table_name, structure_name, key_columns):
+    """
+    Return the name and current columns of the table a dataset is written to.
+    Existing tables get an index on the key columns so upserts are not full scans.
+    """
+    if table_name is None:
+        return f"{structure_name} {datetime.datetime.now()}", []
+
+    columns = [
+        row[1]
+        for row in conn.execute(f"PRAGMA table_info({_quote_identifier(table_name)})")
+    ]
+    keys = [c for c in key_columns or [] if c in columns]
+    if keys:
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS "
+            f"{_quote_identifier(f'ix_sdmx_key_{table_name}')} "
+            f"ON {_quote_identifier(table_name)} "
+            f"({', '.join(_quote_identifier(c) for c in keys)})"
+        )
+    return table_name, columns
+
+
+def drop_stale_tables(database_path, table_names):
+    """
+    Drop the tables and views left in the SQLite store by previous loads,
+    including the observations and lookup tables of normalized datasets.
+    """
+    prefixes = tuple(f"{name}__" for name in table_names)
+    with sqlite3.connect(database_path) as conn:
+        existing = conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE type IN ('view', 'table') "
+            "ORDER BY type DESC;"
+        ).fetchall()
+        for type_, name in existing:
+            if name not in table_names and not name.startswith(prefixes):
+                conn.execute(f"DROP {type_.upper()} {_quote_identifier(name)}")
+
+
+def normalize_codelists(database_path, table_names, lookups):
+    """
+    Store the codelists of normalized datasets once, as lookup tables, instead
+    of repeating the labels of every language on each observation. The
+    observation tables are renamed to `<table>__observations` and keep only the
+    dimension codes, the codelists are written to `<table>__<DIM>` tables and a
+    view named like the original table joins the labels back for charts.
+    :param database_path: Path of the SQLite store
+    :param table_names: Observation tables written by the ingestion
+    :param lookups: Dictionary of dimension to codelist lookup
+    """
+    with sqlite3.connect(database_path) as conn:
+        for table_name in table_names:
+            fact_table = f"{table_name}__observations"
+            conn.execute(
+                f"ALTER TABLE {_quote_identifier(table_name)} "
+                f"RENAME TO {_quote_identifier(fact_table)}"
+            )
+            label_columns = _write_codelist_tables(conn, table_name, lookups)
+
+            selected = ["o.*"]
+            joins = []
+            for index, (code, columns) in enumerate(label_columns.items()):
+                alias = f"l{index}"
+                selected.extend(f"{alias}.{_quote_identifier(c)}" for c in columns)
+                joins.append(
+                    f"JOIN {_quote_identifier(f'{table_name}__{code}')} {alias} "
+                    f"ON o.{_quote_identifier(code)} = {alias}.id"
+                )
+            conn.execute(
+                f"CREATE VIEW {_quote_identifier(table_name)} AS "  # noqa: S608
+                f"SELECT {', '.join(selected)} "
+                f"FROM {_quote_identifier(fact_table)} o {' '.join(joins)}"
+            )
+
+
+def _write_codelist_tables(conn, table_name, lookups):
+    """
+    Create or update the lookup tables of the dimensions present in the
+    observations table of a normalized dataset.
+    :return: Dictionary of dimension to the label columns of its lookup table
+    """
+    fact_table = f"{table_name}__observations"
+    dimensions = {
+        row[1]
+        for row in conn.execute(f"PRAGMA table_info({_quote_identifier(fact_table)})")
+    }
+    label_columns = {}
+    for code, lookup in lookups.items():
+        if code not in dimensions:
+            continue
+        lookup_table = _quote_identifier(f"{table_name}__{code}")
+        columns = [
+            row[1] for row in conn.execute(f"PRAGMA table_info({lookup_table})")
+        ][1:]
+        if not columns:
+            columns = list(
+                dict.fromkeys(c for labels in lookup.values() for c in labels)
+            )
+            definition = "".join(f", {_quote_identifier(c)} TEXT" for c in columns)
+            conn.execute(
+                f"CREATE TABLE {lookup_table} (id TEXT PRIMARY KEY{definition})"
+            )
+        names = "".join(f", {_quote_identifier(c)}" for c in columns)
+        placeholders = "".join(", ?" for _ in columns)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {lookup_table} (id{names}) "  # noqa: S608
+            f"VALUES (?{placeholders})",
+            (
+                [id_, *(labels.get(c) for c in columns)]
+                for id_, labels in lookup.items()
+            ),
+        )
+        label_columns[code] = columns
+    return label_columns
+
+
+def create_sdmx_indexes(database_path, table_names, dimensions):
+    """
+    Index the ingested observations so chart filters and group-bys do not scan
+    the whole table: one index per dimension code column and TIME_PERIOD, plus
+    a series key index over all the dimensions (in DSD order) and TIME_PERIOD.
+    The store is analyzed afterwards so the SQLite planner picks them up.
+    :param database_path: Path of the SQLite store
+    :param table_names: Tables written by the ingestion
+    :param dimensions: Dimension ids of the dataflow, in DSD order
+    :return: Dictionary of table name to its list of created indexes
+    """
+    index_plan = {}
+    with sqlite3.connect(database_path) as conn:
+        for table_name in table_names:
+            target = f"{table_name}__observations"
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (target,)
+            ).fetchone():
+                target = table_name
+            columns = {
+                row[1]
+                for row in conn.execute(
+                    f"PRAGMA table_info({_quote_identifier(target)})"
+                )
+            }
+            keys = [d for d in dimensions if d in columns and d != "TIME_PERIOD"]
+            indexed = [[column] for column in keys]
+            if "TIME_PERIOD" in columns:
+                indexed.append(["TIME_PERIOD"])
+            if "TIME_PERIOD_START" in columns:
+                indexed.append(["TIME_PERIOD_START"])
+            if len(keys) > 1:
+                # The series key index also serves lookups on its first dimension
+                indexed = [
+                    [*keys, *(["TIME_PERIOD"] if "TIME_PERIOD" in columns else [])],
+                    *indexed[1:],
+                ]
+
+            plan = []
+            for index_columns in indexed:
+                suffix = "series_key" if len(index_columns) > 1 else index_columns[0]
+                name = f"ix_sdmx_{target}_{suffix}"
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote_identifier(name)} "
+                    f"ON {_quote_identifier(target)} "
+                    f"({', '.join(_quote_identifier(c) for c in index_columns)})"
+                )
+                plan.append({"name": name, "columns": index_columns})
+            index_plan[table_name] = plan
+        conn.execute("ANALYZE")
+    return index_plan
+
+
+def get_observations_table(database_path, table_name):
+    """Return the observations table of a normalized dataset, None otherwise."""
+    fact_table = f"{table_name}__observations"
+    with sqlite3.connect(database_path) as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fact_table,)
+        ).fetchone()
+    return fact_table if exists else None
 
 
 def get_identifiers(sdmx_url):
@@ -66,73 +2006,353 @@ def get_webservice_for_agency(agency_id):
     return supported_agencies[agency_id]()
 
 
-def fetch_metadata(ws, dataflow_id):
-    """Retrieve metadata for a given dataflow ID."""
+def fetch_metadata(ws, dataflow_id, version=None):
+    """Retrieve metadata for a given dataflow ID, going through the structure cache."""
     try:
-        return ws.get_data_flow(dataflow_id, references="descendants")
+        return get_cached_structure(ws, dataflow_id, version)
     except Exception as e:
         raise Exception(e, dataflow_id)
 
 
-def process_database(dataset_instance, df, message, sdmx_url):
-    """Create or update the database and populate it with data."""
-    if dataset_instance is None:
-        dataset_uuid = uuid.uuid4()
-        database = CreateDatabaseCommand(
-            {
-                "sqlalchemy_uri": f"sqlite:///dbs/{dataset_uuid}",
-                "database_name": f"{dataset_uuid}",
-            }
-        ).run()
+def _structure_cache_key(agency_id, dataflow_id, version=None):
+    return f"sdmx_structure:{agency_id}:{dataflow_id}:{version or 'latest'}"
+
+
+@contextmanager
+def _structure_cache_session():
+    """
+    Give the enclosed structure cache operations a metadata session of their
+    own. The metastore cache commits the session it writes with, which must not
+    commit the pending changes of the caller, e.g. a dashboard built in a single
+    transaction.
+    """
+    cache = cache_manager.sdmx_structure_cache
+    if not isinstance(getattr(cache, "cache", cache), SupersetMetastoreCache):
+        # Other backends do not use the metadata session
+        yield
+        return
+
+    registry = db.session.registry
+    outer = registry()
+    session = db.session.session_factory()
+    registry.set(session)
+    try:
+        yield
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        registry.set(outer)
+
+
+def _get_structure_cache_entry(key):
+    """Read an entry of the structure cache, None if missing or unreadable."""
+    try:
+        return cache_manager.sdmx_structure_cache.get(key)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning(
+            "Could not read %s from the SDMX structure cache", key, exc_info=True
+        )
+        return None
+
+
+def _set_structure_cache_entry(key, value, timeout=None):
+    """Write an entry of the structure cache, logging failures."""
+    try:
+        with _structure_cache_session():
+            cache_manager.sdmx_structure_cache.set(key, value, timeout=timeout)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning(
+            "Could not store %s in the SDMX structure cache", key, exc_info=True
+        )
+
+
+# Parsed structure messages, by cache key and content digest, least recently
+# used first
+_structures = OrderedDict()
+_structures_lock = threading.Lock()
+_STRUCTURES_LOCAL_SIZE = 64
+
+
+def _parse_structure_entry(key, entry):
+    """Parse the structure message of a cache entry, once per process."""
+    local_key = (key, entry["digest"])
+    with _structures_lock:
+        message = _structures.get(local_key)
+        if message is not None:
+            _structures.move_to_end(local_key)
+            return message
+
+    content = base64.b64decode(entry["content"])
+    message = read_sdmx(BytesIO(content), validate=False)
+    with _structures_lock:
+        _structures[local_key] = message
+        _structures.move_to_end(local_key)
+        while len(_structures) > _STRUCTURES_LOCAL_SIZE:
+            _structures.popitem(last=False)
+    return message
+
+
+def get_cached_structure(ws, dataflow_id, version=None):
+    """
+    Return the parsed structure message (dataflow, DSD and codelists) of a
+    dataflow. The raw message is kept in the structure cache, and parsed once
+    per process. Entries older than SDMX_STRUCTURE_CACHE_TTL are revalidated
+    with a conditional request, and the stale entry is served if the web service
+    cannot be reached.
+    :param ws: Web service of the agency
+    :param dataflow_id: The dataflow ID
+    :param version: The dataflow version, latest if not provided
+    :return: The structure message
+    """
+    key = _structure_cache_key(ws.AGENCY_ID, dataflow_id, version)
+    entry = _get_structure_cache_entry(key)
+    if entry and "content" not in entry:
+        # Entries of previous versions held pickled sdmxthon messages
+        entry = None
+    now = time.time()
+    ttl = current_app.config["SDMX_STRUCTURE_CACHE_TTL"]
+    if entry and now - entry["validated_at"] < ttl:
+        return _parse_structure_entry(key, entry)
+
+    headers = {}
+    if entry and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    url = ws.get_data_flow_url(dataflow_id, version=version, references="descendants")
+    try:
+        response = get_sdmx_session(url).get(
+            url, headers=headers, timeout=get_sdmx_timeout()
+        )
+        if not (entry and response.status_code == 304):
+            response.raise_for_status()
+    except requests.RequestException:
+        if not entry:
+            raise
+        logger.warning("Serving stale SDMX structure for %s", key, exc_info=True)
+        return _parse_structure_entry(key, entry)
+
+    if not (entry and response.status_code == 304):
+        content = base64.b64encode(response.content).decode("ascii")
+        entry = {
+            "content": content,
+            "digest": md5_sha_from_str(content),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+    message = _parse_structure_entry(key, entry)
+    entry["validated_at"] = now
+    _set_structure_cache_entry(key, entry)
+    return message
+
+
+def invalidate_structure_cache(agency_id, dataflow_id, version=None):
+    """Remove a dataflow structure from the structure cache."""
+    with _structure_cache_session():
+        cache_manager.sdmx_structure_cache.delete(
+            _structure_cache_key(agency_id, dataflow_id, version)
+        )
+
+
+def _catalog_cache_key(agency_id):
+    return f"sdmx_catalog:{agency_id}"
+
+
+def refresh_dataflow_catalog(agency_id):
+    """
+    Fetch the dataflows of an agency and store them in the catalog cache.
+    :param agency_id: The agency ID
+    :return: The catalog entry, with the dataflows and their ETag
+    """
+    dataflows = fetch_all_dataflows(get_webservice_for_agency(agency_id))
+    entry = {
+        "dataflows": dataflows,
+        "etag": md5_sha_from_str(json.dumps(dataflows, sort_keys=True, default=str)),
+        "refreshed_at": time.time(),
+    }
+    _set_structure_cache_entry(_catalog_cache_key(agency_id), entry)
+    return entry
+
+
+def fetch_all_dataflows(ws):
+    """
+    List the dataflows of an agency, like `get_all_dataflows` of the sdmxthon web
+    service, going through the pooled SDMX session.
+    """
+    url = f"{ws.ENTRY_POINT}{ws.WS_IMPLEMENTATION.get_data_flows()}"
+    response = get_sdmx_session(url).get(url, timeout=get_sdmx_timeout())
+    response.raise_for_status()
+    message = read_xml(BytesIO(response.content), validate=False)
+    return [
+        {
+            "id": dataflow.id,
+            "unique_id": dataflow.unique_id,
+            "name": dataflow.name,
+            "description": dataflow.description,
+            "version": dataflow.version,
+        }
+        for dataflow in message["Dataflows"].values()
+    ]
+
+
+def get_dataflow_catalog(agency_id):
+    """
+    Return the cached dataflow catalog of an agency. The catalog is refreshed in
+    the background by the `sdmx.refresh_dataflow_catalogs` task, it is only
+    fetched inline when missing or older than SDMX_CATALOG_MAX_AGE.
+    """
+    entry = _get_structure_cache_entry(_catalog_cache_key(agency_id))
+    max_age = current_app.config["SDMX_CATALOG_MAX_AGE"]
+    if not entry or time.time() - entry["refreshed_at"] > max_age:
+        entry = refresh_dataflow_catalog(agency_id)
+    return entry
+
+
+def search_dataflows(dataflows, query=None, page=0, page_size=None):
+    """
+    Filter dataflows by a case-insensitive substring of their id or name and
+    return the requested page. Dataflows whose id starts with the query come first.
+    :return: Tuple with the number of matches and the dataflows in the page
+    """
+    if query:
+        query = query.lower()
+        matches = [
+            dataflow
+            for dataflow in dataflows
+            if query in f"{dataflow['id']} {dataflow['name']}".lower()
+        ]
+        matches.sort(key=lambda dataflow: not dataflow["id"].lower().startswith(query))
     else:
-        dataset_uuid = dataset_instance.sdmx_uuid
-        database = dataset_instance.database
+        matches = dataflows
+    if page_size:
+        matches_page = matches[page * page_size : (page + 1) * page_size]
+    else:
+        matches_page = matches
+    return len(matches), matches_page
 
-    engine = create_engine(f"sqlite:///dbs/{dataset_uuid}", echo=False)
-    for dataset in message.payload.keys():
-        df.to_sql(str(dataset) + " " + str(datetime.datetime.now()), con=engine)
-    return dataset_uuid, database
 
+def get_or_create_database(dataset_instance, dataset_uuid):
+    """Return the database of a dataset, creating it for new SQLite stores."""
+    if dataset_instance is not None:
+        return dataset_instance.database
+    database = (
+        db.session.query(Database).filter_by(database_name=dataset_uuid).one_or_none()
+    )
+    if database is not None:
+        return database
+    return CreateDatabaseCommand(
+        {
+            "sqlalchemy_uri": f"sqlite:///dbs/{dataset_uuid}",
+            "database_name": f"{dataset_uuid}",
+        }
+    ).run()
 
-def update_permissions_and_metadata(
-    database, dataset_instance, dataset_uuid, sdmx_url, concepts_name={}
+
+def _get_or_add_store_database(store_key):
+    """
+    Return the database of a new SDMX store, adding it to the session without
+    committing. The store was just written, so there is no connection to test,
+    and its permissions are created when the database and datasets are flushed.
+    """
+    database = (
+        db.session.query(Database).filter_by(database_name=store_key).one_or_none()
+    )
+    if database is not None:
+        return database
+    database = DatabaseDAO.create(
+        attributes={
+            "sqlalchemy_uri": f"sqlite:///dbs/{store_key}",
+            "database_name": store_key,
+        }
+    )
+    database.set_sqlalchemy_uri(database.sqlalchemy_uri)
+    return database
+
+
+def update_permissions_and_metadata(  # noqa: C901
+    database,
+    dataset_instance,
+    dataset_uuid,
+    sdmx_url,
+    concepts_name={},
+    updated_at=None,
+    table_names=None,
+    index_plan=None,
+    metrics=None,
 ):
-    """Update table permissions and metadata."""
-    schemas = database.get_all_schema_names(cache=False)
-    tables = database.get_all_table_names_in_schema(schemas[0], force=True)
+    """Update table permissions and metadata.
 
-    for schema in schemas:
-        security_manager.add_permission_view_menu(
-            "schema_access", security_manager.get_schema_perm(database, schema)
-        )
+    :returns: the dataset of the last table
+    """
+    if metrics is None:
+        metrics = IngestionMetrics(sdmx_url)
+    with metrics.stage("update_permissions"):
+        schemas = database.get_all_schema_names(cache=False)
+        if table_names is None:
+            tables = database.get_all_table_names_in_schema(schemas[0], force=True)
+        else:
+            # Normalized datasets are views, that are not listed with the tables
+            tables = [(table_name,) for table_name in table_names]
 
-    global table_instance
-    for table in tables:
-        if dataset_instance is None:
-            table_instance = SqlaTable(
-                table_name=f"{table[0]}",
-                database=database,
-                schema="main",
-                is_sdmx=True,
-                sdmx_url=sdmx_url,
-                sdmx_uuid=dataset_uuid,
-                concepts=json.dumps(concepts_name),
+        for schema in schemas:
+            security_manager.add_permission_view_menu(
+                "schema_access", security_manager.get_schema_perm(database, schema)
             )
-        else:
-            table_instance = dataset_instance
-            table_instance.table_name = f"{table[0]}"
-            db.session.add(table_instance)
-            db.session.commit()
 
-        table_instance.fetch_metadata()
+        table_instance = None
+        for table in tables:
+            if dataset_instance is None:
+                table_instance = SqlaTable(
+                    table_name=f"{table[0]}",
+                    database=database,
+                    schema="main",
+                    is_sdmx=True,
+                    sdmx_url=sdmx_url,
+                    sdmx_uuid=dataset_uuid,
+                    concepts=json.dumps(concepts_name),
+                    sdmx_updated_at=updated_at,
+                )
+            else:
+                table_instance = dataset_instance
+                table_instance.table_name = f"{table[0]}"
+                table_instance.sdmx_updated_at = updated_at
+            if index_plan is not None:
+                table_instance.extra = json.dumps(
+                    {
+                        **table_instance.extra_dict,
+                        "sdmx_indexes": index_plan.get(table[0], []),
+                    }
+                )
+            if dataset_instance is not None:
+                db.session.add(table_instance)
+                db.session.commit()
+
+            with metrics.stage("fetch_table_metadata"):
+                table_instance.fetch_metadata()
+            _use_time_period_start(table_instance)
+    return table_instance
+
 
+def _use_time_period_start(table_instance):
+    """Make the time filters and grains of a dataset use the parsed periods."""
+    if "TIME_PERIOD_START" in table_instance.column_names:
+        table_instance.main_dttm_col = "TIME_PERIOD_START"
+        for column in table_instance.columns:
+            if column.column_name == "TIME_PERIOD_START":
+                column.is_dttm = True
 
-def create_dashboard(spec):
+
+def create_dashboard(spec, commit=True):
     """Create a new dashboard based on the provided specification.
 
     Args:
         spec (dict): Specification containing dashboard details.
                      Expected to have a 'DashID' key.
+        commit (bool): Whether to commit the dashboard, otherwise it is only
+                       added to the session as part of a larger transaction.
 
     Returns:
         Dashboard object: Returns the created dashboard object.
@@ -141,8 +2361,11 @@ def create_dashboard(spec):
     if not dashboard_title:
         raise ValueError("Missing 'DashID' in the specification.")
 
-    dashboard = CreateDashboardCommand({"dashboard_title": dashboard_title}).run()
-    return dashboard
+    command = CreateDashboardCommand({"dashboard_title": dashboard_title})
+    if commit:
+        return command.run()
+    command.validate()
+    return DashboardDAO.create(attributes=command._properties)
 
 
 def get_locale_column_if_exists(data, column, locale):
@@ -150,9 +2373,10 @@ def get_locale_column_if_exists(data, column, locale):
     Fallback to the original column if locale-specific column doesn't exist.
 
     Args:
-        data (dict or DataFrame): Data containing columns.
-                                  Expected to be either a dictionary with a 'columns' key
-                                  or a DataFrame.
+        data (dict, DataFrame or set): Data containing columns.
+                                  Expected to be either a dictionary with a
+                                  'columns' key, a DataFrame or a collection of
+                                  column names.
         column (str): Original column name.
         locale (str): Desired locale (e.g., 'en', 'es', 'fr').
 
@@ -179,6 +2403,9 @@ def get_locale_column_if_exists(data, column, locale):
     elif hasattr(data, "columns"):
         if locale_column in data.columns:
             return locale_column
+    elif isinstance(data, (set, frozenset)):
+        if locale_column in data:
+            return locale_column
 
     # If locale-specific column doesn't exist, return the original column name
     return column
@@ -203,43 +2430,111 @@ def substitute_string(string, df, locale="en"):
     return string
 
 
-def create_charts(spec, datasets, dashboard, locale="en"):
-    """Create charts based on the given specification and datasets, and add to the dashboard."""
+class ChartDataLookup:
+    """
+    Resolve the chart placeholders and locale columns of a dataset without
+    loading it.
+
+    Column names come from the dataset metadata, and placeholder values are
+    read from the first row of the dataset with a query selecting only the
+    mentioned columns. Both are cached, so that spec rows sharing a dataset
+    reuse them.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.columns = frozenset(dataset.column_names)
+        self._first_row = {}
+
+    def locale_column(self, column, locale):
+        return get_locale_column_if_exists(self.columns, column, locale)
+
+    def first_row_values(self, columns):
+        """
+        Return the first row values of the given columns.
+        :param columns: Names of the columns to read
+        :return: A dictionary of the values by column name
+        """
+        missing = [column for column in columns if column not in self._first_row]
+        if missing:
+            unknown = [column for column in missing if column not in self.columns]
+            if unknown:
+                raise KeyError(", ".join(unknown))
+            query = "SELECT {} FROM {} LIMIT 1".format(  # noqa: S608
+                ", ".join(_quote_identifier(column) for column in missing),
+                _quote_identifier(self.dataset.table_name),
+            )
+            with sqlite3.connect(f"dbs/{self.dataset.sdmx_uuid}") as conn:
+                values = conn.execute(query).fetchone()
+            if values is None:
+                raise Exception(f"Dataset {self.dataset.table_name} is empty")
+            self._first_row.update(zip(missing, values))
+        return {column: self._first_row[column] for column in columns}
+
+    def substitute(self, row, locale="en"):
+        """
+        Replace the placeholders of every value of a spec row, in place.
+        :param row: A spec row
+        :param locale: Locale of the placeholder values
+        :return: The columns mentioned by the placeholders
+        """
+        pattern = r"\{\$([^\}]+)\}"
+        mentioned = {key: re.findall(pattern, str(value)) for key, value in row.items()}
+        resolved = {
+            column: self.locale_column(column, locale)
+            for columns in mentioned.values()
+            for column in columns
+        }
+        values = self.first_row_values(list(dict.fromkeys(resolved.values())))
+
+        mentioned_columns = []
+        for key, columns in mentioned.items():
+            mentioned_columns.extend(columns)
+            for column in columns:
+                row[key] = row[key].replace(
+                    f"{{${column}}}", str(values[resolved[column]])
+                )
+        return mentioned_columns
+
+
+def create_charts(spec, datasets, dashboard, locale="en", commit=True):
+    """Create charts based on the given specification and datasets, and add them
+    to the dashboard.
+
+    The charts are committed at once, unless `commit` is False.
+    """
+    # Datasets are usually shared by several rows of a dashboard
+    lookups = {}
 
     for idx, row in enumerate(spec["Rows"]):
         if not row["DATA"]:
             continue
 
-        # Fetch data from SQLite database
-        with sqlite3.connect(f"dbs/{datasets[idx].sdmx_uuid}") as conn:
-            table_name = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table';"
-            ).fetchone()[0]
-            df = pd.read_sql(f'SELECT * FROM "{table_name}"', conn)
+        dataset = datasets[idx]
+        if dataset.id not in lookups:
+            lookups[dataset.id] = ChartDataLookup(dataset)
+        lookup = lookups[dataset.id]
 
         # Columns always present
         mentioned_columns = ["OBS_VALUE"]
-        pattern = r"\{\$([^\}]+)\}"
 
         # Substitute placeholders in the row with actual values
-        for key in list(row.keys()):  # iterating on a copy since we modify the dict
-            matches = re.findall(pattern, str(row[key]))
-            mentioned_columns.extend(matches)
-            row[key] = substitute_string(row[key], df, locale)
+        mentioned_columns.extend(lookup.substitute(row, locale))
 
         # Create different types of charts based on the spec
         if row["chartType"] == "VALUE":
-            create_value_chart(row, dashboard, datasets[idx], mentioned_columns)
+            create_value_chart(row, dashboard, dataset, mentioned_columns)
 
         elif row["chartType"] == "PIE":
-            create_pie_chart(row, dashboard, datasets[idx], locale)
+            create_pie_chart(row, dashboard, dataset, locale, lookup.columns)
 
         elif "LINES" in row["chartType"]:
-            create_lines_chart(row, dashboard, datasets[idx], locale)
+            create_lines_chart(row, dashboard, dataset, locale, lookup.columns)
 
         elif "BARS" in row["chartType"]:
-            create_bars_chart(row, dashboard, datasets[idx], locale)
+            create_bars_chart(row, dashboard, dataset, locale, lookup.columns)
 
+    if commit:
         db.session.commit()
 
 
@@ -282,17 +2577,16 @@ def create_value_chart(row, dashboard, dataset, mentioned_columns):
         datasource_type="table",
         viz_type="handlebars",
     )
-    dashboard.slices.append(chart)
     db.session.add(chart)
 
 
-def create_pie_chart(row, dashboard, dataset, locale):
+def create_pie_chart(row, dashboard, dataset, locale, columns=None):
     """Helper function to create and add a PIE type chart."""
+    if columns is None:
+        columns = frozenset(dataset.column_names)
     params = {
         "viz_type": "pie",
-        "groupby": [
-            get_locale_column_if_exists(dataset.data, row["legendConcept"], locale)
-        ],
+        "groupby": [get_locale_column_if_exists(columns, row["legendConcept"], locale)],
         "metric": {
             "aggregate": None,
             "column": None,
@@ -332,16 +2626,21 @@ def create_pie_chart(row, dashboard, dataset, locale):
         viz_type="pie",
     )
 
-    dashboard.slices.append(chart)
     db.session.add(chart)
 
 
-def create_lines_chart(row, dashboard, dataset, locale):
+def create_lines_chart(row, dashboard, dataset, locale, columns=None):
     """Helper function to create and add a LINES type chart."""
+    if columns is None:
+        columns = frozenset(dataset.column_names)
+    x_axis = row["xAxisConcept"]
+    if x_axis == "TIME_PERIOD" and "TIME_PERIOD_START" in columns:
+        # Plot the parsed periods on a real time axis
+        x_axis = "TIME_PERIOD_START"
     params = {
         "datasource": f"{dataset.id}__table",
         "viz_type": "echarts_timeseries_line",
-        "x_axis": row["xAxisConcept"],
+        "x_axis": x_axis,
         "time_grain_sqla": "P1D",
         "x_axis_sort_asc": True,
         "x_axis_sort_series": "name",
@@ -357,9 +2656,7 @@ def create_lines_chart(row, dashboard, dataset, locale):
                 "label": "OBS_VALUE",
             }
         ],
-        "groupby": [
-            get_locale_column_if_exists(dataset.data, row["legendConcept"], locale)
-        ],
+        "groupby": [get_locale_column_if_exists(columns, row["legendConcept"], locale)],
         "adhoc_filters": [],
         "order_desc": True,
         "row_limit": 10000,
@@ -401,18 +2698,17 @@ def create_lines_chart(row, dashboard, dataset, locale):
         query_context="",
         viz_type="echarts_timeseries_line",
     )
-    dashboard.slices.append(chart)
     db.session.add(chart)
 
 
-def create_bars_chart(row, dashboard, dataset, locale):
+def create_bars_chart(row, dashboard, dataset, locale, columns=None):
     """Helper function to create and add a BARS type chart."""
+    if columns is None:
+        columns = frozenset(dataset.column_names)
     params = {
         "datasource": f"{dataset.id}__table",
         "viz_type": "echarts_timeseries_bar",
-        "x_axis": get_locale_column_if_exists(
-            dataset.data, row["xAxisConcept"], locale
-        ),
+        "x_axis": get_locale_column_if_exists(columns, row["xAxisConcept"], locale),
         "time_grain_sqla": "P1D",
         "x_axis_sort": "OBS_VALUE",
         "x_axis_sort_asc": False,
@@ -467,36 +2763,131 @@ def create_bars_chart(row, dashboard, dataset, locale):
         query_context="",
         viz_type="echarts_timeseries_bar",
     )
-    dashboard.slices.append(chart)
     db.session.add(chart)
 
 
-def _create_codelist_dataframe(codelist, concept_name):
+def _create_codelist_columns(codelist):
     """
-    Convert a codelist dictionary into a list of dictionaries with codelist data.
+    Convert a codelist into a columnar form independent of the concept using it.
     :param codelist: A codelist dictionary
-    :param concept_name: The name of the concept associated with the codelist
-    :return: DataFrame representation of the codelist
+    :return: Dictionary with the code ids and, per language, their names
     """
-    codelist_list = []
-    for id, code in codelist.items.items():
-        item = {"id": id}
+    ids = []
+    names = {}
+    for position, (id, code) in enumerate(codelist.items.items()):
+        ids.append(id)
         if isinstance(
             code.name, dict
         ):  # If code name is a dictionary (different languages)
-            for lang_code, strings in code.name.items():
-                item[f"{concept_name}-{lang_code}"] = strings["content"]
+            labels = {
+                lang_code: strings["content"]
+                for lang_code, strings in code.name.items()
+            }
         else:
-            item[f"{concept_name}-en"] = code.name  # Default language is English
-        codelist_list.append(item)
+            labels = {"en": code.name}  # Default language is English
+        for lang_code, label in labels.items():
+            names.setdefault(lang_code, [None] * position).append(label)
+        for values in names.values():
+            if len(values) == position:
+                values.append(None)
+    return {"ids": ids, "names": names}
+
 
-    return pd.DataFrame(codelist_list)
+# Columnar codelists, by URN, least recently used first
+_codelists = OrderedDict()
+_codelists_lock = threading.Lock()
 
 
-def _generate_insight_dict(metadata_payload):
+def _codelist_cache_key(codelist):
+    return f"sdmx_codelist:{codelist.urn or codelist.unique_id}"
+
+
+def get_codelist_columns(codelist):
+    """
+    Return the columnar form of a codelist, shared by the dataflows using it.
+    Codelists are looked up in a local cache holding up to
+    SDMX_CODELIST_CACHE_SIZE codes, then in the structure cache, and are only
+    built from the parsed codelist when missing from both.
+    :param codelist: A codelist dictionary
+    :return: Dictionary with the code ids and, per language, their names
+    """
+    stats_logger = stats_logger_manager.instance
+    key = _codelist_cache_key(codelist)
+    with _codelists_lock:
+        columns = _codelists.get(key)
+        if columns is not None:
+            _codelists.move_to_end(key)
+            stats_logger.incr("sdmx.codelist_cache.local_hit")
+            return columns
+
+    columns = _get_structure_cache_entry(key)
+    if columns is not None:
+        stats_logger.incr("sdmx.codelist_cache.shared_hit")
+    else:
+        stats_logger.incr("sdmx.codelist_cache.miss")
+        columns = _create_codelist_columns(codelist)
+        _set_structure_cache_entry(
+            key, columns, timeout=current_app.config["SDMX_STRUCTURE_CACHE_TTL"]
+        )
+
+    max_codes = current_app.config["SDMX_CODELIST_CACHE_SIZE"]
+    with _codelists_lock:
+        _codelists[key] = columns
+        _codelists.move_to_end(key)
+        size = sum(len(cached["ids"]) for cached in _codelists.values())
+        while size > max_codes and len(_codelists) > 1:
+            size -= len(_codelists.popitem(last=False)[1]["ids"])
+    return columns
+
+
+def _create_codelist_dataframe(codelist, concept_name):
+    """
+    Convert a codelist dictionary into a DataFrame with codelist data.
+    :param codelist: A codelist dictionary
+    :param concept_name: The name of the concept associated with the codelist
+    :return: DataFrame representation of the codelist
+    """
+    columns = get_codelist_columns(codelist)
+    return pd.DataFrame(
+        {
+            "id": columns["ids"],
+            **{
+                f"{concept_name}-{lang_code}": values
+                for lang_code, values in columns["names"].items()
+            },
+        }
+    )
+
+
+def _create_codelist_lookup(codelist, concept_name):
+    """
+    Convert a codelist dictionary into a mapping of code id to its names.
+    :param codelist: A codelist dictionary
+    :param concept_name: The name of the concept associated with the codelist
+    :return: Dictionary of code id to the locale columns of the codelist
+    """
+    columns = get_codelist_columns(codelist)
+    names = [
+        (f"{concept_name}-{lang_code}", values)
+        for lang_code, values in columns["names"].items()
+    ]
+    return {
+        id: {
+            column: values[position]
+            for column, values in names
+            if values[position] is not None
+        }
+        for position, id in enumerate(columns["ids"])
+    }
+
+
+def _generate_insight_dict(
+    metadata_payload, codelist_factory=_create_codelist_dataframe
+):
     """
     Generate a dictionary containing insights from the metadata payload.
     :param metadata_payload: Metadata payload dictionary
+    :param codelist_factory: Function building the codelist representation
     :return: A dictionary of insights extracted from the metadata
     """
     result = {}
@@ -511,7 +2902,7 @@ def _generate_insight_dict(metadata_payload):
     for id, component in structure.dimension_descriptor.components.items():
         codelist = component.representation.codelist
         if codelist:
-            codelist = _create_codelist_dataframe(codelist, component.id)
+            codelist = codelist_factory(codelist, component.id)
         result[id] = {"name": component.concept_identity.name, "codelist": codelist}
     return result
 
@@ -551,21 +2942,72 @@ def get_dataflow_id(sdmx_url):
     )
 
 
+def get_dataflow_version(sdmx_url):
+    """
+    Extract the dataflow version from an SDMX URL.
+    :param sdmx_url: The SDMX URL string
+    :return: The dataflow version, or None when the URL does not pin one
+    """
+    full_dataflow_id = sdmx_url.split("data/")[1].split("/")[0]
+    parts = full_dataflow_id.split(",")
+    return parts[2] if len(parts) > 2 and parts[2] else None
+
+
+# Hosts used by SDMX URLs before the agencies moved to the current entry points
+# of their web services, and their domains. Any subdomain of these hosts matches.
+LEGACY_AGENCY_HOSTS = {
+    "stats.bis.org": "BIS",
+    "ecb.europa.eu": "ECB",
+    "ec.europa.eu": "ESTAT",
+    "ilo.org": "ILO",
+    "oecd.org": "OECD",
+    "unicef.org": "UNICEF",
+}
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _get_host_and_port(url):
+    parsed = urlparse(url)
+    try:
+        port = parsed.port or _DEFAULT_PORTS.get(parsed.scheme.lower())
+    except ValueError:
+        return None, None
+    return (parsed.hostname or "").rstrip("."), port
+
+
 def get_agency_id(sdmx_url):
     """
-    Determine the agency ID based on the domain present in the SDMX URL.
+    Determine the agency ID based on the host of the SDMX URL. The host and port
+    must be those of the entry point of a supported agency web service, or the
+    host must be (a subdomain of) a known agency host on the default port, so
+    that URLs merely mentioning an agency domain (in the path, the query or the
+    user info) are not fetched.
     :param sdmx_url: The SDMX URL string
-    :return: The agency ID
-    """
-    agency_mapping = {
-        "stats.bis.org": "BIS",
-        "ecb.europa.eu": "ECB",
-        "ec.europa.eu": "ESTAT",
-        "ilo.org": "ILO",
-        "oecd.org": "OECD",
-        "unicef.org": "UNICEF",
+    :return: The agency ID, or None if the host is not a known agency host
+    """
+    host, port = _get_host_and_port(sdmx_url)
+    if not host:
+        return None
+
+    hosts = {}
+    for agency, webservice in get_supported_agencies().items():
+        # The first agency of a shared entry point host is its main version
+        hosts.setdefault(_get_host_and_port(webservice.ENTRY_POINT), agency)
+    if (host, port) in hosts:
+        return hosts[(host, port)]
+
+    default_port = _DEFAULT_PORTS.get(urlparse(sdmx_url).scheme.lower())
+    if port is None or port != default_port:
+        return None
+    domains = {
+        entry_host: agency
+        for (entry_host, entry_port), agency in hosts.items()
+        if entry_port == port
     }
-
-    for domain, agency in agency_mapping.items():
-        if domain in sdmx_url:
-            return agency
+    domains.update(LEGACY_AGENCY_HOSTS)
+    # Most specific domains first
+    for domain in sorted(domains, key=len, reverse=True):
+        if host == domain or host.endswith(f".{domain}"):
+            return domains[domain]
+    return None
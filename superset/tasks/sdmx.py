@@ -0,0 +1,243 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from typing import Any
+
+from celery.exceptions import SoftTimeLimitExceeded
+from flask import current_app
+from sdmxthon.api.api import get_supported_agencies
+
+from superset import db, security_manager
+from superset.commands.chart.warm_up_cache import ChartWarmUpCacheCommand
+from superset.connectors.sqla.models import SqlaTable
+from superset.distributed_lock import KeyValueDistributedLock
+from superset.exceptions import CreateKeyValueDistributedLockFailedException
+from superset.extensions import async_query_manager, celery_app
+from superset.models.slice import Slice
+from superset.sdmx import (
+    get_sdmx_store_datasets,
+    has_upstream_changes,
+    is_refresh_due,
+    load_dashboard,
+    load_database,
+    mark_sdmx_dataset_checked,
+    refresh_database,
+    refresh_dataflow_catalog,
+)
+from superset.tasks.async_queries import _load_user_from_job_metadata
+from superset.utils.core import override_user
+
+logger = logging.getLogger(__name__)
+ingestion_timeout = current_app.config["SDMX_ASYNC_INGESTION_TIME_LIMIT_SEC"]
+
+
+@celery_app.task(name="sdmx.refresh_dataflow_catalogs")
+def refresh_dataflow_catalogs() -> None:
+    """
+    Celery beat task refreshing the cached dataflow catalog of every agency
+    """
+    for agency_id in get_supported_agencies():
+        try:
+            refresh_dataflow_catalog(agency_id)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to refresh the dataflows of %s", agency_id)
+
+
+@celery_app.task(name="sdmx.refresh_scheduled_datasets")
+def refresh_scheduled_datasets() -> None:
+    """
+    Celery beat task dispatching the refresh of the SDMX datasets whose refresh
+    schedule is due
+    """
+    now = datetime.utcnow()
+    datasets = (
+        db.session.query(SqlaTable)
+        .filter(
+            SqlaTable.is_sdmx.is_(True),
+            SqlaTable.sdmx_refresh_schedule.isnot(None),
+        )
+        .all()
+    )
+    for dataset in datasets:
+        try:
+            due = is_refresh_due(dataset, now)
+        except ValueError:
+            logger.warning(
+                "Invalid refresh schedule %s of dataset %s",
+                dataset.sdmx_refresh_schedule,
+                dataset.id,
+            )
+            continue
+        if due:
+            logger.info("Scheduling the refresh of dataset %s", dataset.id)
+            refresh_scheduled_dataset.delay(dataset.id)
+
+
+def _acquire_refresh_slot(stack: ExitStack, lock_expiration: timedelta) -> bool:
+    """
+    Take one of the SDMX_SCHEDULED_REFRESH_MAX_CONCURRENCY scheduled refresh
+    slots, released when the stack is closed.
+
+    :return: False if all the slots are taken
+    """
+    for slot in range(current_app.config["SDMX_SCHEDULED_REFRESH_MAX_CONCURRENCY"]):
+        try:
+            stack.enter_context(
+                KeyValueDistributedLock(
+                    "sdmx_scheduled_refresh", lock_expiration=lock_expiration, slot=slot
+                )
+            )
+            return True
+        except CreateKeyValueDistributedLockFailedException:
+            continue
+    return False
+
+
+@celery_app.task(
+    name="sdmx.refresh_scheduled_dataset", soft_time_limit=ingestion_timeout
+)
+def refresh_scheduled_dataset(dataset_id: int) -> None:
+    """
+    Celery task refreshing an SDMX dataset (and the other datasets of its store)
+    on its schedule, then warming up the cache of their charts. Datasets whose
+    upstream did not change are not reloaded. When all the refresh slots are
+    taken the dataset is left due and picked up again by the next scheduler run.
+    """
+    dataset = db.session.query(SqlaTable).get(dataset_id)
+    if not dataset or not is_refresh_due(dataset):
+        return
+
+    lock_expiration = timedelta(seconds=current_app.config["SDMX_REFRESH_LOCK_TIMEOUT"])
+    with ExitStack() as stack:
+        if not _acquire_refresh_slot(stack, lock_expiration):
+            logger.info("No refresh slot available for dataset %s", dataset_id)
+            return
+        try:
+            stack.enter_context(
+                KeyValueDistributedLock(
+                    "sdmx_refresh",
+                    lock_expiration=lock_expiration,
+                    sdmx_uuid=dataset.sdmx_uuid,
+                )
+            )
+        except CreateKeyValueDistributedLockFailedException:
+            logger.info("Dataset %s is already being refreshed", dataset_id)
+            return
+
+        checked_at = datetime.utcnow()
+        if not has_upstream_changes(dataset):
+            logger.info("Dataset %s is unchanged upstream", dataset_id)
+            mark_sdmx_dataset_checked(dataset, checked_at)
+            return
+        refresh_database(dataset)
+
+    if current_app.config["SDMX_SCHEDULED_REFRESH_WARM_UP_CACHE"]:
+        # The other datasets of the store were refreshed along with it
+        for store_dataset in get_sdmx_store_datasets(dataset.sdmx_uuid) or [dataset]:
+            warm_up_dataset_charts(store_dataset)
+
+
+def warm_up_dataset_charts(dataset: SqlaTable) -> None:
+    """
+    Recompute and cache the data of the charts of a dataset, as the
+    THUMBNAIL_SELENIUM_USER like the `cache-warmup` task
+    """
+    charts = (
+        db.session.query(Slice)
+        .filter_by(datasource_id=dataset.id, datasource_type=dataset.type)
+        .all()
+    )
+    user = security_manager.find_user(
+        username=current_app.config["THUMBNAIL_SELENIUM_USER"]
+    )
+    with override_user(user):
+        for chart in charts:
+            result = ChartWarmUpCacheCommand(chart, None, None).run()
+            if result["viz_error"]:
+                logger.warning(
+                    "Failed to warm up the cache of chart %s: %s",
+                    chart.id,
+                    result["viz_error"],
+                )
+
+
+def _run_ingestion_job(job_metadata: dict[str, Any], load: Any) -> None:
+    """
+    Run an ingestion job, publishing its stages and outcome as async events.
+
+    :param job_metadata: The async job metadata
+    :param load: Callable receiving the progress callback and returning the
+        result URL
+    """
+
+    def progress(stage: str, sdmx_url: str) -> None:
+        async_query_manager.update_job(
+            job_metadata,
+            async_query_manager.STATUS_RUNNING,
+            stage=stage,
+            sdmx_url=sdmx_url,
+        )
+
+    with override_user(_load_user_from_job_metadata(job_metadata), force=False):
+        try:
+            result_url = load(progress)
+            async_query_manager.update_job(
+                job_metadata,
+                async_query_manager.STATUS_DONE,
+                result_url=result_url,
+            )
+        except SoftTimeLimitExceeded as ex:
+            logger.warning("A timeout occurred while loading SDMX data, error: %s", ex)
+            raise
+        except Exception as ex:
+            errors = [{"message": str(ex)}]
+            async_query_manager.update_job(
+                job_metadata, async_query_manager.STATUS_ERROR, errors=errors
+            )
+            raise
+
+
+@celery_app.task(name="sdmx.load_dataset", soft_time_limit=ingestion_timeout)
+def load_sdmx_dataset(
+    job_metadata: dict[str, Any], sdmx_url: str, is_raw_url: bool = False
+) -> None:
+    """
+    Celery task loading an SDMX dataset in the background
+    """
+
+    def load(progress: Any) -> str:
+        dataset = load_database(sdmx_url, is_raw_url=is_raw_url, progress=progress)
+        return f"/api/v1/dataset/{dataset.id}"
+
+    _run_ingestion_job(job_metadata, load)
+
+
+@celery_app.task(name="sdmx.load_dashboard", soft_time_limit=ingestion_timeout)
+def load_sdmx_dashboard(
+    job_metadata: dict[str, Any], spec: dict[str, Any], locale: str = "en"
+) -> None:
+    """
+    Celery task creating an SDMX dashboard and its datasets in the background
+    """
+
+    def load(progress: Any) -> str:
+        dashboard = load_dashboard(spec, locale, progress=progress)
+        return f"/api/v1/dashboard/{dashboard.id}"
+
+    _run_ingestion_job(job_metadata, load)
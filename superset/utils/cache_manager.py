@@ -58,6 +58,7 @@ class CacheManager:
         self._thumbnail_cache = Cache()
         self._filter_state_cache = Cache()
         self._explore_form_data_cache = ExploreFormDataCache()
+        self._sdmx_structure_cache = Cache()
 
     @staticmethod
     def _init_cache(
@@ -99,6 +100,12 @@ class CacheManager:
             "EXPLORE_FORM_DATA_CACHE_CONFIG",
             required=True,
         )
+        self._init_cache(
+            app,
+            self._sdmx_structure_cache,
+            "SDMX_STRUCTURE_CACHE_CONFIG",
+            required=True,
+        )
 
     @property
     def data_cache(self) -> Cache:
@@ -119,3 +126,7 @@ class CacheManager:
     @property
     def explore_form_data_cache(self) -> Cache:
         return self._explore_form_data_cache
+
+    @property
+    def sdmx_structure_cache(self) -> Cache:
+        return self._sdmx_structure_cache
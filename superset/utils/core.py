@@ -1758,6 +1758,48 @@ def create_zip(files: dict[str, Any]) -> BytesIO:
     return buf
 
 
+class _ZipStreamBuffer:
+    """
+    Unseekable file object collecting the bytes written by a `ZipFile`.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files: Iterable[tuple[str, Iterable[bytes]]]) -> Iterator[bytes]:
+    """
+    Bundle files in a zip archive like `create_zip`, yielding the archive as the
+    contents of the files are consumed instead of building it in memory.
+
+    :param files: pairs of file names and iterables over their contents
+    :returns: an iterator over the bytes of the archive
+    """
+    buf = _ZipStreamBuffer()
+    with ZipFile(buf, "w") as bundle:
+        for filename, contents in files:
+            # the size is not known beforehand, allow files over 2 GiB
+            with bundle.open(filename, "w", force_zip64=True) as fp:
+                for chunk in contents:
+                    fp.write(chunk)
+                    if data := buf.drain():
+                        yield data
+    if data := buf.drain():
+        yield data
+
+
 def check_is_safe_zip(zip_file: ZipFile) -> None:
     """
     Checks whether a ZIP file is safe, raises SupersetException if not.
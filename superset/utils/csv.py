@@ -17,6 +17,7 @@
 import logging
 import re
 import urllib.request
+from collections.abc import Iterator
 from typing import Any, Optional, Union
 from urllib.error import URLError
 
@@ -81,6 +82,32 @@ def df_to_escaped_csv(df: pd.DataFrame, **kwargs: Any) -> Any:
     return df.to_csv(escapechar="\\", **kwargs)
 
 
+def df_to_escaped_csv_chunks(
+    df: pd.DataFrame, chunk_size: int, **kwargs: Any
+) -> Iterator[str]:
+    """
+    Convert a DataFrame to escaped CSV like `df_to_escaped_csv`, yielding the CSV
+    text `chunk_size` rows at a time so the whole text is never held in memory.
+
+    :param df: the DataFrame to convert
+    :param chunk_size: the number of rows rendered per chunk
+    :returns: an iterator over the chunks of CSV text
+    """
+
+    def escape_values(v: Any) -> Union[str, Any]:
+        return escape_value(v) if isinstance(v, str) else v
+
+    header = kwargs.pop("header", True)
+    for start in range(0, max(len(df), 1), chunk_size):
+        chunk = df.iloc[start : start + chunk_size].rename(columns=escape_values)
+        for idx in range(len(chunk.columns)):
+            if chunk.dtypes.iloc[idx] == np.dtype(object):
+                chunk.isetitem(idx, chunk.iloc[:, idx].map(escape_values))
+        yield chunk.to_csv(
+            escapechar="\\", header=header if start == 0 else False, **kwargs
+        )
+
+
 def get_chart_csv_data(
     chart_url: str, auth_cookies: Optional[dict[str, str]] = None
 ) -> Optional[bytes]:
@@ -15,9 +15,14 @@
 # specific language governing permissions and limitations
 # under the License.
 import io
-from typing import Any
+import tempfile
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
 
+import numpy as np
 import pandas as pd
+from xlsxwriter import Workbook
 
 from superset.utils.core import GenericDataType
 
@@ -53,6 +58,118 @@ def df_to_excel(df: pd.DataFrame, **kwargs: Any) -> Any:
     return output.getvalue()
 
 
+# ``to_excel`` options honored by ``df_to_excel_chunks``
+STREAMING_EXCEL_OPTIONS = {"sheet_name", "index", "header", "na_rep"}
+
+# formats used by ``pandas.ExcelWriter``
+HEADER_FORMAT = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+DATE_FORMAT = "YYYY-MM-DD"
+
+
+def _excel_value(value: Any) -> tuple[Any, Optional[str]]:
+    """
+    Convert a value to the one written by ``pandas.ExcelWriter``, and its number
+    format.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value), None
+    if isinstance(value, (int, np.integer)):
+        return int(value), None
+    if isinstance(value, (float, np.floating)):
+        if np.isinf(value):
+            return "inf" if value > 0 else "-inf", None
+        return float(value), None
+    if isinstance(value, datetime):
+        return value, DATETIME_FORMAT
+    if isinstance(value, date):
+        return value, DATE_FORMAT
+    if isinstance(value, timedelta):
+        return value.total_seconds() / 86400, "0"
+    if isinstance(value, str):
+        return value, None
+    return str(value), None
+
+
+def df_to_excel_chunks(  # noqa: C901
+    df: pd.DataFrame,
+    chunk_size: int = 10_000,
+    block_size: int = 1024 * 1024,
+    **kwargs: Any,
+) -> Iterator[bytes]:
+    """
+    Convert a DataFrame to an Excel file like `df_to_excel`, yielding its bytes in
+    blocks. Rows are written one at a time with the constant memory mode of
+    xlsxwriter to a temporary file, so memory stays flat regardless of the size of
+    the DataFrame. Hierarchical indexes and options other than
+    ``STREAMING_EXCEL_OPTIONS`` fall back to `df_to_excel`.
+
+    :param df: the DataFrame to convert
+    :param chunk_size: the number of rows converted at a time
+    :param block_size: the size of the yielded blocks
+    :returns: an iterator over the bytes of the Excel file
+    """
+    if (
+        set(kwargs) - STREAMING_EXCEL_OPTIONS
+        or not isinstance(kwargs.get("header", True), bool)
+        or isinstance(df.index, pd.MultiIndex)
+        or isinstance(df.columns, pd.MultiIndex)
+    ):
+        yield df_to_excel(df, **kwargs)
+        return
+
+    df = quote_formulas(df)
+    include_index = kwargs.get("index", True)
+    na_rep = kwargs.get("na_rep", "")
+    with tempfile.TemporaryFile() as output:
+        workbook = Workbook(output, {"constant_memory": True})
+        worksheet = workbook.add_worksheet(kwargs.get("sheet_name", "Sheet1"))
+        header_format = workbook.add_format(HEADER_FORMAT)
+        formats = {
+            fmt: workbook.add_format({"num_format": fmt})
+            for fmt in (DATETIME_FORMAT, DATE_FORMAT, "0")
+        }
+        index_formats = {
+            fmt: workbook.add_format({**HEADER_FORMAT, "num_format": fmt})
+            for fmt in formats
+        }
+        coloffset = 1 if include_index else 0
+
+        row = 0
+        if kwargs.get("header", True):
+            if include_index and df.index.name is not None:
+                worksheet.write(row, 0, df.index.name, header_format)
+            for col, name in enumerate(df.columns, start=coloffset):
+                worksheet.write(row, col, _excel_value(name)[0], header_format)
+            row += 1
+
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start : start + chunk_size]
+            values = chunk.to_numpy(dtype=object)
+            missing = chunk.isna().to_numpy()
+            for idx, (index, items) in enumerate(zip(chunk.index, values)):
+                if include_index:
+                    value, fmt = _excel_value(index)
+                    worksheet.write(
+                        row, 0, value, index_formats[fmt] if fmt else header_format
+                    )
+                for col, value in enumerate(items):
+                    if missing[idx, col]:
+                        if na_rep:
+                            worksheet.write_string(row, col + coloffset, na_rep)
+                        continue
+                    value, fmt = _excel_value(value)
+                    worksheet.write(
+                        row, col + coloffset, value, formats[fmt] if fmt else None
+                    )
+                row += 1
+
+        workbook.close()
+        output.seek(0)
+        while block := output.read(block_size):
+            yield block
+
+
 def apply_column_types(
     df: pd.DataFrame, column_types: list[GenericDataType]
 ) -> pd.DataFrame:
@@ -22,6 +22,7 @@ from datetime import date, datetime, time, timedelta
 from typing import Any, Callable, Dict, Optional, Union
 
 import numpy as np
+import orjson
 import pandas as pd
 import simplejson
 from flask_babel.speaklater import LazyString
@@ -225,6 +226,40 @@ def dumps(  # pylint: disable=too-many-arguments
     return results_string
 
 
+def dumps_bytes(
+    obj: Any,
+    default: Optional[Callable[[Any], Any]] = json_iso_dttm_ser,
+) -> bytes:
+    """
+    Dumps object to compatible JSON format, as UTF-8 encoded bytes. Uses orjson,
+    falling back to `dumps` for objects orjson cannot encode, e.g. integers over
+    64 bits, and for decimals, which `dumps` encodes exactly. As with `dumps`,
+    NaN values are encoded as null and dates and datetimes are passed to
+    `default`. Numpy scalars and arrays are encoded natively.
+
+    :param obj: The serializable object
+    :param default: function that should return a serializable version of obj
+    :returns: Bytes object in the JSON compatible form
+    """
+
+    def orjson_default(value: Any) -> Any:
+        if isinstance(value, decimal.Decimal) or default is None:
+            raise TypeError(f"Type is not JSON serializable: {type(value)}")
+        return default(value)
+
+    try:
+        return orjson.dumps(
+            obj,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    except orjson.JSONEncodeError:
+        logger.debug("Falling back to simplejson", exc_info=True)
+    return dumps(obj, default=default, ignore_nan=True).encode("utf-8")
+
+
 def loads(
     obj: Union[bytes, bytearray, str],
     encoding: Union[str, None] = None,
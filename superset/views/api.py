@@ -18,22 +18,25 @@ from __future__ import annotations
 
 from typing import Any, TYPE_CHECKING
 
-from flask import request
+from flask import request, Response
 from flask_appbuilder import expose
 from flask_appbuilder.api import rison
 from flask_appbuilder.security.decorators import has_access_api
 from flask_babel import lazy_gettext as _
 
-from superset import db, event_logger
+from superset import db, event_logger, is_feature_enabled
+from superset.async_events.async_query_manager import AsyncQueryTokenException
 from superset.commands.chart.exceptions import (
     TimeRangeAmbiguousError,
     TimeRangeParseFailError,
 )
+from superset.extensions import async_query_manager
 from superset.legacy import update_time_range
 from superset.models.slice import Slice
 from superset.models.core import Database
 from superset.superset_typing import FlaskResponse
 from superset.utils import json
+from superset.utils.core import get_user_id
 from superset.utils.date_parser import get_since_until
 from superset.views.error_handling import handle_api_exception
 from superset.views.base import api, BaseSupersetView
@@ -42,8 +45,14 @@ from sdmxthon import read_sdmx
 import uuid
 import datetime
 import requests
-from superset.views.base import api, BaseSupersetView, handle_api_exception
-from superset.sdmx import load_database, create_dashboard, create_charts
+from superset.views.base import api, BaseSupersetView
+from superset.sdmx import (
+    load_dashboard,
+    load_database,
+    invalidate_structure_cache,
+    get_dataflow_catalog,
+    search_dataflows,
+)
 import yaml
 from sdmxthon.api.api import get_supported_agencies
 from sdmxthon.webservices import webservices
@@ -66,6 +75,17 @@ get_time_range_schema = {
 class Api(BaseSupersetView):
     query_context_factory = None
 
+    @staticmethod
+    def _is_async_ingestion() -> bool:
+        """
+        SDMX uploads run as Celery jobs reporting their progress through the
+        async events API when requested with `?async=true`.
+        """
+        return (
+            is_feature_enabled("GLOBAL_ASYNC_QUERIES")
+            and request.args.get("async", "false").lower() == "true"
+        )
+
     # @has_access_api
     @event_logger.log_this
     @api
@@ -77,18 +97,19 @@ class Api(BaseSupersetView):
             file_content = uploaded_file.read()
             spec = yaml.safe_load(file_content)
             locale = request.form.get("locale", "en")
-            datasets = []
-
-            for row in spec["Rows"]:
-                if not row["DATA"]:
-                    datasets.append(None)
-                    continue
-                sdmx_url = row["DATA"].split(" ")[0]
-                datasets.append(load_database(sdmx_url))
-
-            dashboard = create_dashboard(spec)
+            if self._is_async_ingestion():
+                try:
+                    channel_id = async_query_manager.parse_channel_id_from_request(
+                        request
+                    )
+                except AsyncQueryTokenException:
+                    return self.json_response({"error": "Not authorized"}, status=401)
+                job_metadata = async_query_manager.submit_sdmx_dashboard_job(
+                    channel_id, spec, locale, get_user_id()
+                )
+                return self.json_response(job_metadata, status=202)
 
-            create_charts(spec, datasets, dashboard, locale)
+            dashboard = load_dashboard(spec, locale)
 
             return self.json_response({"status": "OK", "dashboard_id": dashboard.id})
         except Exception as e:
@@ -117,6 +138,17 @@ class Api(BaseSupersetView):
                     sdmx_url = supported_agencies[agency_id]().get_data_url(dataflow_id, last_n_observations=json_data["numberOfObservations"])
                 else:
                     sdmx_url = json_data["sdmxUrl"]
+            if self._is_async_ingestion():
+                try:
+                    channel_id = async_query_manager.parse_channel_id_from_request(
+                        request
+                    )
+                except AsyncQueryTokenException:
+                    return self.json_response({"error": "Not authorized"}, status=401)
+                job_metadata = async_query_manager.submit_sdmx_dataset_job(
+                    channel_id, sdmx_url, is_raw_url, get_user_id()
+                )
+                return self.json_response(job_metadata, status=202)
             load_database(sdmx_url, is_raw_url=is_raw_url)
             return self.json_response({"status": "OK"})
         except Exception as e:
@@ -145,10 +177,40 @@ class Api(BaseSupersetView):
     @expose("/v1/sdmx/agency/<agency_id>", methods=("GET",))
     def sdmx_get_dataflows(self, agency_id) -> FlaskResponse:
         try:
+            catalog = get_dataflow_catalog(agency_id)
+            if request.if_none_match.contains(catalog["etag"]):
+                return Response(status=304)
+
+            if any(arg in request.args for arg in ("q", "page", "page_size")):
+                count, dataflows = search_dataflows(
+                    catalog["dataflows"],
+                    request.args.get("q"),
+                    request.args.get("page", 0, type=int),
+                    request.args.get("page_size", 100, type=int),
+                )
+                response = self.json_response({"count": count, "result": dataflows})
+            else:
+                response = self.json_response(catalog["dataflows"])
+            response.set_etag(catalog["etag"])
+            return response
+
+        except Exception as e:
             return self.json_response(
-                get_supported_agencies()[agency_id]().get_all_dataflows()
+                json.dumps({"error": str(e)}),
+                status=500,
             )
 
+    @event_logger.log_this
+    @api
+    @handle_api_exception
+    @has_access_api
+    @expose("/v1/sdmx/structure/<agency_id>/<dataflow_id>", methods=("DELETE",))
+    def sdmx_invalidate_structure(self, agency_id, dataflow_id) -> FlaskResponse:
+        try:
+            invalidate_structure_cache(
+                agency_id, dataflow_id, request.args.get("version")
+            )
+            return self.json_response({"status": "OK"})
         except Exception as e:
             return self.json_response(
                 json.dumps({"error": str(e)}),
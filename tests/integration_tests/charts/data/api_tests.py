@@ -381,6 +381,26 @@ class TestPostChartDataApi(BaseTestChartDataApi):
         assert rv.status_code == 200
         assert rv.mimetype == mimetype
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_with_csv_result_format_streamed(self):
+        """
+        Chart data API: Test chart data with CSV result format streamed in chunks
+        """
+        self.query_context_payload["result_format"] = "csv"
+        self.query_context_payload["force"] = True
+        rv = self.post_assert_metric(CHART_DATA_URI, self.query_context_payload, "data")
+        with mock.patch.dict(
+            "superset.common.query_context_processor.config",
+            {"CHART_DATA_STREAMING_THRESHOLD": 1, "CHART_DATA_STREAMING_CHUNK_SIZE": 2},
+        ):
+            streamed_rv = self.post_assert_metric(
+                CHART_DATA_URI, self.query_context_payload, "data"
+            )
+        assert streamed_rv.status_code == 200
+        assert streamed_rv.mimetype == "text/csv"
+        assert len(streamed_rv.data.splitlines()) > 3
+        assert streamed_rv.data == rv.data
+
     @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
     def test_with_multi_query_csv_result_format(self):
         """
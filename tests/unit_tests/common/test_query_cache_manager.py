@@ -0,0 +1,131 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import pandas as pd
+import pytest
+from flask_caching import Cache
+from pandas.testing import assert_frame_equal
+from pytest_mock import MockerFixture
+
+from superset.app import SupersetApp
+from superset.constants import CacheRegion
+
+
+@pytest.fixture
+def data_cache(mocker: MockerFixture, app: SupersetApp) -> Cache:
+    cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
+    mocker.patch.dict(
+        "superset.common.utils.query_cache_manager._cache",
+        {CacheRegion.DATA: cache},
+    )
+    return cache
+
+
+def get_dataframe() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "__timestamp": pd.date_range("2024-01-01", periods=500, freq="D"),
+            "country": ["ES", "FR", None, "DE", "IT"] * 100,
+            "value": [1.5, None, 2.5, 3.0, 4.5] * 100,
+            "count": pd.array([1, None, 3, 4, 5] * 100, dtype="Int64"),
+        }
+    )
+
+
+def test_set_arrow(data_cache: Cache) -> None:
+    """
+    Test that DataFrames are stored as Arrow IPC streams in the data cache.
+    """
+    from superset.common.utils.query_cache_manager import QueryCacheManager
+
+    df = get_dataframe()
+    QueryCacheManager.set(
+        "key", {"df": df, "query": "SELECT 1"}, region=CacheRegion.DATA
+    )
+
+    value = data_cache.get("key")
+    assert "df" not in value
+    assert isinstance(value["df_arrow"], bytes)
+    assert value["query"] == "SELECT 1"
+
+    query_cache = QueryCacheManager.get("key", region=CacheRegion.DATA)
+    assert query_cache.is_loaded
+    assert query_cache.query == "SELECT 1"
+    assert_frame_equal(query_cache.df, df)
+
+    # DataFrames read from the cache can be modified in place
+    query_cache.df.loc[0, "value"] = 0
+
+
+def test_set_arrow_nullable_big_integers(data_cache: Cache) -> None:
+    """
+    Test that object columns of big integers with nulls keep their exact values.
+    """
+    from superset.common.utils.query_cache_manager import QueryCacheManager
+
+    df = pd.DataFrame({"id": [2**60 + 1, None, 3]}, dtype=object)
+    QueryCacheManager.set("key", {"df": df}, region=CacheRegion.DATA)
+    assert isinstance(data_cache.get("key")["df_arrow"], bytes)
+
+    query_cache = QueryCacheManager.get("key", region=CacheRegion.DATA)
+    assert_frame_equal(query_cache.df, df)
+    assert query_cache.df["id"][0] == 2**60 + 1
+
+
+def test_set_arrow_chunks(mocker: MockerFixture, data_cache: Cache) -> None:
+    """
+    Test that large DataFrames are split into chunks stored under their own keys.
+    """
+    from superset.common.utils.query_cache_manager import QueryCacheManager
+
+    mocker.patch.dict(
+        "superset.common.utils.query_cache_manager.config",
+        {"DATA_CACHE_CHUNK_SIZE": 1024},
+    )
+    df = get_dataframe()
+    QueryCacheManager.set("key", {"df": df, "query": ""}, region=CacheRegion.DATA)
+
+    chunk_count = data_cache.get("key")["df_arrow_chunks"]
+    assert chunk_count > 1
+    assert_frame_equal(QueryCacheManager.get("key", region=CacheRegion.DATA).df, df)
+
+    # values whose chunks were evicted are cache misses
+    data_cache.delete("key:chunk:0")
+    assert not QueryCacheManager.get("key", region=CacheRegion.DATA).is_loaded
+
+    QueryCacheManager.delete("key", region=CacheRegion.DATA)
+    assert data_cache.get("key") is None
+    assert data_cache.get(f"key:chunk:{chunk_count - 1}") is None
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        pd.DataFrame({"mixed": [1, "a"]}),
+        pd.DataFrame({"nested": [[1, 2], [3]]}),
+        pd.DataFrame([[1, 2]], columns=["duplicate", "duplicate"]),
+    ],
+)
+def test_set_pickle_fallback(data_cache: Cache, df: pd.DataFrame) -> None:
+    """
+    Test that DataFrames Arrow cannot represent faithfully are pickled.
+    """
+    from superset.common.utils.query_cache_manager import QueryCacheManager
+
+    QueryCacheManager.set("key", {"df": df, "query": ""}, region=CacheRegion.DATA)
+
+    assert "df_arrow" not in data_cache.get("key")
+    assert_frame_equal(QueryCacheManager.get("key", region=CacheRegion.DATA).df, df)
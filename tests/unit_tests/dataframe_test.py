@@ -203,3 +203,29 @@ def test_max_pandas_timestamp(input_, expected) -> None:
     df = results.to_pandas_df()
 
     assert df_to_records(df) == expected
+
+
+def test_df_to_records_dtypes() -> None:
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {
+            "int": np.array([1, 2**60], dtype="int64"),
+            "object": [np.int64(2), 2**60],
+            "nullable": pd.array([1, None], dtype="Int64"),
+            "str": ["a", None],
+        }
+    )
+    records = df_to_records(df)
+    assert records == [
+        {"int": 1, "object": 2, "nullable": 1, "str": "a"},
+        {"int": str(2**60), "object": str(2**60), "nullable": None, "str": None},
+    ]
+    assert type(records[0]["object"]) is int
+    assert type(records[0]["nullable"]) is int
+
+    assert df_to_records(df, convert_big_integers=False) == [
+        {"int": 1, "object": 2, "nullable": 1, "str": "a"},
+        {"int": 2**60, "object": 2**60, "nullable": None, "str": None},
+    ]
@@ -15,11 +15,14 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from datetime import datetime
 from typing import Any
 
+import prison
+from pytest_mock import MockerFixture
 from sqlalchemy.orm.session import Session
 
-from superset import db
+from superset import db, security_manager
 
 
 def test_put_invalid_dataset(
@@ -73,3 +76,59 @@ def test_put_invalid_dataset(
             }
         ]
     }
+
+
+def test_get_sdmx_ingestions(
+    session: Session,
+    client: Any,
+    full_api_access: None,
+    mocker: MockerFixture,
+) -> None:
+    """
+    Test that the ingestion history of an SDMX dataset can be listed.
+    """
+    from superset.connectors.sqla.models import SdmxIngestionLog, SqlaTable
+    from superset.datasets.sdmx_ingestions.api import SdmxIngestionLogRestApi
+    from superset.models.core import Database
+
+    SqlaTable.metadata.create_all(db.session.get_bind())
+    mocker.patch.object(SdmxIngestionLogRestApi.datamodel, "session", session)
+    mocker.patch.object(
+        security_manager, "can_access_all_datasources", return_value=True
+    )
+
+    database = Database(database_name="my_db", sqlalchemy_uri="sqlite://")
+    datasets = [
+        SqlaTable(table_name=f"exr_{index}", database=database, is_sdmx=True)
+        for index in range(2)
+    ]
+    for index, dataset in enumerate(datasets):
+        db.session.add(
+            SdmxIngestionLog(
+                table=dataset,
+                sdmx_url="https://data-api.ecb.europa.eu/service/data/EXR/A",
+                agency_id="ECB",
+                dataflow_id="EXR",
+                kind="full",
+                state="success",
+                start_dttm=datetime(2024, 1, 1 + index),
+                duration_ms=1500,
+                rows=42,
+                stages='{"http_fetch": 1000.0, "write": 500.0}',
+            )
+        )
+    db.session.commit()
+
+    response = client.get(
+        "/api/v1/sdmx_ingestion/?q="
+        + prison.dumps(
+            {"filters": [{"col": "table", "opr": "rel_o_m", "value": datasets[1].id}]}
+        )
+    )
+
+    assert response.status_code == 200
+    assert response.json["count"] == 1
+    result = response.json["result"][0]
+    assert result["table_id"] == datasets[1].id
+    assert result["dataflow_id"] == "EXR"
+    assert result["rows"] == 42
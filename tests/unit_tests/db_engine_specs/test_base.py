@@ -20,6 +20,7 @@
 from __future__ import annotations
 
 import json
+from decimal import Decimal
 from textwrap import dedent
 from typing import Any
 
@@ -382,3 +383,35 @@ def test_unmask_encrypted_extra() -> None:
             },
         }
     )
+
+
+def test_fetch_arrow_column_type_mutators(mocker: MockerFixture) -> None:
+    """
+    Test that the column type mutators are applied to each batch fetched as
+    Arrow, as they are by `fetch_data`.
+    """
+    from superset.db_engine_specs.base import BaseEngineSpec
+
+    class ArrowEngineSpec(BaseEngineSpec):
+        supports_arrow_fetch = True
+        arrow_fetch_batch_size = 2
+        column_type_mutators = {
+            types.Numeric: lambda val: Decimal(val) if isinstance(val, str) else val
+        }
+
+    cursor = mocker.MagicMock()
+    cursor.fetchmany.side_effect = [
+        [("1.23456", "abc"), (None, "def")],
+        [("2.50000", "ghi")],
+        [],
+    ]
+    cursor.description = [("dec", "decimal(12,6)"), ("str", "varchar(3)")]
+
+    table = ArrowEngineSpec.fetch_arrow(cursor)
+
+    assert table.column("dec").to_pylist() == [
+        Decimal("1.23456"),
+        None,
+        Decimal("2.50000"),
+    ]
+    assert table.column("str").to_pylist() == ["abc", "def", "ghi"]
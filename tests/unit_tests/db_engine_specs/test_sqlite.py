@@ -19,6 +19,7 @@ from datetime import datetime
 from typing import Optional
 
 import pytest
+from pytest_mock import MockerFixture
 from sqlalchemy.engine import create_engine
 
 from superset.constants import TimeGrain
@@ -129,3 +130,31 @@ def test_time_grain_expressions(dttm: str, grain: str, expected: str) -> None:
     sql = f"SELECT {expression} FROM t"  # noqa: S608
     result = connection.execute(sql).scalar()
     assert result == expected
+
+
+def test_fetch_arrow(mocker: MockerFixture) -> None:
+    """
+    Test that SQLite results are fetched as an Arrow table, one batch at a time.
+    """
+    import sqlite3
+
+    import pyarrow as pa
+
+    from superset.db_engine_specs.sqlite import SqliteEngineSpec
+    from superset.result_set import SupersetResultSet
+
+    mocker.patch.object(SqliteEngineSpec, "arrow_fetch_batch_size", 2)
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.execute(
+        "SELECT 1 AS id, 'a' AS code UNION ALL SELECT 2, 'b' UNION ALL SELECT 3.5, 4"
+    )
+
+    table = SqliteEngineSpec.fetch_arrow(cursor)
+
+    assert table.column_names == ["id", "code"]
+    assert table.column("id").type == pa.float64()
+    assert table.column("id").to_pylist() == [1.0, 2.0, 3.5]
+    assert table.column("code").to_pylist() == ["a", "b", "4"]
+
+    result_set = SupersetResultSet(table, cursor.description, SqliteEngineSpec)
+    assert [column["type"] for column in result_set.columns] == ["FLOAT", "STRING"]
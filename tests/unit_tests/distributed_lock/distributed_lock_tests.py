@@ -17,6 +17,7 @@
 
 # pylint: disable=invalid-name
 
+from datetime import timedelta
 from typing import Any
 from uuid import UUID
 
@@ -99,3 +100,37 @@ def test_key_value_distributed_lock_expired() -> None:
                 assert _get_lock(MAIN_KEY, session) is None
 
         assert _get_lock(MAIN_KEY, session) is None
+
+
+def test_key_value_distributed_lock_custom_expiration() -> None:
+    """
+    Test that a lock can be held for longer than the default expiration.
+    """
+    session = _get_other_session()
+
+    with freeze_time("2021-01-01 00:00:00") as frozen_time:
+        with KeyValueDistributedLock(
+            "ns", lock_expiration=timedelta(hours=1), a=1, b=2
+        ):
+            frozen_time.tick(timedelta(minutes=30))
+            assert _get_lock(MAIN_KEY, session) == LOCK_VALUE
+            frozen_time.tick(timedelta(minutes=31))
+            assert _get_lock(MAIN_KEY, session) is None
+
+
+def test_key_value_distributed_lock_released_on_error() -> None:
+    """
+    Test that the lock is released when the code holding it raises.
+    """
+    session = _get_other_session()
+
+    def refresh() -> None:
+        with KeyValueDistributedLock("ns", a=1, b=2):
+            assert _get_lock(MAIN_KEY, session) == LOCK_VALUE
+            raise ValueError("Refresh failed")
+
+    with freeze_time("2021-01-01"):
+        with pytest.raises(ValueError, match="Refresh failed"):
+            refresh()
+
+        assert _get_lock(MAIN_KEY, session) is None
@@ -255,3 +255,59 @@ def test_allowed_dbs(mocker: MockerFixture, app_context: None, table1: None) ->
 (Background on this error at: https://sqlalche.me/e/14/f405)
         """.strip()
     )
+
+
+@with_feature_flags(ENABLE_SUPERSET_META_DB=True)
+def test_sdmx(mocker: MockerFixture, app_context: None) -> None:
+    """
+    Test querying an SDMX dataflow, with filters pushed down into the query.
+    """
+    from shillelagh.adapters.registry import registry
+
+    from superset.extensions.metadb import SdmxShillelaghAdapter
+
+    mocker.patch.dict(registry.loaders, {"sdmx": [lambda: SdmxShillelaghAdapter]})
+    mocker.patch(
+        "superset.sdmx.get_sdmx_components",
+        return_value=(
+            ["FREQ", "CURRENCY", "CURRENCY_DENOM"],
+            "TIME_PERIOD",
+            ["OBS_VALUE"],
+            ["OBS_STATUS"],
+        ),
+    )
+    read_sdmx_slice = mocker.patch(
+        "superset.sdmx.read_sdmx_slice",
+        return_value=[
+            {
+                "FREQ": "M",
+                "CURRENCY": "USD",
+                "CURRENCY_DENOM": "EUR",
+                "TIME_PERIOD": period,
+                "OBS_VALUE": value,
+                "OBS_STATUS": "A",
+            }
+            for period, value in [("2023-12", "1.1"), ("2024-01", "1.2")]
+        ],
+    )
+
+    engine = create_engine("superset://")
+    conn = engine.connect()
+    results = conn.execute(
+        "SELECT CURRENCY, TIME_PERIOD, OBS_VALUE "
+        'FROM "https://data-api.ecb.europa.eu/service/data/EXR/M..EUR" '
+        "WHERE CURRENCY = 'USD' AND TIME_PERIOD >= '2024-01'"
+    )
+    assert list(results) == [("USD", "2024-01", 1.2)]
+    read_sdmx_slice.assert_called_once_with(
+        "https://data-api.ecb.europa.eu/service/data/EXR/M.USD.EUR"
+        "?startPeriod=2024-01"
+    )
+
+    results = conn.execute(
+        "SELECT COUNT(*) "
+        'FROM "https://data-api.ecb.europa.eu/service/data/EXR/M.USD.EUR" '
+        "WHERE CURRENCY = 'JPY'"
+    )
+    assert list(results) == [(0,)]
+    assert read_sdmx_slice.call_count == 1
@@ -164,3 +164,46 @@ def test_timezone_series(mocker: MockerFixture) -> None:
         [pd.Timestamp("2023-01-01 00:00:00+0000", tz="UTC")]
     ]
     logger.exception.assert_not_called()
+
+
+def test_stringify_offending_columns_only() -> None:
+    """
+    Test that only the columns Arrow cannot convert are stringified.
+    """
+    data = [(1, {"a": 1}, "x"), (2, None, "y")]
+    description = [("id",), ("map",), ("name",)]
+    result_set = SupersetResultSet(data, description, BaseEngineSpec)  # type: ignore
+
+    assert [column["type"] for column in result_set.columns] == [
+        "INT",
+        "STRING",
+        "STRING",
+    ]
+    assert result_set.to_pandas_df().to_dict(orient="records") == [
+        {"id": 1, "map": "{'a': 1}", "name": "x"},
+        {"id": 2, "map": None, "name": "y"},
+    ]
+
+
+def test_arrow_table() -> None:
+    """
+    Test that a columnar fetch is used as is, with nested columns stringified.
+    """
+    import pyarrow as pa
+
+    table = pa.table({"id": [1, 2], "tags": [["a"], ["b", "c"]]})
+    result_set = SupersetResultSet(
+        table,
+        [("id", "int"), ("id", "string")],  # type: ignore
+        BaseEngineSpec,
+    )
+
+    assert result_set.table.column_names == ["id", "id__1"]
+    assert result_set.table.column("id").type == pa.int64()
+    assert result_set.to_pandas_df().to_dict(orient="records") == [
+        {"id": 1, "id__1": '["a"]'},
+        {"id": 2, "id__1": '["b", "c"]'},
+    ]
+
+    result_set = SupersetResultSet(table.slice(0, 0), None, BaseEngineSpec)  # type: ignore
+    assert result_set.columns == []
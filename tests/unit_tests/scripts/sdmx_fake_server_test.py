@@ -0,0 +1,264 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import importlib.util
+import sqlite3
+import sys
+from collections import OrderedDict
+from collections.abc import Iterator
+from io import BufferedReader, BytesIO
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+from flask import current_app
+from flask_caching.backends import SimpleCache
+from pytest_mock import MockerFixture
+from sqlalchemy.orm.session import Session
+
+SCRIPT = Path(__file__).parents[3] / "scripts" / "sdmx_fake_server.py"
+
+
+@pytest.fixture(scope="module")
+def fake_server() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("sdmx_fake_server", SCRIPT)
+    module = importlib.util.module_from_spec(spec)  # type: ignore
+    sys.modules[spec.name] = module  # type: ignore
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+@pytest.fixture
+def server(fake_server: ModuleType) -> Iterator[Any]:
+    dataflow = fake_server.SyntheticDataflow(
+        series=3, observations=2, dimensions=2, codes_per_dimension=2
+    )
+    server = fake_server.start_server([dataflow])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_synthetic_dataflow(fake_server: ModuleType) -> None:
+    dataflow = fake_server.SyntheticDataflow(
+        series=10, observations=14, dimensions=2, codes_per_dimension=2
+    )
+
+    assert dataflow.series_count == 4
+    assert dataflow.series_key(3) == ["C1", "C1"]
+    assert dataflow.time_periods(2) == ["2001-01", "2001-02"]
+    assert len(list(dataflow.iter_observations())) == 4 * 14
+
+
+def test_render_data(fake_server: ModuleType) -> None:
+    """
+    Test that the generated SDMX-CSV and SDMX-ML messages have the same
+    observations once parsed.
+    """
+    from superset.sdmx import iter_sdmx_data
+
+    dataflow = fake_server.SyntheticDataflow(
+        series=3, observations=2, dimensions=2, codes_per_dimension=2
+    )
+
+    def parse(chunks: Iterator[bytes]) -> list[dict[str, str]]:
+        return [
+            row
+            for _, rows in iter_sdmx_data(
+                BufferedReader(BytesIO(b"".join(chunks))), 100
+            )
+            for row in rows
+        ]
+
+    csv_rows = parse(fake_server.render_csv(dataflow))
+    xml_rows = parse(fake_server.render_structure_specific(dataflow))
+
+    assert len(csv_rows) == 6
+    assert csv_rows == xml_rows
+    assert csv_rows[0]["DIM_0"] == "C0"
+    assert csv_rows[0]["TIME_PERIOD"] == "2000-01"
+
+
+def test_render_structure(fake_server: ModuleType) -> None:
+    from sdmxthon import read_sdmx
+
+    from superset.sdmx import _create_codelist_lookup, _generate_insight_dict
+
+    dataflow = fake_server.SyntheticDataflow(
+        dimensions=2, codes_per_dimension=3, languages=["en", "fr"]
+    )
+
+    message = read_sdmx(BytesIO(fake_server.render_structure(dataflow)), validate=False)
+    insight = _generate_insight_dict(
+        message.payload, codelist_factory=_create_codelist_lookup
+    )
+
+    assert list(insight) == ["DIM_0", "DIM_1", "TIME_PERIOD"]
+    assert insight["DIM_1"]["codelist"]["C2"] == {
+        "DIM_1-en": "DIM_1 2 (en)",
+        "DIM_1-fr": "DIM_1 2 (fr)",
+    }
+
+
+def test_stream_from_server(server: Any, mocker: MockerFixture) -> None:
+    """
+    Test that a chunked SDMX-CSV response is streamed to its end, and that
+    `updatedAfter` queries have no results.
+    """
+    from superset.sdmx import (
+        add_query_params,
+        iter_sdmx_data,
+        open_sdmx_stream,
+        SdmxNoResultsError,
+    )
+
+    dataflow = next(iter(server.dataflows.values()))
+    url = server.data_url(dataflow)
+
+    with open_sdmx_stream(url) as stream:
+        batches = list(iter_sdmx_data(stream, 4))
+    assert [len(rows) for _, rows in batches] == [4, 2]
+    assert batches[0][0] == "ECB:BENCH(1.0)"
+
+    mocker.patch.dict(current_app.config, {"SDMX_DATA_ACCEPT": "application/xml"})
+    with open_sdmx_stream(url) as stream:
+        assert sum(len(rows) for _, rows in iter_sdmx_data(stream, 4)) == 6
+
+    with pytest.raises(SdmxNoResultsError):
+        with open_sdmx_stream(add_query_params(url, updatedAfter="2024-01-01")):
+            pass
+
+
+def test_read_sdmx_slice(server: Any, mocker: MockerFixture) -> None:
+    """
+    Test that a slice only transfers the matching observations, and that it is
+    then served from the local cache.
+    """
+    from superset.sdmx import add_query_params, build_sdmx_slice_url, read_sdmx_slice
+
+    dataflow = next(iter(server.dataflows.values()))
+    url = build_sdmx_slice_url(
+        server.data_url(dataflow),
+        dataflow.dimension_ids,
+        {"DIM_0": {"C1"}},
+        start_period="2000-02",
+    )
+    mocker.patch.dict(
+        current_app.config,
+        {
+            "SDMX_VIRTUAL_TABLE_CACHE_TTL": 60,
+            "SDMX_VIRTUAL_TABLE_CACHE_SIZE": 1,
+            "SDMX_VIRTUAL_TABLE_CACHE_MAX_ROWS": 100,
+        },
+    )
+    mocker.patch("superset.sdmx._slices", OrderedDict())
+
+    sent_before = server.bytes_sent
+    observations = list(read_sdmx_slice(url))
+    assert [(row["DIM_0"], row["TIME_PERIOD"]) for row in observations] == [
+        ("C1", "2000-02")
+    ]
+    sent = server.bytes_sent - sent_before
+    assert list(read_sdmx_slice(url)) == observations
+    assert server.bytes_sent - sent_before == sent
+
+    assert list(read_sdmx_slice(add_query_params(url, endPeriod="1999"))) == []
+    sent_before = server.bytes_sent
+    assert list(read_sdmx_slice(url)) == observations
+    assert server.bytes_sent - sent_before == sent
+
+
+def test_read_sdmx_slice_streams_large_slices(
+    server: Any, mocker: MockerFixture
+) -> None:
+    """
+    Test that slices over the row limit, or not read to the end, are streamed
+    without being cached.
+    """
+    from superset.sdmx import read_sdmx_slice
+
+    dataflow = next(iter(server.dataflows.values()))
+    url = server.data_url(dataflow)
+    mocker.patch.dict(
+        current_app.config,
+        {
+            "SDMX_VIRTUAL_TABLE_CACHE_TTL": 60,
+            "SDMX_VIRTUAL_TABLE_CACHE_SIZE": 1,
+            "SDMX_VIRTUAL_TABLE_CACHE_MAX_ROWS": 2,
+        },
+    )
+    slices = mocker.patch("superset.sdmx._slices", OrderedDict())
+
+    observations = list(read_sdmx_slice(url))
+    assert len(observations) > 2
+    assert not slices
+
+    current_app.config["SDMX_VIRTUAL_TABLE_CACHE_MAX_ROWS"] = 100
+    rows = read_sdmx_slice(url)
+    assert next(rows) == observations[0]
+    rows.close()
+    assert not slices
+
+    assert list(read_sdmx_slice(url)) == observations
+    assert list(slices) == [url]
+
+
+def test_load_database_from_server(
+    server: Any,
+    fake_server: ModuleType,
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    session: Session,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that a dataflow of the fake server is resolved to its agency, and loaded
+    into a new dataset with `load_database`.
+    """
+    from superset.connectors.sqla.models import SqlaTable
+    from superset.models.core import Database
+    from superset.sdmx import get_agency_id, load_database
+
+    SqlaTable.metadata.create_all(session.get_bind())
+    mocker.patch(
+        "superset.security.manager.SupersetSecurityManager.dataset_after_insert"
+    )
+    mocker.patch("superset.sdmx.cache_manager", sdmx_structure_cache=SimpleCache())
+
+    def create_database(properties: dict[str, Any]) -> Any:
+        database = Database(**properties)
+        session.add(database)
+        session.commit()
+        return mocker.Mock(run=mocker.Mock(return_value=database))
+
+    mocker.patch("superset.sdmx.CreateDatabaseCommand", side_effect=create_database)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dbs").mkdir()
+
+    dataflow = next(iter(server.dataflows.values()))
+    url = server.data_url(dataflow)
+    assert get_agency_id(url) is None
+
+    with fake_server.serve_as_agency(server):
+        assert get_agency_id(url) == fake_server.AGENCY_ID
+        dataset = load_database(url)
+
+    assert dataset.sdmx_url == url
+    assert {"DIM_0", "DIM_1", "OBS_VALUE"} <= set(dataset.column_names)
+    with sqlite3.connect(tmp_path / "dbs" / dataset.sdmx_uuid) as conn:
+        query = f'SELECT COUNT(*) FROM "{dataset.table_name}"'  # noqa: S608
+        assert conn.execute(query).fetchone() == (6,)
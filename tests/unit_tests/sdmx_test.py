@@ -0,0 +1,1616 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# pylint: disable=import-outside-toplevel
+import json
+import sqlite3
+from datetime import datetime
+from io import BufferedReader, BytesIO
+from itertools import count
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+import pytest
+from flask import Flask
+from flask_caching.backends import SimpleCache
+from pytest_mock import MockerFixture
+from sqlalchemy.orm.session import Session
+from urllib3.util.retry import Retry
+
+STRUCTURE_SPECIFIC_MESSAGE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<message:StructureSpecificData
+    xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message"
+    xmlns:ss="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/structurespecific"
+    xmlns:common="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/common">
+  <message:Header>
+    <message:ID>IREF000001</message:ID>
+    <message:Structure structureID="ECB_EXR1" dimensionAtObservation="TIME_PERIOD">
+      <common:Structure>
+        <Ref agencyID="ECB" id="ECB_EXR1" version="1.0"/>
+      </common:Structure>
+    </message:Structure>
+  </message:Header>
+  <message:DataSet ss:structureRef="ECB_EXR1">
+    <Series FREQ="A" CURRENCY="USD" TITLE="Dollar">
+      <Obs TIME_PERIOD="2020" OBS_VALUE="1.14"/>
+      <Obs TIME_PERIOD="2021" OBS_VALUE="1.18"/>
+    </Series>
+    <Series FREQ="A" CURRENCY="JPY">
+      <Obs TIME_PERIOD="2020" OBS_VALUE="121.8" OBS_STATUS="P"/>
+    </Series>
+  </message:DataSet>
+</message:StructureSpecificData>
+"""
+
+GENERIC_MESSAGE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<message:GenericData
+    xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message"
+    xmlns:generic="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/generic"
+    xmlns:common="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/common">
+  <message:Header>
+    <message:Structure structureID="STR1" dimensionAtObservation="TIME_PERIOD">
+      <common:StructureUsage>
+        <Ref agencyID="ESTAT" id="NAMA" version="1.0"/>
+      </common:StructureUsage>
+    </message:Structure>
+  </message:Header>
+  <message:DataSet structureRef="STR1">
+    <generic:Series>
+      <generic:SeriesKey>
+        <generic:Value id="FREQ" value="A"/>
+        <generic:Value id="GEO" value="ES"/>
+      </generic:SeriesKey>
+      <generic:Attributes>
+        <generic:Value id="UNIT_MULT" value="0"/>
+      </generic:Attributes>
+      <generic:Obs>
+        <generic:ObsDimension value="2020"/>
+        <generic:ObsValue value="10"/>
+        <generic:Attributes>
+          <generic:Value id="OBS_FLAG" value="e"/>
+        </generic:Attributes>
+      </generic:Obs>
+      <generic:Obs>
+        <generic:ObsDimension value="2021"/>
+        <generic:ObsValue value="11"/>
+      </generic:Obs>
+    </generic:Series>
+  </message:DataSet>
+</message:GenericData>
+"""
+
+
+def test_iter_sdmx_batches_structure_specific() -> None:
+    from superset.sdmx import iter_sdmx_batches
+
+    batches = list(iter_sdmx_batches(BytesIO(STRUCTURE_SPECIFIC_MESSAGE), 100))
+
+    assert batches == [
+        (
+            "ECB:ECB_EXR1(1.0)",
+            [
+                {
+                    "FREQ": "A",
+                    "CURRENCY": "USD",
+                    "TITLE": "Dollar",
+                    "TIME_PERIOD": "2020",
+                    "OBS_VALUE": "1.14",
+                },
+                {
+                    "FREQ": "A",
+                    "CURRENCY": "USD",
+                    "TITLE": "Dollar",
+                    "TIME_PERIOD": "2021",
+                    "OBS_VALUE": "1.18",
+                },
+                {
+                    "FREQ": "A",
+                    "CURRENCY": "JPY",
+                    "TIME_PERIOD": "2020",
+                    "OBS_VALUE": "121.8",
+                    "OBS_STATUS": "P",
+                },
+            ],
+        )
+    ]
+
+
+def test_iter_sdmx_batches_respects_batch_size() -> None:
+    from superset.sdmx import iter_sdmx_batches
+
+    batches = list(iter_sdmx_batches(BytesIO(STRUCTURE_SPECIFIC_MESSAGE), 2))
+
+    assert [len(rows) for _, rows in batches] == [2, 1]
+
+
+def test_iter_sdmx_batches_generic() -> None:
+    from superset.sdmx import iter_sdmx_batches
+
+    batches = list(iter_sdmx_batches(BytesIO(GENERIC_MESSAGE), 100))
+
+    assert batches == [
+        (
+            "ESTAT:NAMA(1.0)",
+            [
+                {
+                    "FREQ": "A",
+                    "GEO": "ES",
+                    "UNIT_MULT": "0",
+                    "TIME_PERIOD": "2020",
+                    "OBS_VALUE": "10",
+                    "OBS_FLAG": "e",
+                },
+                {
+                    "FREQ": "A",
+                    "GEO": "ES",
+                    "UNIT_MULT": "0",
+                    "TIME_PERIOD": "2021",
+                    "OBS_VALUE": "11",
+                },
+            ],
+        )
+    ]
+
+
+def test_iter_sdmx_batches_error_message() -> None:
+    from superset.sdmx import iter_sdmx_batches
+
+    message = b"""<?xml version="1.0" encoding="UTF-8"?>
+<message:Error
+    xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message"
+    xmlns:common="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/common">
+  <message:ErrorMessage code="500">
+    <common:Text>Internal error</common:Text>
+  </message:ErrorMessage>
+</message:Error>
+"""
+    with pytest.raises(Exception, match="Internal error"):
+        list(iter_sdmx_batches(BytesIO(message), 100))
+
+
+def test_apply_codelist_lookups() -> None:
+    from superset.sdmx import apply_codelist_lookups
+
+    lookups = {"CURRENCY": {"USD": {"CURRENCY-en": "US dollar"}}}
+    batches = [("DS", [{"CURRENCY": "USD"}, {"CURRENCY": "XXX"}])]
+
+    assert list(apply_codelist_lookups(batches, lookups)) == [
+        ("DS", [{"CURRENCY": "USD", "CURRENCY-en": "US dollar"}])
+    ]
+
+
+def test_get_codelist_columns(mocker: MockerFixture) -> None:
+    from collections import OrderedDict
+    from types import SimpleNamespace
+
+    from flask import current_app
+
+    import superset.sdmx
+    from superset.sdmx import (
+        _create_codelist_dataframe,
+        _create_codelist_lookup,
+        get_codelist_columns,
+    )
+
+    def codelist(id_, names):
+        return SimpleNamespace(
+            urn=None,
+            unique_id=f"ECB:{id_}(1.0)",
+            items={
+                code: SimpleNamespace(
+                    name={lang: {"content": label} for lang, label in labels}
+                )
+                for code, labels in names.items()
+            },
+        )
+
+    cache = SimpleCache()
+    mocker.patch("superset.sdmx.cache_manager", sdmx_structure_cache=cache)
+    mocker.patch("superset.sdmx._codelists", OrderedDict())
+    mocker.patch.dict(current_app.config, {"SDMX_CODELIST_CACHE_SIZE": 3})
+    build = mocker.spy(superset.sdmx, "_create_codelist_columns")
+    cl_area = codelist(
+        "CL_AREA", {"ES": [("en", "Spain"), ("es", "España")], "FR": [("fr", "France")]}
+    )
+
+    assert get_codelist_columns(cl_area) == {
+        "ids": ["ES", "FR"],
+        "names": {
+            "en": ["Spain", None],
+            "es": ["España", None],
+            "fr": [None, "France"],
+        },
+    }
+    assert _create_codelist_lookup(cl_area, "REF_AREA") == {
+        "ES": {"REF_AREA-en": "Spain", "REF_AREA-es": "España"},
+        "FR": {"REF_AREA-fr": "France"},
+    }
+    assert list(_create_codelist_dataframe(cl_area, "COUNTERPART_AREA").columns) == [
+        "id",
+        "COUNTERPART_AREA-en",
+        "COUNTERPART_AREA-es",
+        "COUNTERPART_AREA-fr",
+    ]
+    assert build.call_count == 1
+
+    # Codelists over the local size are evicted, but stay in the shared cache
+    get_codelist_columns(codelist("CL_FREQ", {"A": [("en", "Annual")]}))
+    get_codelist_columns(codelist("CL_UNIT", {"EUR": [("en", "Euro")]}))
+    assert list(superset.sdmx._codelists) == [
+        "sdmx_codelist:ECB:CL_FREQ(1.0)",
+        "sdmx_codelist:ECB:CL_UNIT(1.0)",
+    ]
+    assert build.call_count == 3
+    get_codelist_columns(cl_area)
+    assert build.call_count == 3
+
+
+def test_write_sdmx_batches(tmp_path: Path) -> None:
+    from superset.sdmx import write_sdmx_batches
+
+    database_path = str(tmp_path / "store")
+    batches = [
+        ("DS", [{"FREQ": "A", "OBS_VALUE": "1"}]),
+        ("DS", [{"FREQ": "M", "OBS_VALUE": "2", "OBS_STATUS": "P"}]),
+    ]
+
+    (table_name,) = write_sdmx_batches(database_path, iter(batches))
+
+    assert table_name.startswith("DS ")
+    with sqlite3.connect(database_path) as conn:
+        rows = conn.execute(
+            f'SELECT FREQ, OBS_VALUE, OBS_STATUS FROM "{table_name}"'  # noqa: S608
+        ).fetchall()
+    assert rows == [("A", "1", None), ("M", "2", "P")]
+
+
+def test_write_sdmx_batches_rolls_back(tmp_path: Path) -> None:
+    from superset.sdmx import write_sdmx_batches
+
+    database_path = str(tmp_path / "store")
+
+    def batches():
+        yield "DS", [{"FREQ": "A"}]
+        raise ValueError("broken stream")
+
+    with pytest.raises(ValueError, match="broken stream"):
+        write_sdmx_batches(database_path, batches())
+
+    with sqlite3.connect(database_path) as conn:
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+
+def test_iter_sdmx_batches_no_results() -> None:
+    from superset.sdmx import iter_sdmx_batches, SdmxNoResultsError
+
+    message = b"""<?xml version="1.0" encoding="UTF-8"?>
+<message:Error
+    xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message"
+    xmlns:common="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/common">
+  <message:ErrorMessage code="100">
+    <common:Text>No Results Found</common:Text>
+  </message:ErrorMessage>
+</message:Error>
+"""
+    with pytest.raises(SdmxNoResultsError):
+        list(iter_sdmx_batches(BytesIO(message), 100))
+
+
+DELTA_MESSAGE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<message:StructureSpecificData
+    xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message"
+    xmlns:ss="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/structurespecific"
+    xmlns:common="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/common">
+  <message:Header>
+    <message:ID>IREF000002</message:ID>
+    <message:Structure structureID="ECB_EXR1" dimensionAtObservation="TIME_PERIOD">
+      <common:Structure>
+        <Ref agencyID="ECB" id="ECB_EXR1" version="1.0"/>
+      </common:Structure>
+    </message:Structure>
+  </message:Header>
+  <message:DataSet ss:structureRef="ECB_EXR1" action="Replace">
+    <Series FREQ="A" CURRENCY="USD">
+      <Obs TIME_PERIOD="2021" OBS_VALUE="1.2"/>
+    </Series>
+  </message:DataSet>
+  <message:DataSet ss:structureRef="ECB_EXR1" action="Delete">
+    <Series FREQ="A" CURRENCY="USD">
+      <Obs TIME_PERIOD="2020"/>
+    </Series>
+    <Series FREQ="A" CURRENCY="JPY"/>
+  </message:DataSet>
+</message:StructureSpecificData>
+"""
+
+
+def test_iter_sdmx_batches_deletions() -> None:
+    """
+    Test that the observations and series of deleted datasets are yielded as
+    deletions.
+    """
+    from superset.sdmx import iter_sdmx_batches, SdmxDeletedObservations
+
+    batches = list(iter_sdmx_batches(BytesIO(DELTA_MESSAGE), 100))
+
+    assert batches == [
+        (
+            "ECB:ECB_EXR1(1.0)",
+            [
+                {
+                    "FREQ": "A",
+                    "CURRENCY": "USD",
+                    "TIME_PERIOD": "2021",
+                    "OBS_VALUE": "1.2",
+                }
+            ],
+        ),
+        (
+            "ECB:ECB_EXR1(1.0)",
+            [
+                {"FREQ": "A", "CURRENCY": "USD", "TIME_PERIOD": "2020"},
+                {"FREQ": "A", "CURRENCY": "JPY"},
+            ],
+        ),
+    ]
+    assert not isinstance(batches[0][1], SdmxDeletedObservations)
+    assert isinstance(batches[1][1], SdmxDeletedObservations)
+
+
+def test_iter_sdmx_data_csv_deletions() -> None:
+    from superset.sdmx import iter_sdmx_data, SdmxDeletedObservations
+
+    message = (
+        b"STRUCTURE,STRUCTURE_ID,ACTION,FREQ,TIME_PERIOD,OBS_VALUE\n"
+        b"dataflow,ECB:EXR(1.0),I,A,2020,1.14\n"
+        b"dataflow,ECB:EXR(1.0),D,A,2021,\n"
+    )
+
+    batches = list(iter_sdmx_data(BufferedReader(BytesIO(message)), 100))
+
+    assert batches == [
+        ("ECB:EXR(1.0)", [{"FREQ": "A", "TIME_PERIOD": "2020", "OBS_VALUE": "1.14"}]),
+        ("ECB:EXR(1.0)", [{"FREQ": "A", "TIME_PERIOD": "2021", "OBS_VALUE": None}]),
+    ]
+    assert isinstance(batches[1][1], SdmxDeletedObservations)
+
+
+def test_refresh_incrementally_deletions(
+    mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    Test that an incremental refresh upserts the changed observations of the
+    delta, and deletes its deleted observations and series from the store.
+    """
+    from contextlib import nullcontext
+
+    from superset.sdmx import _refresh_incrementally, IngestionMetrics
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dbs").mkdir()
+    with sqlite3.connect(tmp_path / "dbs" / "store") as conn:
+        conn.execute(
+            'CREATE TABLE "EXR" (FREQ TEXT, CURRENCY TEXT, TIME_PERIOD TEXT, '
+            "OBS_VALUE TEXT)"
+        )
+        conn.executemany(
+            'INSERT INTO "EXR" VALUES (?, ?, ?, ?)',
+            [
+                ("A", "USD", "2020", "1.14"),
+                ("A", "USD", "2021", "1.18"),
+                ("A", "JPY", "2020", "121.8"),
+                ("A", "JPY", "2021", "129.9"),
+                ("A", "GBP", "2020", "0.89"),
+            ],
+        )
+    mocker.patch(
+        "superset.sdmx._fetch_codelist_lookups",
+        return_value=({"FREQ": "Frequency", "CURRENCY": "Currency"}, {}),
+    )
+    open_sdmx_stream = mocker.patch(
+        "superset.sdmx.open_sdmx_stream",
+        return_value=nullcontext(BufferedReader(BytesIO(DELTA_MESSAGE))),
+    )
+    mocker.patch("superset.sdmx.db")
+    mocker.patch("superset.sdmx.update_sdmx_store_datasets")
+    dataset = mocker.MagicMock(
+        sdmx_url="https://data-api.ecb.europa.eu/service/data/EXR/A..EUR.SP00.A",
+        sdmx_uuid="store",
+        table_name="EXR",
+        sdmx_updated_at=datetime(2024, 1, 1),
+    )
+
+    _refresh_incrementally(dataset, IngestionMetrics(dataset.sdmx_url))
+
+    assert "updatedAfter=2024-01-01T00:00:00Z" in open_sdmx_stream.call_args[0][0]
+    with sqlite3.connect(tmp_path / "dbs" / "store") as conn:
+        rows = conn.execute(
+            'SELECT FREQ, CURRENCY, TIME_PERIOD, OBS_VALUE FROM "EXR" '
+            "ORDER BY CURRENCY, TIME_PERIOD"
+        ).fetchall()
+    assert rows == [("A", "GBP", "2020", "0.89"), ("A", "USD", "2021", "1.2")]
+
+
+def test_add_query_params() -> None:
+    from superset.sdmx import add_query_params
+
+    assert (
+        add_query_params(
+            "https://example.org/data/ECB,EXR/?lastNObservations=5",
+            updatedAfter="2024-01-01T00:00:00Z",
+        )
+        == "https://example.org/data/ECB,EXR/"
+        "?lastNObservations=5&updatedAfter=2024-01-01T00:00:00Z"
+    )
+
+
+def test_write_sdmx_batches_upsert(tmp_path: Path) -> None:
+    from superset.sdmx import write_sdmx_batches
+
+    database_path = str(tmp_path / "store")
+    (table_name,) = write_sdmx_batches(
+        database_path,
+        iter(
+            [
+                (
+                    "DS",
+                    [
+                        {"GEO": "ES", "TIME_PERIOD": "2020", "OBS_VALUE": "1"},
+                        {"GEO": "FR", "TIME_PERIOD": "2020", "OBS_VALUE": "2"},
+                    ],
+                )
+            ]
+        ),
+    )
+
+    write_sdmx_batches(
+        database_path,
+        iter(
+            [
+                (
+                    "DS",
+                    [
+                        {"GEO": "ES", "TIME_PERIOD": "2020", "OBS_VALUE": "10"},
+                        {"GEO": "ES", "TIME_PERIOD": "2021", "OBS_VALUE": "11"},
+                    ],
+                )
+            ]
+        ),
+        table_name=table_name,
+        key_columns=["GEO", "TIME_PERIOD"],
+    )
+
+    with sqlite3.connect(database_path) as conn:
+        rows = conn.execute(
+            f'SELECT GEO, TIME_PERIOD, OBS_VALUE FROM "{table_name}" '  # noqa: S608
+            "ORDER BY GEO, TIME_PERIOD"
+        ).fetchall()
+    assert rows == [("ES", "2020", "10"), ("ES", "2021", "11"), ("FR", "2020", "2")]
+
+
+def test_drop_stale_tables(tmp_path: Path) -> None:
+    from superset.sdmx import drop_stale_tables
+
+    database_path = str(tmp_path / "store")
+    with sqlite3.connect(database_path) as conn:
+        conn.execute('CREATE TABLE "DS old" (a TEXT)')
+        conn.execute('CREATE TABLE "DS new" (a TEXT)')
+
+    drop_stale_tables(database_path, ["DS new"])
+
+    with sqlite3.connect(database_path) as conn:
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == [
+            ("DS new",)
+        ]
+
+
+def test_get_cached_structure(mocker: MockerFixture) -> None:
+    """
+    Test that the raw structure message is cached as JSON, and parsed once.
+    """
+    from collections import OrderedDict
+
+    from superset.key_value.types import JsonKeyValueCodec
+    from superset.sdmx import get_cached_structure, invalidate_structure_cache
+
+    cache = SimpleCache()
+    mocker.patch("superset.sdmx.cache_manager", sdmx_structure_cache=cache)
+    mocker.patch("superset.sdmx._structures", OrderedDict())
+    get = mocker.patch("superset.sdmx.get_sdmx_session").return_value.get
+    get.return_value.status_code = 200
+    get.return_value.headers = {"ETag": '"v1"'}
+    get.return_value.content = b"<Structure/>"
+    read_sdmx = mocker.patch("superset.sdmx.read_sdmx", return_value={"id": "EXR"})
+    ws = mocker.MagicMock(AGENCY_ID="ECB")
+
+    assert get_cached_structure(ws, "EXR") == read_sdmx.return_value
+    assert get_cached_structure(ws, "EXR") == read_sdmx.return_value
+    ws.get_data_flow_url.assert_called_once_with(
+        "EXR", version=None, references="descendants"
+    )
+    assert get.call_count == 1
+    assert read_sdmx.call_count == 1
+    entry = cache.get("sdmx_structure:ECB:EXR:latest")
+    assert JsonKeyValueCodec().decode(JsonKeyValueCodec().encode(entry)) == entry
+    assert entry["content"] == "PFN0cnVjdHVyZS8+"
+
+    invalidate_structure_cache("ECB", "EXR")
+    get_cached_structure(ws, "EXR")
+    assert get.call_count == 2
+
+
+def test_get_cached_structure_revalidates(mocker: MockerFixture, app: Flask) -> None:
+    from collections import OrderedDict
+
+    from superset.sdmx import get_cached_structure
+
+    mocker.patch.dict(app.config, {"SDMX_STRUCTURE_CACHE_TTL": 0})
+    mocker.patch("superset.sdmx.cache_manager", sdmx_structure_cache=SimpleCache())
+    mocker.patch("superset.sdmx._structures", OrderedDict())
+    get = mocker.patch("superset.sdmx.get_sdmx_session").return_value.get
+    get.return_value.status_code = 200
+    get.return_value.headers = {"ETag": '"v1"'}
+    get.return_value.content = b"<Structure/>"
+    read_sdmx = mocker.patch("superset.sdmx.read_sdmx", return_value={"id": "EXR"})
+    ws = mocker.MagicMock(AGENCY_ID="ECB")
+
+    message = get_cached_structure(ws, "EXR", "1.0")
+    get.return_value.status_code = 304
+    assert get_cached_structure(ws, "EXR", "1.0") == message
+
+    assert read_sdmx.call_count == 1
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+def test_set_structure_cache_entry_keeps_caller_transaction(
+    mocker: MockerFixture,
+) -> None:
+    """
+    Test that metastore structure cache entries are written and committed with
+    a session of their own, leaving the session of the caller uncommitted.
+    """
+    from superset import db
+    from superset.extensions.metastore_cache import SupersetMetastoreCache
+    from superset.sdmx import _set_structure_cache_entry
+
+    cache = mocker.MagicMock(cache=mocker.MagicMock(spec=SupersetMetastoreCache))
+    mocker.patch("superset.sdmx.cache_manager", sdmx_structure_cache=cache)
+    sessions = []
+
+    def set_entry(key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        sessions.append(db.session())
+        db.session.commit()
+        return True
+
+    cache.set.side_effect = set_entry
+    outer = db.session()
+    commit = mocker.spy(outer, "commit")
+
+    _set_structure_cache_entry("sdmx_codelist:ECB:CL_FREQ(1.0)", {"ids": ["A"]})
+
+    cache.set.assert_called_once_with(
+        "sdmx_codelist:ECB:CL_FREQ(1.0)", {"ids": ["A"]}, timeout=None
+    )
+    assert sessions[0] is not outer
+    assert db.session() is outer
+    commit.assert_not_called()
+
+
+def test_get_dataflow_version() -> None:
+    from superset.sdmx import get_dataflow_version
+
+    assert get_dataflow_version("https://example.org/data/ECB,EXR,1.0/A..") == "1.0"
+    assert get_dataflow_version("https://example.org/data/ECB,EXR/A..") is None
+
+
+def test_search_dataflows() -> None:
+    from superset.sdmx import search_dataflows
+
+    dataflows = [
+        {"id": "BSI", "name": "Balance Sheet Items"},
+        {"id": "EXR", "name": "Exchange Rates"},
+        {"id": "MIR", "name": "MFI Interest Rate Statistics"},
+    ]
+
+    assert search_dataflows(dataflows, "E") == (
+        3,
+        [
+            {"id": "EXR", "name": "Exchange Rates"},
+            {"id": "BSI", "name": "Balance Sheet Items"},
+            {"id": "MIR", "name": "MFI Interest Rate Statistics"},
+        ],
+    )
+    assert search_dataflows(dataflows, "sheet") == (
+        1,
+        [{"id": "BSI", "name": "Balance Sheet Items"}],
+    )
+    assert search_dataflows(dataflows, page=1, page_size=2) == (
+        3,
+        [{"id": "MIR", "name": "MFI Interest Rate Statistics"}],
+    )
+
+
+def test_get_dataflow_catalog(mocker: MockerFixture) -> None:
+    from superset.sdmx import get_dataflow_catalog
+
+    mocker.patch("superset.sdmx.cache_manager", sdmx_structure_cache=SimpleCache())
+    mocker.patch("superset.sdmx.get_webservice_for_agency")
+    fetch_all_dataflows = mocker.patch(
+        "superset.sdmx.fetch_all_dataflows",
+        return_value=[{"id": "EXR", "name": "Exchange Rates"}],
+    )
+
+    catalog = get_dataflow_catalog("ECB")
+    assert get_dataflow_catalog("ECB") == catalog
+    assert catalog["dataflows"] == [{"id": "EXR", "name": "Exchange Rates"}]
+    fetch_all_dataflows.assert_called_once()
+
+
+def test_normalize_sdmx_url() -> None:
+    from superset.sdmx import normalize_sdmx_url
+
+    assert normalize_sdmx_url(
+        "HTTPS://Data-API.ecb.europa.eu/service/data/EXR/?lastNObservations=1"
+        "&detail=dataonly#top"
+    ) == (
+        "https://data-api.ecb.europa.eu/service/data/EXR"
+        "?detail=dataonly&lastNObservations=1"
+    )
+
+
+@pytest.mark.parametrize(
+    "sdmx_url, agency_id",
+    [
+        ("https://data-api.ecb.europa.eu/service/data/EXR", "ECB"),
+        ("https://Data-API.ecb.europa.eu/service/data/EXR", "ECB"),
+        ("https://stats.bis.org/api/v1/data/WS_CBPOL", "BIS"),
+        ("https://sdmx.oecd.org/public/rest/data/OECD.SDD,DSD,1.0/all", "OECD"),
+        ("https://sdw-wsrest.ecb.europa.eu/service/data/EXR", "ECB"),
+        ("https://stats.oecd.org/restsdmx/sdmx.ashx/GetData/QNA", "OECD"),
+        ("https://sdmx.ilo.org/rest/data/ILO,DF_EAR", "ILO"),
+        ("https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data/X", "ESTAT"),
+        ("http://169.254.169.254/x/data/EXR?ecb.europa.eu", None),
+        ("http://169.254.169.254/ecb.europa.eu/data/EXR", None),
+        ("http://data-api.ecb.europa.eu@169.254.169.254/data/EXR", None),
+        ("http://data-api.ecb.europa.eu.example.com/data/EXR", None),
+        ("http://data-api.ecb.europa.eu:8080/data/EXR", None),
+        ("http://notecb.europa.eu/data/EXR", None),
+        ("data-api.ecb.europa.eu/service/data/EXR", None),
+    ],
+)
+def test_get_agency_id(sdmx_url: str, agency_id: Optional[str]) -> None:
+    from superset.sdmx import get_agency_id
+
+    assert get_agency_id(sdmx_url) == agency_id
+
+
+def test_sdmx_adapter_supports_rejects_unknown_hosts() -> None:
+    from superset.extensions.metadb import SdmxShillelaghAdapter
+
+    assert SdmxShillelaghAdapter.supports(
+        "https://data-api.ecb.europa.eu/service/data/EXR/D.USD.EUR.SP00.A"
+    )
+    assert not SdmxShillelaghAdapter.supports(
+        "http://169.254.169.254/x/data/EXR?ecb.europa.eu"
+    )
+
+
+def test_load_datasets_deduplicates(mocker: MockerFixture) -> None:
+    from superset.sdmx import load_datasets
+
+    ingest_sdmx = mocker.patch(
+        "superset.sdmx.ingest_sdmx",
+        side_effect=lambda sdmx_url, dataset_uuid, progress, database_path: {
+            "sdmx_url": sdmx_url
+        },
+    )
+    mocker.patch(
+        "superset.sdmx.register_sdmx_dataset",
+        side_effect=lambda ingestion, progress: ingestion["sdmx_url"],
+    )
+    # ICP is already stored
+    mocker.patch(
+        "superset.sdmx.attach_sdmx_dataset",
+        side_effect=lambda key, sdmx_url, progress: (
+            f"attached {sdmx_url}" if sdmx_url.endswith("ICP") else None
+        ),
+    )
+
+    datasets = load_datasets(
+        [
+            "https://example.org/data/EXR?b=1&a=2",
+            "https://example.org/data/BSI",
+            "https://EXAMPLE.org/data/EXR?a=2&b=1",
+            "https://example.org/data/ICP",
+        ]
+    )
+
+    assert datasets == [
+        "https://example.org/data/EXR?b=1&a=2",
+        "https://example.org/data/BSI",
+        "https://example.org/data/EXR?b=1&a=2",
+        "attached https://example.org/data/ICP",
+    ]
+    assert ingest_sdmx.call_count == 2
+
+
+def test_load_datasets_removes_stores_on_failure(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    from superset.sdmx import load_datasets
+
+    mocker.patch("superset.sdmx.os.path.exists", return_value=True)
+    mocker.patch("superset.sdmx.attach_sdmx_dataset", return_value=None)
+    remove = mocker.patch("superset.sdmx.os.remove")
+    register = mocker.patch("superset.sdmx.register_sdmx_dataset")
+
+    def ingest_sdmx(sdmx_url, dataset_uuid, progress, database_path):
+        if sdmx_url.endswith("BSI"):
+            raise Exception("Internal error")
+        return {"sdmx_url": sdmx_url, "dataset_uuid": dataset_uuid}
+
+    mocker.patch("superset.sdmx.ingest_sdmx", side_effect=ingest_sdmx)
+
+    with pytest.raises(Exception, match="Internal error"):
+        load_datasets(["https://example.org/data/EXR", "https://example.org/data/BSI"])
+
+    assert remove.call_count == 2
+    register.assert_not_called()
+
+
+def test_normalize_codelists(tmp_path: Path) -> None:
+    from superset.sdmx import (
+        drop_stale_tables,
+        get_observations_table,
+        normalize_codelists,
+    )
+
+    database_path = str(tmp_path / "store")
+    with sqlite3.connect(database_path) as conn:
+        conn.execute('CREATE TABLE "DS" (FREQ TEXT, OBS_VALUE TEXT)')
+        conn.executemany('INSERT INTO "DS" VALUES (?, ?)', [("A", "1"), ("M", "2")])
+        conn.execute('CREATE TABLE "DS old" (a TEXT)')
+
+    normalize_codelists(
+        database_path,
+        ["DS"],
+        {
+            "FREQ": {
+                "A": {"FREQ-en": "Annual", "FREQ-es": "Anual"},
+                "M": {"FREQ-en": "Monthly", "FREQ-es": "Mensual"},
+            },
+            "REF_AREA": {"ES": {"REF_AREA-en": "Spain"}},
+        },
+    )
+    drop_stale_tables(database_path, ["DS"])
+
+    assert get_observations_table(database_path, "DS") == "DS__observations"
+    assert get_observations_table(database_path, "DS__observations") is None
+    with sqlite3.connect(database_path) as conn:
+        assert conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE type IN ('table', 'view') "
+            "ORDER BY name"
+        ).fetchall() == [
+            ("view", "DS"),
+            ("table", "DS__FREQ"),
+            ("table", "DS__observations"),
+        ]
+        assert conn.execute('SELECT * FROM "DS" ORDER BY FREQ').fetchall() == [
+            ("A", "1", "Annual", "Anual"),
+            ("M", "2", "Monthly", "Mensual"),
+        ]
+
+
+def test_create_sdmx_indexes(tmp_path: Path) -> None:
+    from superset.sdmx import create_sdmx_indexes
+
+    database_path = str(tmp_path / "store")
+    with sqlite3.connect(database_path) as conn:
+        conn.execute('CREATE TABLE "DS" (FREQ TEXT, REF_AREA TEXT, TIME_PERIOD TEXT)')
+
+    index_plan = create_sdmx_indexes(
+        database_path, ["DS"], {"FREQ": "Frequency", "REF_AREA": "Reference area"}
+    )
+
+    assert index_plan == {
+        "DS": [
+            {
+                "name": "ix_sdmx_DS_series_key",
+                "columns": ["FREQ", "REF_AREA", "TIME_PERIOD"],
+            },
+            {"name": "ix_sdmx_DS_REF_AREA", "columns": ["REF_AREA"]},
+            {"name": "ix_sdmx_DS_TIME_PERIOD", "columns": ["TIME_PERIOD"]},
+        ]
+    }
+    with sqlite3.connect(database_path) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM \"DS\" WHERE REF_AREA = 'ES'"
+        ).fetchall()
+        assert "ix_sdmx_DS_REF_AREA" in plan[0][-1]
+
+
+def test_parse_sdmx_periods() -> None:
+    from superset.sdmx import parse_sdmx_periods
+
+    starts, frequencies = parse_sdmx_periods(
+        pd.Series(
+            [
+                "2020-Q2",
+                "2020-M11",
+                "2020-W05",
+                "2021-W01",
+                "2020-S2",
+                "2020-T3",
+                "2020-A1",
+                "2020-D032",
+                "2020",
+                "2020-03",
+                "2020-03-15",
+                "2020-03-15T10:30:00",
+                "2020-M13",
+                None,
+            ]
+        )
+    )
+
+    assert starts.dt.strftime("%Y-%m-%d %H:%M").tolist()[:-2] == [
+        "2020-04-01 00:00",
+        "2020-11-01 00:00",
+        "2020-01-27 00:00",
+        "2021-01-04 00:00",
+        "2020-07-01 00:00",
+        "2020-09-01 00:00",
+        "2020-01-01 00:00",
+        "2020-02-01 00:00",
+        "2020-01-01 00:00",
+        "2020-03-01 00:00",
+        "2020-03-15 00:00",
+        "2020-03-15 10:30",
+    ]
+    assert starts[12:].isna().all()
+    assert frequencies.tolist()[:-3] == [
+        "Q",
+        "M",
+        "W",
+        "W",
+        "S",
+        "T",
+        "A",
+        "D",
+        "A",
+        "M",
+        "D",
+    ]
+    assert frequencies[11:].isna().all()
+
+
+def test_apply_time_period_columns() -> None:
+    from superset.sdmx import apply_time_period_columns
+
+    batches = [("DS", [{"TIME_PERIOD": "2020-Q3"}, {"TIME_PERIOD": "bad"}])]
+
+    assert list(apply_time_period_columns(batches)) == [
+        (
+            "DS",
+            [
+                {
+                    "TIME_PERIOD": "2020-Q3",
+                    "TIME_PERIOD_START": "2020-07-01 00:00:00",
+                    "TIME_PERIOD_FREQ": "Q",
+                },
+                {
+                    "TIME_PERIOD": "bad",
+                    "TIME_PERIOD_START": None,
+                    "TIME_PERIOD_FREQ": None,
+                },
+            ],
+        )
+    ]
+
+
+CSV_MESSAGE = b"""DATAFLOW,FREQ,CURRENCY,TIME_PERIOD,OBS_VALUE,OBS_STATUS
+ECB:EXR(1.0),A,USD,2020,1.14,A
+ECB:EXR(1.0),A,USD,2021,1.18,
+ECB:EXR(1.0),A,JPY,2020,121.8,A
+"""
+
+
+def test_iter_sdmx_data_csv() -> None:
+    from superset.sdmx import iter_sdmx_data
+
+    batches = list(iter_sdmx_data(BufferedReader(BytesIO(CSV_MESSAGE)), 2))
+
+    assert batches == [
+        (
+            "ECB:EXR(1.0)",
+            [
+                {
+                    "FREQ": "A",
+                    "CURRENCY": "USD",
+                    "TIME_PERIOD": "2020",
+                    "OBS_VALUE": "1.14",
+                    "OBS_STATUS": "A",
+                },
+                {
+                    "FREQ": "A",
+                    "CURRENCY": "USD",
+                    "TIME_PERIOD": "2021",
+                    "OBS_VALUE": "1.18",
+                    "OBS_STATUS": None,
+                },
+            ],
+        ),
+        (
+            "ECB:EXR(1.0)",
+            [
+                {
+                    "FREQ": "A",
+                    "CURRENCY": "JPY",
+                    "TIME_PERIOD": "2020",
+                    "OBS_VALUE": "121.8",
+                    "OBS_STATUS": "A",
+                }
+            ],
+        ),
+    ]
+
+
+def test_iter_sdmx_data_xml() -> None:
+    from superset.sdmx import iter_sdmx_batches, iter_sdmx_data
+
+    assert list(
+        iter_sdmx_data(BufferedReader(BytesIO(STRUCTURE_SPECIFIC_MESSAGE)), 100)
+    ) == list(iter_sdmx_batches(BytesIO(STRUCTURE_SPECIFIC_MESSAGE), 100))
+
+
+def test_read_sdmx_data_csv(tmp_path: Path) -> None:
+    from superset.sdmx import read_sdmx_data
+
+    path = tmp_path / "data.csv"
+    path.write_bytes(
+        b"STRUCTURE,STRUCTURE_ID,ACTION,FREQ,TIME_PERIOD,OBS_VALUE\n"
+        b"dataflow,ECB:EXR(1.0),I,A,2020,1.14\n"
+        b"dataflow,ECB:EXR(1.0),D,A,2021,1.18\n"
+    )
+
+    datasets = read_sdmx_data(str(path))
+
+    assert list(datasets) == ["ECB:EXR(1.0)"]
+    assert datasets["ECB:EXR(1.0)"].to_dict("records") == [
+        {"FREQ": "A", "TIME_PERIOD": "2020", "OBS_VALUE": "1.14"}
+    ]
+
+
+def test_open_sdmx_stream_not_acceptable(mocker: MockerFixture) -> None:
+    from superset.sdmx import open_sdmx_stream
+
+    get = mocker.patch("superset.sdmx.get_sdmx_session").return_value.get
+    not_acceptable = mocker.MagicMock(status_code=406)
+    response = mocker.MagicMock(status_code=200)
+    response.__enter__.return_value = response
+    response.raw = BytesIO(CSV_MESSAGE)
+    get.side_effect = [not_acceptable, response]
+
+    with open_sdmx_stream("https://example.org/data/EXR") as stream:
+        assert stream.read() == CSV_MESSAGE
+
+    assert "Accept" in get.call_args_list[0].kwargs["headers"]
+    assert "Accept" not in get.call_args_list[1].kwargs["headers"]
+    assert get.call_args_list[1].kwargs["headers"]["Accept-Encoding"] == "gzip, deflate"
+
+
+def test_get_sdmx_session(mocker: MockerFixture) -> None:
+    from superset.sdmx import get_sdmx_session
+
+    mocker.patch("superset.sdmx._sessions", {})
+
+    session = get_sdmx_session("https://Data-API.ecb.europa.eu/service/data/EXR")
+    adapter = session.get_adapter("https://data-api.ecb.europa.eu")
+
+    assert get_sdmx_session("https://data-api.ecb.europa.eu/service/dataflow") is (
+        session
+    )
+    assert get_sdmx_session("https://stats.bis.org/api/v1/data") is not session
+    assert adapter._pool_block is True
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 3
+    assert 503 in adapter.max_retries.status_forcelist
+
+
+def test_jittered_retry_backoff(mocker: MockerFixture) -> None:
+    from superset.sdmx import _JitteredRetry
+
+    mocker.patch("superset.sdmx.random.uniform", side_effect=lambda a, b: b)
+    retry = _JitteredRetry(total=3, backoff_factor=0.5)
+    retry = retry.increment(method="GET", url="/").increment(method="GET", url="/")
+
+    assert isinstance(retry, _JitteredRetry)
+    assert (
+        retry.get_backoff_time()
+        == 2
+        * Retry(total=1, backoff_factor=0.5, history=retry.history).get_backoff_time()
+    )
+
+
+def test_refresh_database_coalesced(mocker: MockerFixture) -> None:
+    from superset.sdmx import refresh_database_coalesced
+
+    mocker.patch("superset.sdmx.db")
+    lock = mocker.patch("superset.sdmx.KeyValueDistributedLock")
+    refresh_database = mocker.patch("superset.sdmx.refresh_database")
+    dataset = mocker.MagicMock(
+        id=1, sdmx_uuid="store", sdmx_updated_at=datetime(2020, 1, 1)
+    )
+
+    refresh_database_coalesced(dataset)
+    refresh_database.assert_called_once_with(dataset)
+    # Datasets of the same store share the lock
+    assert lock.call_args.kwargs["sdmx_uuid"] == "store"
+
+    # Refreshed less than SDMX_REFRESH_MIN_INTERVAL ago
+    refresh_database.reset_mock()
+    dataset.sdmx_updated_at = datetime.utcnow()
+    refresh_database_coalesced(dataset)
+    refresh_database.assert_not_called()
+
+
+def test_refresh_database_coalesced_releases_lock(mocker: MockerFixture) -> None:
+    from superset.commands.distributed_lock.get import GetDistributedLock
+    from superset.sdmx import refresh_database_coalesced
+
+    mocker.patch("superset.sdmx._refreshed_recently", return_value=False)
+    mocker.patch(
+        "superset.sdmx.refresh_database", side_effect=ValueError("Service unavailable")
+    )
+    dataset = mocker.MagicMock(id=1, sdmx_uuid="store")
+
+    with pytest.raises(ValueError, match="Service unavailable"):
+        refresh_database_coalesced(dataset)
+
+    # the failed refresh does not keep the other requests waiting
+    assert not GetDistributedLock(
+        namespace="sdmx_refresh", params={"sdmx_uuid": "store"}
+    ).run()
+
+
+def test_refresh_database_coalesced_waits(mocker: MockerFixture) -> None:
+    from superset.exceptions import CreateKeyValueDistributedLockFailedException
+    from superset.sdmx import refresh_database_coalesced
+
+    db = mocker.patch("superset.sdmx.db")
+    mocker.patch(
+        "superset.sdmx.KeyValueDistributedLock",
+        side_effect=CreateKeyValueDistributedLockFailedException(),
+    )
+    get_lock = mocker.patch("superset.sdmx.GetDistributedLock")
+    get_lock.return_value.run.side_effect = [{"value": True}, {"value": True}, None]
+    sleep = mocker.patch("superset.sdmx.time.sleep")
+    refresh_database = mocker.patch("superset.sdmx.refresh_database")
+    dataset = mocker.MagicMock(id=1, sdmx_updated_at=None)
+
+    assert refresh_database_coalesced(dataset) is dataset
+
+    refresh_database.assert_not_called()
+    assert sleep.call_count == 2
+    db.session.refresh.assert_called_with(dataset)
+
+
+def test_is_refresh_due(mocker: MockerFixture) -> None:
+    from superset.sdmx import is_refresh_due
+
+    dataset = mocker.MagicMock(sdmx_refresh_schedule="0 3 * * *", sdmx_updated_at=None)
+    assert is_refresh_due(dataset)
+
+    dataset.sdmx_updated_at = datetime(2024, 5, 1, 3, 0, 5)
+    assert not is_refresh_due(dataset, datetime(2024, 5, 2, 2, 59))
+    assert is_refresh_due(dataset, datetime(2024, 5, 2, 3, 0))
+
+    dataset.sdmx_refresh_schedule = None
+    assert not is_refresh_due(dataset, datetime(2024, 5, 2, 3, 0))
+
+
+def test_has_upstream_changes(mocker: MockerFixture) -> None:
+    from superset.sdmx import has_upstream_changes, SdmxNoResultsError
+
+    get = mocker.patch("superset.sdmx.get_sdmx_session").return_value.get
+    get.return_value.status_code = 404
+    dataset = mocker.MagicMock(
+        sdmx_url="https://example.org/data/EXR/M.USD",
+        sdmx_updated_at=datetime(2024, 5, 1, 3, 0, 5),
+    )
+
+    assert not has_upstream_changes(dataset)
+    assert get.call_args.args[0] == (
+        "https://example.org/data/EXR/M.USD"
+        "?updatedAfter=2024-05-01T03:00:05Z&lastNObservations=1"
+    )
+
+    response = mocker.MagicMock(status_code=200)
+    response.__enter__.return_value = response
+    response.raw = BytesIO(CSV_MESSAGE)
+    get.return_value = response
+    assert has_upstream_changes(dataset)
+
+    dataset.sdmx_updated_at = None
+    mocker.patch("superset.sdmx.open_sdmx_stream", side_effect=SdmxNoResultsError())
+    assert has_upstream_changes(dataset)
+
+
+def test_ingestion_metrics(mocker: MockerFixture) -> None:
+    """
+    Test that the time of nested and interleaved stages is charged to the
+    innermost running stage.
+    """
+    from superset.sdmx import IngestionMetrics
+
+    # Every reading of the clock is one second later
+    mocker.patch("superset.sdmx.time").perf_counter.side_effect = count()
+    metrics = IngestionMetrics("https://data-api.ecb.europa.eu/service/data/EXR/A")
+
+    with metrics.stage("write"):
+        with metrics.stage("http_fetch"):
+            pass
+    assert metrics.stages == {"write": 2000.0, "http_fetch": 1000.0}
+
+    batches = metrics.timed_batches(iter([("EXR", [{}, {}]), ("EXR", [{}])]), "parse")
+    with metrics.stage("write"):
+        written = list(metrics.timed_batches(batches, "write", count_rows=True))
+
+    assert len(written) == 2
+    assert metrics.rows == 3
+    assert metrics.agency_id == "ECB"
+    assert metrics.dataflow_id == "EXR"
+
+
+def test_ingest_sdmx_metrics(mocker: MockerFixture, tmp_path: Path) -> None:
+    from superset.sdmx import ingest_sdmx
+
+    record = mocker.patch("superset.sdmx.record_sdmx_ingestion")
+    path = tmp_path / "data.csv"
+    path.write_bytes(CSV_MESSAGE)
+    (tmp_path / "dbs").mkdir()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path)
+        ingestion = ingest_sdmx(str(path), "store", is_raw_url=True, streaming=True)
+
+    metrics = ingestion["metrics"]
+    assert metrics.rows == 3
+    assert metrics.bytes_downloaded == len(CSV_MESSAGE)
+    assert {"parse", "parse_time_periods", "write", "index"} <= set(metrics.stages)
+    record.assert_not_called()
+
+    with pytest.raises(FileNotFoundError):
+        ingest_sdmx(str(tmp_path / "missing.csv"), "store", is_raw_url=True)
+    assert isinstance(record.call_args.kwargs["error"], FileNotFoundError)
+
+
+def test_register_sdmx_dataset(mocker: MockerFixture) -> None:
+    from superset.sdmx import IngestionMetrics, register_sdmx_dataset
+
+    mocker.patch("superset.sdmx.attach_sdmx_dataset", return_value=None)
+    mocker.patch("superset.sdmx.os.replace")
+    mocker.patch("superset.sdmx.get_or_create_database")
+    datasets = [mocker.MagicMock(), mocker.MagicMock()]
+    mocker.patch("superset.sdmx.update_permissions_and_metadata", side_effect=datasets)
+    record = mocker.patch("superset.sdmx.record_sdmx_ingestion")
+
+    metrics = IngestionMetrics("https://data-api.ecb.europa.eu/service/data/EXR/A")
+    ingestion = {
+        "sdmx_url": metrics.sdmx_url,
+        "metrics": metrics,
+        "dataset_uuid": "uuid",
+        "database_path": "dbs/uuid.tmp",
+        "concepts_name": {},
+        "started_at": None,
+        "table_names": ["EXR"],
+        "index_plan": {},
+    }
+
+    # each load returns and records the dataset it registered
+    assert register_sdmx_dataset(ingestion) is datasets[0]
+    assert register_sdmx_dataset(ingestion) is datasets[1]
+    assert [call.args[1] for call in record.call_args_list] == datasets
+
+
+def test_register_sdmx_dataset_attached(mocker: MockerFixture) -> None:
+    """
+    Test that a query registered by another load meanwhile is attached to its
+    store, without recording the download as an ingestion.
+    """
+    from superset.sdmx import IngestionMetrics, register_sdmx_dataset
+
+    dataset = mocker.MagicMock()
+    attach = mocker.patch("superset.sdmx.attach_sdmx_dataset", return_value=dataset)
+    remove = mocker.patch("superset.sdmx.os.remove")
+    register = mocker.patch("superset.sdmx.update_permissions_and_metadata")
+    record = mocker.patch("superset.sdmx.record_sdmx_ingestion")
+
+    metrics = IngestionMetrics("https://data-api.ecb.europa.eu/service/data/EXR/A")
+    metrics.bytes_downloaded = 1024
+    ingestion = {
+        "sdmx_url": metrics.sdmx_url,
+        "metrics": metrics,
+        "dataset_uuid": "uuid",
+        "database_path": "dbs/uuid.tmp",
+    }
+
+    assert register_sdmx_dataset(ingestion) is dataset
+    attach.assert_called_once_with("uuid", metrics.sdmx_url)
+    remove.assert_called_once_with("dbs/uuid.tmp")
+    register.assert_not_called()
+    record.assert_not_called()
+
+
+def test_record_sdmx_ingestion(mocker: MockerFixture, session: Session) -> None:
+    from superset.connectors.sqla.models import SdmxIngestionLog
+    from superset.sdmx import IngestionMetrics, record_sdmx_ingestion
+
+    SdmxIngestionLog.metadata.create_all(session.get_bind())
+    stats_logger = mocker.patch("superset.sdmx.stats_logger_manager").instance
+    event_logger = mocker.patch("superset.sdmx.event_logger")
+
+    metrics = IngestionMetrics("https://data-api.ecb.europa.eu/service/data/EXR/A")
+    metrics.stages = {"http_fetch": 12.5, "write": 3.0}
+    metrics.rows = 42
+    metrics.bytes_downloaded = 1024
+    record_sdmx_ingestion(metrics)
+
+    stats_logger.incr.assert_called_once_with("sdmx.ingestion.success")
+    stats_logger.timing.assert_any_call("sdmx.ingestion.stage.http_fetch", 12.5)
+    stats_logger.gauge.assert_any_call("sdmx.ingestion.ECB.EXR.rows", 42)
+    assert event_logger.log_with_context.call_args.kwargs["dataflow_id"] == "EXR"
+
+    record_sdmx_ingestion(metrics, error=Exception("Service unavailable"))
+
+    logs = session.query(SdmxIngestionLog).order_by(SdmxIngestionLog.id).all()
+    assert [(log.state, log.rows, log.error_message) for log in logs] == [
+        ("success", 42, None),
+        ("error", 42, "Service unavailable"),
+    ]
+    assert json.loads(logs[0].stages) == {"http_fetch": 12.5, "write": 3.0}
+    assert logs[0].agency_id == "ECB"
+
+
+def test_get_sdmx_store_key() -> None:
+    from superset.sdmx import get_sdmx_store_key
+
+    key = get_sdmx_store_key("https://example.org/data/EXR?b=1&a=2")
+    assert key == get_sdmx_store_key("https://EXAMPLE.org/data/EXR/?a=2&b=1")
+    assert key != get_sdmx_store_key("https://example.org/data/EXR?b=1&a=3")
+    assert key != get_sdmx_store_key(
+        "https://example.org/data/EXR?b=1&a=2", is_raw_url=True
+    )
+
+
+def test_sdmx_store_datasets(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    session: Session,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that datasets of an already stored query share its store through views,
+    are updated along when it is reloaded, and that the store is removed with
+    its last dataset.
+    """
+    from superset.connectors.sqla.models import SqlaTable
+    from superset.models.core import Database
+    from superset.sdmx import (
+        attach_sdmx_dataset,
+        drop_stale_tables,
+        get_sdmx_store_datasets,
+        update_sdmx_store_datasets,
+    )
+
+    SqlaTable.metadata.create_all(session.get_bind())
+    mocker.patch(
+        "superset.security.manager.SupersetSecurityManager.dataset_after_insert"
+    )
+    mocker.patch(
+        "superset.security.manager.SupersetSecurityManager.dataset_after_delete"
+    )
+    fetch_metadata = mocker.patch.object(SqlaTable, "fetch_metadata", autospec=True)
+    record = mocker.patch("superset.sdmx.record_sdmx_ingestion")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dbs").mkdir()
+    store = tmp_path / "dbs" / "store"
+    with sqlite3.connect(store) as conn:
+        conn.execute('CREATE TABLE "EXR 1" (CURRENCY TEXT, OBS_VALUE TEXT)')
+
+    assert attach_sdmx_dataset("store", "https://example.org/data/EXR") is None
+
+    database = Database(database_name="store", sqlalchemy_uri=f"sqlite:///{store}")
+    source = SqlaTable(
+        table_name="EXR 1", database=database, is_sdmx=True, sdmx_uuid="store"
+    )
+    session.add(source)
+    session.commit()
+
+    dataset = attach_sdmx_dataset("store", "https://EXAMPLE.org/data/EXR")
+    # the attached dataset is committed and recorded as a reuse
+    session.rollback()
+    assert get_sdmx_store_datasets("store") == [source, dataset]
+    metrics, recorded = record.call_args.args
+    assert (metrics.kind, metrics.bytes_downloaded, recorded) == ("reuse", 0, dataset)
+    assert dataset.table_name.startswith("EXR 1 #")
+    assert dataset.database is database
+    fetch_metadata.assert_called_once_with(dataset)
+    with sqlite3.connect(store) as conn:
+        query = f'SELECT * FROM "{dataset.table_name}"'  # noqa: S608
+        assert conn.execute(query).fetchall() == []
+    assert get_sdmx_store_datasets("store") == [source, dataset]
+
+    # Full reload of the store through the first dataset
+    with sqlite3.connect(store) as conn:
+        conn.execute('CREATE TABLE "EXR 2" (CURRENCY TEXT, OBS_VALUE TEXT, FREQ TEXT)')
+    drop_stale_tables(str(store), ["EXR 2"])
+    source.table_name = "EXR 2"
+    source.sdmx_updated_at = datetime(2024, 1, 1)
+    suffix = dataset.table_name.split(" #")[1]
+    update_sdmx_store_datasets(source)
+
+    assert dataset.table_name == f"EXR 2 #{suffix}"
+    assert dataset.sdmx_updated_at == datetime(2024, 1, 1)
+    with sqlite3.connect(store) as conn:
+        query = f'SELECT * FROM "{dataset.table_name}"'  # noqa: S608
+        columns = conn.execute(query).description
+    assert [column[0] for column in columns] == ["CURRENCY", "OBS_VALUE", "FREQ"]
+
+    session.delete(source)
+    session.commit()
+    assert store.exists()
+
+    # the store and its database are kept when the deletion is rolled back
+    session.delete(dataset)
+    session.flush()
+    session.rollback()
+    assert store.exists()
+    assert session.query(Database).filter_by(database_name="store").count() == 1
+
+    session.delete(dataset)
+    session.commit()
+    assert not store.exists()
+    assert session.query(Database).filter_by(database_name="store").count() == 0
+
+
+def test_create_charts(mocker: MockerFixture, tmp_path: Path) -> None:
+    """
+    Test that chart placeholders are resolved from the first row of the
+    dataset, with one query per dataset shared by the spec rows.
+    """
+    from superset.sdmx import create_charts
+
+    (tmp_path / "dbs").mkdir()
+    with sqlite3.connect(tmp_path / "dbs" / "store") as conn:
+        conn.execute(
+            'CREATE TABLE "EXR" '
+            '(CURRENCY TEXT, "CURRENCY-fr" TEXT, TIME_PERIOD TEXT, OBS_VALUE REAL)'
+        )
+        conn.executemany(
+            'INSERT INTO "EXR" VALUES (?, ?, ?, ?)',
+            [("Dollar", "Dollar US", "2024-01", 1.1), ("Yen", "Yen", "2024-02", 160)],
+        )
+    dataset = mocker.MagicMock(
+        id=1,
+        table_name="EXR",
+        sdmx_uuid="store",
+        column_names=["CURRENCY", "CURRENCY-fr", "OBS_VALUE", "TIME_PERIOD"],
+    )
+    connect = mocker.patch("superset.sdmx.sqlite3.connect", wraps=sqlite3.connect)
+    mocker.patch("superset.sdmx.db")
+    value_chart = mocker.patch("superset.sdmx.create_value_chart")
+    pie_chart = mocker.patch("superset.sdmx.create_pie_chart")
+    spec = {
+        "Rows": [
+            {
+                "DATA": "url",
+                "chartType": "VALUE",
+                "Title": "{$CURRENCY}",
+                "Subtitle": "{$TIME_PERIOD}",
+            },
+            {
+                "DATA": "url",
+                "chartType": "PIE",
+                "Title": "{$CURRENCY} ({$TIME_PERIOD})",
+                "legendConcept": "CURRENCY",
+            },
+            {"DATA": "", "chartType": "VALUE"},
+        ]
+    }
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path)
+        create_charts(spec, [dataset, dataset, None], mocker.MagicMock(), "fr")
+
+    assert spec["Rows"][0]["Title"] == "Dollar US"
+    assert spec["Rows"][0]["Subtitle"] == "2024-01"
+    assert spec["Rows"][1]["Title"] == "Dollar US (2024-01)"
+    assert value_chart.call_args.args[3] == ["OBS_VALUE", "CURRENCY", "TIME_PERIOD"]
+    assert "CURRENCY-fr" in pie_chart.call_args.args[4]
+    connect.assert_called_once()
+
+
+def test_load_dashboard(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    session: Session,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that a dashboard is built in a single transaction: new queries get a
+    new store and database, stored queries a view on their store, and all the
+    datasets and charts are committed at once.
+    """
+    from flask import current_app
+
+    from superset.connectors.sqla.models import SqlaTable
+    from superset.models.core import Database
+    from superset.models.dashboard import Dashboard
+    from superset.models.slice import Slice
+    from superset.sdmx import get_sdmx_store_key, load_dashboard
+
+    SqlaTable.metadata.create_all(session.get_bind())
+    mocker.patch(
+        "superset.security.manager.SupersetSecurityManager.dataset_after_insert"
+    )
+    mocker.patch.dict(current_app.config, {"DATABASE_OAUTH2_CLIENTS": {}})
+    mocker.patch("superset.commands.base.populate_owner_list", return_value=[])
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dbs").mkdir()
+
+    stored_url = "https://example.org/data/BSI"
+    stored_key = get_sdmx_store_key(stored_url)
+    with sqlite3.connect(tmp_path / "dbs" / stored_key) as conn:
+        conn.execute('CREATE TABLE "BSI" (REF_AREA TEXT, OBS_VALUE REAL)')
+        conn.execute("INSERT INTO \"BSI\" VALUES ('FR', 2.5)")
+    database = Database(
+        database_name=stored_key, sqlalchemy_uri=f"sqlite:///dbs/{stored_key}"
+    )
+    source = SqlaTable(
+        table_name="BSI", database=database, is_sdmx=True, sdmx_uuid=stored_key
+    )
+    session.add(source)
+    session.commit()
+
+    def ingest_sdmx(sdmx_url, dataset_uuid, progress=None, database_path=None):
+        with sqlite3.connect(database_path) as conn:
+            conn.execute('CREATE TABLE "EXR" (CURRENCY TEXT, OBS_VALUE REAL)')
+            conn.execute("INSERT INTO \"EXR\" VALUES ('USD', 1.1)")
+        return {
+            "sdmx_url": sdmx_url,
+            "dataset_uuid": dataset_uuid,
+            "database_path": database_path,
+            "concepts_name": {"CURRENCY": "Currency"},
+            "table_names": ["EXR"],
+            "index_plan": {"EXR": ["CURRENCY"]},
+            "started_at": datetime(2024, 1, 1),
+            "metrics": mocker.MagicMock(),
+        }
+
+    ingest = mocker.patch("superset.sdmx.ingest_sdmx", side_effect=ingest_sdmx)
+    record = mocker.patch("superset.sdmx.record_sdmx_ingestion")
+    commit = mocker.spy(session, "commit")
+    spec = {
+        "DashID": "Rates",
+        "Rows": [
+            {
+                "DATA": "https://example.org/data/EXR",
+                "chartType": "VALUE",
+                "Title": "{$CURRENCY}",
+                "Subtitle": "",
+            },
+            {
+                "DATA": "https://EXAMPLE.org/data/EXR",
+                "chartType": "PIE",
+                "Title": "Rates",
+                "legendConcept": "CURRENCY",
+            },
+            {
+                "DATA": stored_url,
+                "chartType": "VALUE",
+                "Title": "{$REF_AREA}",
+                "Subtitle": "",
+            },
+        ],
+    }
+
+    dashboard = load_dashboard(spec)
+
+    assert commit.call_count == 1
+    ingest.assert_called_once()
+    new_key = get_sdmx_store_key("https://example.org/data/EXR")
+    assert (tmp_path / "dbs" / new_key).exists()
+    assert [path.name for path in (tmp_path / "dbs").glob("*.tmp")] == []
+
+    dataset = session.query(SqlaTable).filter_by(sdmx_uuid=new_key).one()
+    assert dataset.database.database_name == new_key
+    assert dataset.extra_dict["sdmx_indexes"] == ["CURRENCY"]
+    assert set(dataset.column_names) == {"CURRENCY", "OBS_VALUE"}
+    record.assert_called_once_with(mocker.ANY, dataset)
+
+    view = session.query(SqlaTable).filter_by(sdmx_uuid=stored_key).all()[-1]
+    assert view is not source
+    assert view.database is database
+    assert view.table_name.startswith("BSI #")
+    assert set(view.column_names) == {"REF_AREA", "OBS_VALUE"}
+
+    charts = session.query(Slice).all()
+    assert [chart.slice_name for chart in charts] == ["USD", "Rates", "FR"]
+    assert [chart.datasource_id for chart in charts] == [
+        dataset.id,
+        dataset.id,
+        view.id,
+    ]
+    assert session.query(Dashboard).one() is dashboard
+    assert dashboard.slices == charts
+
+
+def test_build_sdmx_slice_url() -> None:
+    from superset.sdmx import build_sdmx_slice_url
+
+    dimensions = ["FREQ", "CURRENCY", "CURRENCY_DENOM"]
+    base_url = "https://data-api.ecb.europa.eu/service/data/EXR"
+
+    assert build_sdmx_slice_url(base_url, dimensions) == base_url
+    assert (
+        build_sdmx_slice_url(base_url, dimensions, {"CURRENCY": {"USD", "JPY"}})
+        == f"{base_url}/.JPY+USD."
+    )
+    assert (
+        build_sdmx_slice_url(
+            f"{base_url}/M.USD+GBP.EUR?startPeriod=2020&format=csvdata",
+            dimensions,
+            {"CURRENCY": {"USD", "JPY"}},
+            start_period="2019-06",
+            end_period="2024-01-31",
+        )
+        == f"{base_url}/M.USD.EUR"
+        "?startPeriod=2020&format=csvdata&endPeriod=2024-01-31"
+    )
+    # Periods are compared once parsed, not as strings
+    assert (
+        build_sdmx_slice_url(
+            f"{base_url}/M.USD.EUR?startPeriod=2020-Q1&endPeriod=2024-06",
+            dimensions,
+            start_period="2020-02",
+            end_period="2024",
+        )
+        == f"{base_url}/M.USD.EUR?startPeriod=2020-02&endPeriod=2024-06"
+    )
+    # Periods that can not be compared are not pushed down
+    assert (
+        build_sdmx_slice_url(
+            f"{base_url}/M.USD.EUR?startPeriod=2020&endPeriod=2024-06",
+            dimensions,
+            start_period="latest",
+            end_period="2024-W10",
+        )
+        == f"{base_url}/M.USD.EUR?startPeriod=2020&endPeriod=2024-W10"
+    )
+    assert (
+        build_sdmx_slice_url(f"{base_url}/M.GBP.EUR", dimensions, {"CURRENCY": {"USD"}})
+        is None
+    )
+    # Keys that do not match the structure are not narrowed
+    assert (
+        build_sdmx_slice_url(f"{base_url}/M.GBP", dimensions, {"CURRENCY": {"USD"}})
+        == f"{base_url}/M.GBP"
+    )
+    assert (
+        build_sdmx_slice_url(f"{base_url}/all/ECB", dimensions, {"FREQ": {"M"}})
+        == f"{base_url}/M../ECB"
+    )
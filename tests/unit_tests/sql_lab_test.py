@@ -53,6 +53,7 @@ def test_execute_sql_statement(mocker: MockerFixture, app: None) -> None:
     database.mutate_sql_based_on_config.return_value = "SELECT 42 AS answer LIMIT 2"
     db_engine_spec = database.db_engine_spec
     db_engine_spec.is_select_query.return_value = True
+    db_engine_spec.supports_arrow_fetch = False
     db_engine_spec.fetch_data.return_value = [(42,)]
 
     cursor = mocker.MagicMock()
@@ -96,6 +97,7 @@ def test_execute_sql_statement_with_rls(
     database.mutate_sql_based_on_config.return_value = sql_statement_with_rls_and_limit
     db_engine_spec = database.db_engine_spec
     db_engine_spec.is_select_query.return_value = True
+    db_engine_spec.supports_arrow_fetch = False
     db_engine_spec.fetch_data.return_value = [(42,)]
 
     cursor = mocker.MagicMock()
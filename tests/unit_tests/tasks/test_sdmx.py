@@ -0,0 +1,227 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import pytest
+from pytest_mock import MockerFixture
+
+
+def test_refresh_dataflow_catalogs(mocker: MockerFixture) -> None:
+    """
+    Test that a failing agency does not stop the refresh of the others.
+    """
+    from superset.tasks.sdmx import refresh_dataflow_catalogs
+
+    mocker.patch(
+        "superset.tasks.sdmx.get_supported_agencies",
+        return_value={"BIS": None, "ECB": None},
+    )
+    refresh = mocker.patch(
+        "superset.tasks.sdmx.refresh_dataflow_catalog",
+        side_effect=[Exception("unreachable"), None],
+    )
+
+    refresh_dataflow_catalogs()
+
+    assert [call.args for call in refresh.call_args_list] == [("BIS",), ("ECB",)]
+
+
+def test_load_sdmx_dataset(mocker: MockerFixture) -> None:
+    """
+    Test that the ingestion stages and the result are published as events.
+    """
+    from superset.tasks.sdmx import load_sdmx_dataset
+
+    async_query_manager = mocker.patch("superset.tasks.sdmx.async_query_manager")
+    async_query_manager.STATUS_RUNNING = "running"
+    async_query_manager.STATUS_DONE = "done"
+
+    def load_database(sdmx_url, is_raw_url, progress):
+        progress("fetching", sdmx_url)
+        return mocker.MagicMock(id=42)
+
+    mocker.patch("superset.tasks.sdmx.load_database", side_effect=load_database)
+    mocker.patch("superset.tasks.sdmx._load_user_from_job_metadata")
+
+    job_metadata = {"channel_id": "abc", "job_id": "def", "user_id": 1}
+    load_sdmx_dataset(job_metadata, "https://example.org/data/EXR")
+
+    assert async_query_manager.update_job.call_args_list == [
+        mocker.call(
+            job_metadata,
+            "running",
+            stage="fetching",
+            sdmx_url="https://example.org/data/EXR",
+        ),
+        mocker.call(job_metadata, "done", result_url="/api/v1/dataset/42"),
+    ]
+
+
+def test_load_sdmx_dashboard_with_error(mocker: MockerFixture) -> None:
+    """
+    Test that the task is gracefully marked failed in event of error.
+    """
+    from superset.tasks.sdmx import load_sdmx_dashboard
+
+    async_query_manager = mocker.patch("superset.tasks.sdmx.async_query_manager")
+    async_query_manager.STATUS_ERROR = "error"
+    mocker.patch(
+        "superset.tasks.sdmx.load_dashboard", side_effect=Exception("No results found")
+    )
+    mocker.patch("superset.tasks.sdmx._load_user_from_job_metadata")
+
+    job_metadata = {"channel_id": "abc", "job_id": "def", "user_id": 1}
+    with pytest.raises(Exception, match="No results found"):
+        load_sdmx_dashboard(job_metadata, {"Rows": []})
+
+    async_query_manager.update_job.assert_called_once_with(
+        job_metadata, "error", errors=[{"message": "No results found"}]
+    )
+
+
+def test_refresh_scheduled_datasets(mocker: MockerFixture) -> None:
+    """
+    Test that only the datasets with a due, valid schedule are dispatched.
+    """
+    from superset.tasks.sdmx import refresh_scheduled_datasets
+
+    due = mocker.MagicMock(id=1, sdmx_refresh_schedule="0 3 * * *")
+    not_due = mocker.MagicMock(id=2, sdmx_refresh_schedule="0 3 * * *")
+    invalid = mocker.MagicMock(id=3, sdmx_refresh_schedule="not a cron")
+    db = mocker.patch("superset.tasks.sdmx.db")
+    db.session.query.return_value.filter.return_value.all.return_value = [
+        due,
+        not_due,
+        invalid,
+    ]
+    mocker.patch(
+        "superset.tasks.sdmx.is_refresh_due",
+        side_effect=[True, False, ValueError("Bad cron")],
+    )
+    refresh = mocker.patch("superset.tasks.sdmx.refresh_scheduled_dataset")
+
+    refresh_scheduled_datasets()
+
+    refresh.delay.assert_called_once_with(1)
+
+
+def test_refresh_scheduled_dataset(mocker: MockerFixture) -> None:
+    """
+    Test that a changed dataset is refreshed and the charts of all the datasets
+    of its store warmed up.
+    """
+    from superset.tasks.sdmx import refresh_scheduled_dataset
+
+    dataset = mocker.MagicMock(id=1, sdmx_uuid="store")
+    sibling = mocker.MagicMock(id=2, sdmx_uuid="store")
+    db = mocker.patch("superset.tasks.sdmx.db")
+    db.session.query.return_value.get.return_value = dataset
+    mocker.patch("superset.tasks.sdmx.is_refresh_due", return_value=True)
+    lock = mocker.patch("superset.tasks.sdmx.KeyValueDistributedLock")
+    mocker.patch("superset.tasks.sdmx.has_upstream_changes", return_value=True)
+    refresh_database = mocker.patch("superset.tasks.sdmx.refresh_database")
+    warm_up = mocker.patch("superset.tasks.sdmx.warm_up_dataset_charts")
+    mocker.patch(
+        "superset.tasks.sdmx.get_sdmx_store_datasets", return_value=[dataset, sibling]
+    )
+
+    refresh_scheduled_dataset(1)
+
+    refresh_database.assert_called_once_with(dataset)
+    assert [call.args for call in warm_up.call_args_list] == [(dataset,), (sibling,)]
+    assert lock.call_args_list[0].args == ("sdmx_scheduled_refresh",)
+    assert lock.call_args_list[0].kwargs["slot"] == 0
+    assert lock.call_args_list[1].kwargs["sdmx_uuid"] == "store"
+
+
+@pytest.mark.parametrize("failing", ["has_upstream_changes", "refresh_database"])
+def test_refresh_scheduled_dataset_releases_locks(
+    mocker: MockerFixture, failing: str
+) -> None:
+    """
+    Test that a failing refresh releases its slot and the lock of its store.
+    """
+    from flask import current_app
+
+    from superset.commands.distributed_lock.get import GetDistributedLock
+    from superset.tasks.sdmx import refresh_scheduled_dataset
+
+    dataset = mocker.MagicMock(id=1, sdmx_uuid="store")
+    db = mocker.patch("superset.tasks.sdmx.db")
+    db.session.query.return_value.get.return_value = dataset
+    mocker.patch("superset.tasks.sdmx.is_refresh_due", return_value=True)
+    mocker.patch("superset.tasks.sdmx.has_upstream_changes", return_value=True)
+    mocker.patch(
+        f"superset.tasks.sdmx.{failing}",
+        side_effect=ValueError("Service unavailable"),
+    )
+
+    # run in the app context of the test, whose metadata database has the locks
+    with pytest.raises(ValueError, match="Service unavailable"):
+        refresh_scheduled_dataset.run(1)
+
+    concurrency = current_app.config["SDMX_SCHEDULED_REFRESH_MAX_CONCURRENCY"]
+    for slot in range(concurrency):
+        assert not GetDistributedLock(
+            namespace="sdmx_scheduled_refresh", params={"slot": slot}
+        ).run()
+    assert not GetDistributedLock(
+        namespace="sdmx_refresh", params={"sdmx_uuid": "store"}
+    ).run()
+
+
+def test_refresh_scheduled_dataset_unchanged(mocker: MockerFixture) -> None:
+    """
+    Test that a dataset unchanged upstream is only marked as checked.
+    """
+    from superset.tasks.sdmx import refresh_scheduled_dataset
+
+    dataset = mocker.MagicMock(id=1)
+    db = mocker.patch("superset.tasks.sdmx.db")
+    db.session.query.return_value.get.return_value = dataset
+    mocker.patch("superset.tasks.sdmx.is_refresh_due", return_value=True)
+    mocker.patch("superset.tasks.sdmx.KeyValueDistributedLock")
+    mocker.patch("superset.tasks.sdmx.has_upstream_changes", return_value=False)
+    mark_checked = mocker.patch("superset.tasks.sdmx.mark_sdmx_dataset_checked")
+    refresh_database = mocker.patch("superset.tasks.sdmx.refresh_database")
+    warm_up = mocker.patch("superset.tasks.sdmx.warm_up_dataset_charts")
+
+    refresh_scheduled_dataset(1)
+
+    assert mark_checked.call_args.args[0] is dataset
+    refresh_database.assert_not_called()
+    warm_up.assert_not_called()
+
+
+def test_refresh_scheduled_dataset_no_slot(mocker: MockerFixture) -> None:
+    """
+    Test that the refresh is deferred when all the refresh slots are taken.
+    """
+    from superset.exceptions import CreateKeyValueDistributedLockFailedException
+    from superset.tasks.sdmx import refresh_scheduled_dataset
+
+    db = mocker.patch("superset.tasks.sdmx.db")
+    db.session.query.return_value.get.return_value = mocker.MagicMock(id=1)
+    mocker.patch("superset.tasks.sdmx.is_refresh_due", return_value=True)
+    lock = mocker.patch(
+        "superset.tasks.sdmx.KeyValueDistributedLock",
+        side_effect=CreateKeyValueDistributedLockFailedException(),
+    )
+    has_upstream_changes = mocker.patch("superset.tasks.sdmx.has_upstream_changes")
+
+    refresh_scheduled_dataset(1)
+
+    assert lock.call_count == 2  # SDMX_SCHEDULED_REFRESH_MAX_CONCURRENCY
+    has_upstream_changes.assert_not_called()
@@ -95,3 +95,23 @@ def test_df_to_escaped_csv():
 
     df = pa.array([1, None]).to_pandas(integer_object_nulls=True).to_frame()
     assert csv.df_to_escaped_csv(df, encoding="utf8", index=False) == '0\n1\n""\n'
+
+
+def test_df_to_escaped_csv_chunks():
+    df = pd.DataFrame(
+        data={
+            "=value": ["a", "=func()", None, "-10", " =a"],
+            "number": [1.5, None, 3, 4, 5],
+        }
+    )
+
+    chunks = list(csv.df_to_escaped_csv_chunks(df, 2, encoding="utf8", index=False))
+
+    assert len(chunks) == 3
+    assert chunks[0] == "'=value,number\na,1.5\n'=func(),\n"
+    assert "".join(chunks) == csv.df_to_escaped_csv(
+        df.copy(), encoding="utf8", index=False
+    )
+    assert list(csv.df_to_escaped_csv_chunks(df.iloc[:0], 2, index=False)) == [
+        "'=value,number\n"
+    ]
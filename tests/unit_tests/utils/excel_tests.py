@@ -16,12 +16,13 @@
 # under the License.
 
 from datetime import datetime, timezone
+from io import BytesIO
 
 import pandas as pd
 from pandas.api.types import is_numeric_dtype
 
 from superset.utils.core import GenericDataType
-from superset.utils.excel import apply_column_types, df_to_excel
+from superset.utils.excel import apply_column_types, df_to_excel, df_to_excel_chunks
 
 
 def test_timezone_conversion() -> None:
@@ -105,3 +106,39 @@ def test_column_data_types_with_failing_conversion():
     assert not is_numeric_dtype(df["col1"])
     assert not is_numeric_dtype(df["col2"])
     assert not is_numeric_dtype(df["col3"])
+
+
+def test_df_to_excel_chunks() -> None:
+    """
+    Test that the streamed Excel file has the contents of `df_to_excel`.
+    """
+    df = pd.DataFrame(
+        {
+            "formula": ["=SUM(A1:A2)", "normal", None] * 3,
+            "value": [1.5, float("nan"), float("inf")] * 3,
+            "dt": pd.date_range("2023-01-01", periods=9, freq="h"),
+        }
+    )
+    chunks = list(df_to_excel_chunks(df.copy(), chunk_size=2, block_size=1024))
+
+    assert len(chunks) > 1
+    pd.testing.assert_frame_equal(
+        pd.read_excel(BytesIO(b"".join(chunks))),
+        pd.read_excel(BytesIO(df_to_excel(df.copy()))),
+    )
+    assert pd.read_excel(BytesIO(b"".join(chunks)))["formula"].tolist()[:2] == [
+        "'=SUM(A1:A2)",
+        "normal",
+    ]
+
+
+def test_df_to_excel_chunks_unsupported_options() -> None:
+    """
+    Test that options the streaming writer does not support fall back to
+    `df_to_excel`.
+    """
+    df = pd.DataFrame({"value": [1.2345]})
+    chunks = list(df_to_excel_chunks(df, float_format="%.2f"))
+
+    assert len(chunks) == 1
+    assert pd.read_excel(BytesIO(chunks[0]))["value"][0] == 1.23
@@ -16,10 +16,13 @@
 # under the License.
 import copy
 import datetime
+import decimal
 import math
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
+from pytest_mock import MockerFixture
 
 from superset.utils import json
 
@@ -192,3 +195,62 @@ def test_sensitive_fields() -> None:
             "user_token": "NEW_TOKEN",
         },
     }
+
+
+def test_json_dumps_bytes():
+    data = {
+        "str": "Hello World",
+        "int": 123456789,
+        "nan": float("nan"),
+        1: "non string key",
+        "datetime": datetime.datetime(2024, 1, 2, 3, 4, 5),
+        "big": 2**70,
+    }
+    result = json.dumps_bytes(data, default=json.json_int_dttm_ser)
+    assert isinstance(result, bytes)
+    assert json.loads(result) == {
+        "str": "Hello World",
+        "int": 123456789,
+        "nan": None,
+        "1": "non string key",
+        "datetime": 1704164645000.0,
+        "big": 2**70,
+    }
+
+
+def test_json_dumps_bytes_decimal():
+    """
+    Test that decimals are encoded exactly, as `dumps` does.
+    """
+    data = [{"amount": decimal.Decimal("12345678901234567.891"), "id": 1}]
+
+    result = json.dumps_bytes(data, default=json.json_int_dttm_ser)
+
+    assert result == b'[{"amount": 12345678901234567.891, "id": 1}]'
+    assert result.decode("utf-8") == json.dumps(data, default=json.json_int_dttm_ser)
+
+
+def test_json_dumps_bytes_numpy(mocker: MockerFixture):
+    """
+    Test that numpy scalars and arrays are encoded by orjson, without falling back
+    to `dumps`.
+    """
+    dumps = mocker.spy(json, "dumps")
+    data = {
+        "float": np.float64(1.5),
+        "nan": np.float64("nan"),
+        "int": np.int64(2),
+        "bool": np.bool_(True),
+        "array": np.array([1, 2]),
+    }
+
+    result = json.dumps_bytes(data, default=json.json_int_dttm_ser)
+
+    assert json.loads(result) == {
+        "float": 1.5,
+        "nan": None,
+        "int": 2,
+        "bool": True,
+        "array": [1, 2],
+    }
+    dumps.assert_not_called()
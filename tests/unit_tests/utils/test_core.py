@@ -35,6 +35,7 @@ from superset.utils.core import (
     parse_boolean_string,
     QueryObjectFilterClause,
     remove_extra_adhoc_filters,
+    stream_zip,
 )
 
 ADHOC_FILTER: QueryObjectFilterClause = {
@@ -396,3 +397,23 @@ def test_get_datasource_full_name():
         get_datasource_full_name("db", "table", "catalog", None)
         == "[db].[catalog].[table]"
     )
+
+
+def test_stream_zip() -> None:
+    from io import BytesIO
+    from zipfile import ZipFile
+
+    chunks = list(
+        stream_zip(
+            [
+                ("query_1.csv", (b"a,b\n", b"1,2\n")),
+                ("query_2.csv", [b"c\n"]),
+            ]
+        )
+    )
+
+    assert len(chunks) > 1
+    with ZipFile(BytesIO(b"".join(chunks))) as bundle:
+        assert bundle.testzip() is None
+        assert bundle.read("query_1.csv") == b"a,b\n1,2\n"
+        assert bundle.read("query_2.csv") == b"c\n"
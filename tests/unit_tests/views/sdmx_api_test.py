@@ -0,0 +1,97 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from typing import Any
+
+from pytest_mock import MockerFixture
+
+CATALOG = {
+    "dataflows": [
+        {"id": "EXR", "name": "Exchange Rates"},
+        {"id": "BSI", "name": "Balance Sheet Items"},
+        {"id": "MIR", "name": "MFI Interest Rate Statistics"},
+    ],
+    "etag": "abc",
+    "refreshed_at": 0,
+}
+
+
+def test_sdmx_get_dataflows(mocker: MockerFixture, client: Any) -> None:
+    """
+    Test that the full catalog is returned when no search is requested.
+    """
+    mocker.patch("superset.views.api.get_dataflow_catalog", return_value=CATALOG)
+
+    response = client.get("/api/v1/sdmx/agency/ECB")
+
+    assert response.status_code == 200
+    assert response.json == CATALOG["dataflows"]
+    assert response.headers["ETag"] == '"abc"'
+
+
+def test_sdmx_get_dataflows_search(mocker: MockerFixture, client: Any) -> None:
+    """
+    Test the server-side search and pagination of the dataflow catalog.
+    """
+    mocker.patch("superset.views.api.get_dataflow_catalog", return_value=CATALOG)
+
+    response = client.get("/api/v1/sdmx/agency/ECB?q=rate&page=0&page_size=1")
+
+    assert response.status_code == 200
+    assert response.json == {
+        "count": 2,
+        "result": [{"id": "EXR", "name": "Exchange Rates"}],
+    }
+
+
+def test_sdmx_get_dataflows_not_modified(mocker: MockerFixture, client: Any) -> None:
+    """
+    Test that a matching ETag returns 304 without a body.
+    """
+    mocker.patch("superset.views.api.get_dataflow_catalog", return_value=CATALOG)
+
+    response = client.get("/api/v1/sdmx/agency/ECB", headers={"If-None-Match": '"abc"'})
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_sdmx_upload_async(mocker: MockerFixture, client: Any) -> None:
+    """
+    Test that an async upload enqueues an ingestion job and returns 202.
+    """
+    mocker.patch("superset.views.api.is_feature_enabled", return_value=True)
+    async_query_manager = mocker.patch(
+        "superset.views.api.async_query_manager", new=mocker.MagicMock()
+    )
+    async_query_manager.parse_channel_id_from_request.return_value = "abc"
+    async_query_manager.submit_sdmx_dataset_job.return_value = {
+        "channel_id": "abc",
+        "job_id": "def",
+        "status": "pending",
+    }
+    load_database = mocker.patch("superset.views.api.load_database")
+
+    response = client.post(
+        "/api/v1/sdmx/?async=true", json={"sdmxUrl": "https://example.org/data/EXR"}
+    )
+
+    assert response.status_code == 202
+    assert response.json["job_id"] == "def"
+    async_query_manager.submit_sdmx_dataset_job.assert_called_once_with(
+        "abc", "https://example.org/data/EXR", True, mocker.ANY
+    )
+    load_database.assert_not_called()